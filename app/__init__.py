@@ -1,8 +1,9 @@
 import os
 import random
-from flask import Flask, render_template, url_for
+from flask import Flask, render_template
 from app.config import config
-from app.database import init_db, get_db
+from app.database import init_db
+from app.utils import sql_trace, fragment_cache, calendar_cache, conditional, compression, static_assets, template_cache
 
 
 def _thumb_path_filter(image_path):
@@ -26,16 +27,39 @@ def _crop_display_name(name, variety=None):
     return name
 
 
-def create_app(config_name='default'):
-    """Flaskアプリケーションファクトリ"""
+def create_app(config_name='default', config_overrides=None):
+    """Flaskアプリケーションファクトリ
+
+    config_overrides: 設定クラスの値を上書きする辞書（ベンチマーク・スクリプト用）
+    """
     app = Flask(__name__, instance_relative_config=True)
 
     # 設定読み込み
     app.config.from_object(config[config_name])
+    if config_overrides:
+        app.config.update(config_overrides)
 
     # データベース初期化
     init_db(app)
 
+    # リクエスト単位のSQL計測
+    sql_trace.init_app(app)
+
+    # テンプレート断片キャッシュ
+    fragment_cache.init_app(app)
+
+    # カレンダーの月データの月単位キャッシュ
+    calendar_cache.init_app(app)
+
+    # 詳細画面の条件付き GET（ETag / Last-Modified）
+    conditional.init_app(app)
+
+    # レスポンス圧縮と事前圧縮済み静的ファイルの配信
+    compression.init_app(app)
+
+    # 静的ファイルのハッシュ付き URL と長期キャッシュ（圧縮の静的ファイルビューを包むので後に登録）
+    static_assets.init_app(app)
+
     # Jinja2 フィルター登録
     app.jinja_env.filters['thumb_path'] = _thumb_path_filter
 
@@ -43,7 +67,7 @@ def create_app(config_name='default'):
     app.jinja_env.globals['crop_display_name'] = _crop_display_name
 
     # ブループリント登録
-    from app.routes import crop_routes, location_routes, diary_routes, harvest_routes, calendar_routes, task_routes, planting_routes, supplement_routes
+    from app.routes import crop_routes, location_routes, diary_routes, harvest_routes, calendar_routes, task_routes, planting_routes, supplement_routes, gallery_routes
     app.register_blueprint(crop_routes.bp)
     app.register_blueprint(location_routes.bp)
     app.register_blueprint(diary_routes.bp)
@@ -52,81 +76,32 @@ def create_app(config_name='default'):
     app.register_blueprint(task_routes.bp)
     app.register_blueprint(planting_routes.bp)
     app.register_blueprint(supplement_routes.bp)
+    app.register_blueprint(gallery_routes.bp)
 
     # ホームページルート
     @app.route('/')
     def index():
-        from app.models.crop import Crop
-        from app.models.location import Location
         from app.models.planting import Planting
         from app.models.diary import DiaryEntry
         from app.models.harvest import Harvest
         from app.models.task import Task
         from app.models.planting_record import PlantingRecord
+        from app.models.stats import Stats
+        from app.models.media import MediaItem
+        from app.utils.fragment_cache import LazyResult
+
+        # 統計情報を取得（トリガーで更新されるカウンターを1クエリで読む）
+        stats = Stats.get_dashboard_stats()
 
-        # 統計情報を取得
-        stats = {
-            'crop_count': Crop.count(),
-            'location_count': Location.count(),
-            'active_crop_count': Planting.count_active(),
-            'diary_count': DiaryEntry.count(),
-            'harvest_count': Harvest.count(),
-            'pending_task_count': Task.count(Task.STATUS_PENDING) + Task.count(Task.STATUS_IN_PROGRESS)
-        }
-
-        # 最新データを取得
-        recent_diaries = DiaryEntry.get_recent(5)
-        recent_plantings = Planting.get_recent(5)
-        recent_harvests = Harvest.get_recent(5)
-        pending_tasks = Task.get_pending(5)
-        recent_growth_records = PlantingRecord.get_recent(5)
-
-        # カルーセル用: 最近の画像を全テーブルから取得
-        db = get_db()
-        carousel_images_raw = db.execute('''
-            SELECT 'crop' AS type, id, image_path, name AS label, CAST(created_at AS TEXT) AS sort_date,
-                   name AS crop_name, variety, icon_path, image_color
-            FROM crops WHERE image_path IS NOT NULL AND image_path != ''
-            UNION ALL
-            SELECT 'location' AS type, id, image_path, name AS label, CAST(created_at AS TEXT) AS sort_date,
-                   NULL, NULL, NULL, NULL
-            FROM locations WHERE image_path IS NOT NULL AND image_path != ''
-            UNION ALL
-            SELECT 'diary' AS type, id, image_path, title AS label, CAST(entry_date AS TEXT) AS sort_date,
-                   NULL, NULL, NULL, NULL
-            FROM diary_entries WHERE image_path IS NOT NULL AND image_path != ''
-            UNION ALL
-            SELECT 'harvest' AS type, h.id, h.image_path, '' AS label, CAST(h.harvest_date AS TEXT) AS sort_date,
-                   c.name AS crop_name, c.variety, c.icon_path, c.image_color
-            FROM harvests h
-            JOIN plantings p ON h.location_crop_id = p.id
-            JOIN crops c ON p.crop_id = c.id
-            WHERE h.image_path IS NOT NULL AND h.image_path != ''
-            UNION ALL
-            SELECT 'planting_record' AS type, pr.id, pr.image_path, '' AS label, CAST(pr.recorded_at AS TEXT) AS sort_date,
-                   c.name AS crop_name, c.variety, c.icon_path, c.image_color
-            FROM planting_records pr
-            JOIN plantings p ON pr.location_crop_id = p.id
-            JOIN crops c ON p.crop_id = c.id
-            WHERE pr.image_path IS NOT NULL AND pr.image_path != ''
-            ORDER BY sort_date DESC
-            LIMIT 20
-        ''').fetchall()
-
-        carousel_images = [dict(row) for row in carousel_images_raw]
-
-        type_config = {
-            'crop': ('crops.detail', 'crop_id', 'icon_crop.png', '作物'),
-            'location': ('locations.detail', 'location_id', 'icon_location.png', '場所'),
-            'diary': ('diary.detail', 'diary_id', 'icon_diary.png', '日記'),
-            'harvest': ('harvests.detail', 'harvest_id', 'icon_harvest.png', '収穫'),
-            'planting_record': ('plantings.record_detail', 'record_id', 'icon_location_crop.png', '栽培記録'),
-        }
-        for img in carousel_images:
-            endpoint, param, icon, type_label = type_config[img['type']]
-            img['detail_url'] = url_for(endpoint, **{param: img['id']})
-            img['icon'] = icon
-            img['type_label'] = type_label
+        # 最新データを取得（ウィジェットが断片キャッシュにない場合だけ実行される）
+        recent_diaries = LazyResult(DiaryEntry.get_recent, 5)
+        recent_plantings = LazyResult(Planting.get_recent, 5)
+        recent_harvests = LazyResult(Harvest.get_recent, 5)
+        pending_tasks = LazyResult(Task.get_pending, 5)
+        recent_growth_records = LazyResult(PlantingRecord.get_recent, 5)
+
+        # カルーセル用: 最近の画像（media_items から取得）
+        carousel_images = MediaItem.get_recent(20)
 
         if carousel_images:
             random.shuffle(carousel_images)
@@ -141,4 +116,7 @@ def create_app(config_name='default'):
                              carousel_images=carousel_images,
                              Task=Task)
 
+    # テンプレートのバイトコードキャッシュと起動時ウォームアップ（拡張・ブループリント登録後）
+    template_cache.init_app(app)
+
     return app
@@ -6,6 +6,84 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DATABASE = os.path.join(os.getcwd(), 'instance', 'garden.db')
 
+    # データベース接続プール設定
+    DB_POOL_SIZE = 5                # ワーカーごとに保持するアイドル接続数（0でプール無効）
+    DB_STATEMENT_CACHE_SIZE = 128   # 接続ごとのプリペアドステートメントキャッシュ数
+    DB_POOL_PRE_PING = True         # 再利用前に SELECT 1 で接続を確認
+
+    # 読み書き分離（GET は読み取り専用接続、書き込みはプロセス内で直列化）
+    DB_READ_WRITE_SPLIT = True
+    DB_WRITE_TIMEOUT = 10.0         # 書き込みキューで順番を待つ最大秒数
+    DB_WRITE_RETRIES = 5            # 他プロセスとの競合時に BEGIN IMMEDIATE を再試行する回数
+    DB_WRITE_BACKOFF = 0.05         # 再試行の初回待機秒数（試行ごとに倍増）
+
+    # SQL計測（Server-Timing ヘッダーとスロークエリログ）
+    SQL_TRACE = True
+    SQL_SLOW_QUERY_MS = 100         # これを超えた文を EXPLAIN QUERY PLAN 付きでログ出力
+    SQL_NPLUS1_DETECT = False       # 同じ形の文の繰り返し（N+1）を検出
+    SQL_NPLUS1_THRESHOLD = 5        # 1リクエストでこの回数を超えたら N+1 とみなす
+    SQL_NPLUS1_RAISE = False        # True なら警告ではなく NPlusOneQueryError を送出
+
+    # テンプレート断片キャッシュ（キーに table_versions のバージョンを含める）
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_MAX_ENTRIES = 1024
+    FRAGMENT_CACHE_MAX_BYTES = 8 * 1024 * 1024  # 8MB
+
+    # カレンダーの月データの月単位キャッシュ（キーに calendar_month_versions のバージョンを含める）
+    CALENDAR_CACHE_ENABLED = True
+    CALENDAR_CACHE_MAX_MONTHS = 120
+
+    # レスポンス圧縮（brotli パッケージがあれば br、なければ gzip）
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 500                 # これより小さいレスポンスは圧縮しない（バイト）
+    COMPRESS_MIMETYPES = {
+        'text/html', 'text/css', 'text/plain', 'text/javascript',
+        'application/javascript', 'application/json', 'image/svg+xml', 'text/calendar',
+    }
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5
+    COMPRESS_STATIC_PRECOMPRESSED = True    # app/utils/precompress_static.py の .br / .gz を返す
+
+    # 静的ファイルの URL に内容ハッシュを付けて1年間キャッシュ（アップロード画像も長期キャッシュ）
+    STATIC_FINGERPRINT = True
+
+    # Jinja のバイトコードキャッシュ（保存先の既定は instance/jinja_cache）と起動時ウォームアップ
+    TEMPLATE_BYTECODE_CACHE = True
+    TEMPLATE_BYTECODE_CACHE_DIR = None
+    TEMPLATE_WARMUP = False
+
+    # SQLite 接続プロファイル（接続オープン時に PRAGMA として適用）
+    DB_PROFILE = os.environ.get('DB_PROFILE') or 'balanced'
+    DB_PROFILES = {
+        # 電源断でもコミット済みデータを失わない（WAL + 毎コミット fsync）
+        'durable': {
+            'busy_timeout': 5000,
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'cache_size': -2000,        # 2MB
+            'mmap_size': 0,
+            'temp_store': 'DEFAULT',
+        },
+        # 通常運用向け（WAL + チェックポイント時のみ fsync）
+        'balanced': {
+            'busy_timeout': 5000,
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -16000,       # 16MB
+            'mmap_size': 64 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        # 参照中心（大きなページキャッシュと mmap で読み取りを優先）
+        'read_heavy': {
+            'busy_timeout': 10000,
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,       # 64MB
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+    }
+
     # アップロード設定
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
@@ -16,12 +94,14 @@ class DevelopmentConfig(Config):
     """開発環境設定"""
     DEBUG = True
     TESTING = False
+    SQL_NPLUS1_DETECT = True
 
 
 class ProductionConfig(Config):
     """本番環境設定"""
     DEBUG = False
     TESTING = False
+    TEMPLATE_WARMUP = True
     SECRET_KEY = os.environ.get('SECRET_KEY')
 
 
@@ -29,6 +109,9 @@ class TestingConfig(Config):
     """テスト環境設定"""
     TESTING = True
     DATABASE = ':memory:'
+    SQL_NPLUS1_DETECT = True
+    SQL_NPLUS1_RAISE = True
+    TEMPLATE_BYTECODE_CACHE = False
 
 
 config = {
@@ -1,33 +1,380 @@
 import sqlite3
 import os
-from flask import g, current_app
+import re
+import time
+import random
+import hashlib
+import queue
+import threading
+from collections import deque
+from urllib.parse import quote
+from flask import g, current_app, request, has_request_context
+from app.utils.sql_trace import TracedConnection, get_stats
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+# 適用済みマイグレーションの台帳
+_LEDGER_DDL = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        filename VARCHAR(255) PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP DEFAULT (datetime('now', '+9 hours'))
+    )
+'''
+
+# 接続プロファイルで設定できる PRAGMA（適用順）
+PROFILE_PRAGMAS = ('busy_timeout', 'journal_mode', 'synchronous',
+                   'cache_size', 'mmap_size', 'temp_store')
+
+# 読み取り専用接続で扱うHTTPメソッド
+READ_ONLY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# 書き込みトランザクションを開始する文
+_WRITE_STATEMENT = re.compile(
+    r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|BEGIN)\b', re.IGNORECASE
+)
+
+# 台帳導入前のマイグレーション再実行で無視してよいエラー
+_IGNORABLE_MIGRATION_ERRORS = ('already exists', 'duplicate column name')
+
+
+class ConnectionPool:
+    """ワーカー（プロセス）単位のSQLite接続プール
+
+    リクエスト終了時に接続を閉じずにプールへ戻し、次のリクエストで再利用する。
+    ステートメントキャッシュとページキャッシュが温まった状態を保てる。
+    プールが空なら新規接続を作り、満杯なら返却された接続を閉じる。
+    """
+
+    def __init__(self, database, size=5, cached_statements=128, pre_ping=True,
+                 pragmas=None, readonly=False):
+        self.database = database
+        self.pragmas = pragmas or {}
+        self.readonly = readonly
+        self.size = size
+        self.cached_statements = cached_statements
+        self.pre_ping = pre_ping
+        self._reset()
+
+    def _reset(self):
+        # fork 後に親プロセスの接続を引き継がないようPIDごとに作り直す
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size) if self.size > 0 else None
+
+    def _connect(self):
+        if self.readonly:
+            # 読み取り専用で開く（journal_mode は書き込み側が設定済み）
+            conn = sqlite3.connect(
+                f"file:{quote(self.database)}?mode=ro",
+                uri=True,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=self.cached_statements,
+                check_same_thread=False
+            )
+            pragmas = {k: v for k, v in self.pragmas.items() if k != 'journal_mode'}
+            apply_pragmas(conn, pragmas)
+            conn.execute('PRAGMA query_only = ON')
+        else:
+            conn = sqlite3.connect(
+                self.database,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                cached_statements=self.cached_statements,
+                check_same_thread=False
+            )
+            apply_pragmas(conn, self.pragmas)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _is_healthy(self, conn):
+        """プールから取り出した接続が使えるか確認"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self.pre_ping:
+                conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """接続を取得（プールに空きがなければ新規作成）"""
+        if self._pid != os.getpid():
+            self._reset()
+        while self._idle is not None:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(conn):
+                return conn
+            conn.close()
+        return self._connect()
+
+    def release(self, conn):
+        """接続をプールへ返却（未完了のトランザクションは破棄）"""
+        if self._idle is None or self._pid != os.getpid():
+            conn.close()
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            conn.close()
+
+    def close_all(self):
+        """プール内の接続をすべて閉じる"""
+        while self._idle is not None:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class WriteQueue:
+    """書き込みトランザクションを到着順に1つずつ通すキュー
+
+    同一プロセス内の書き込みをここで直列化し、SQLite の書き込みロック競合
+    （database is locked）をプロセス内では発生させない。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._active = False
+
+    def acquire(self, timeout=None):
+        """書き込み権を取得（timeout 秒以内に順番が来なければ False）"""
+        with self._lock:
+            if not self._active and not self._waiters:
+                self._active = True
+                return True
+            turn = threading.Event()
+            self._waiters.append(turn)
+        if turn.wait(timeout):
+            return True
+        with self._lock:
+            # タイムアウト直前に順番が回ってきた場合は受け取る
+            if turn.is_set():
+                return True
+            self._waiters.remove(turn)
+        return False
+
+    def release(self):
+        """書き込み権を次の待機者へ渡す"""
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._active = False
+
+
+class WriterConnection:
+    """書き込み用接続のラッパー
+
+    最初の書き込み文で WriteQueue の順番を待ってから BEGIN IMMEDIATE で
+    トランザクションを開始し、commit / rollback で次の書き込みに譲る。
+    他プロセスとの競合で BEGIN IMMEDIATE が失敗した場合は指数バックオフで再試行する。
+    それ以外の属性は元の sqlite3.Connection にそのまま委譲する。
+    """
+
+    def __init__(self, conn, write_queue, timeout=10.0, retries=5, backoff=0.05):
+        self._conn = conn
+        self._write_queue = write_queue
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._holding = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        """元の sqlite3.Connection"""
+        return self._conn
+
+    def _begin_write(self, sql):
+        if not self._write_queue.acquire(self._timeout):
+            raise sqlite3.OperationalError('database is locked (write queue timeout)')
+        self._holding = True
+        if self._conn.in_transaction:
+            return
+        explicit_begin = sql.lstrip()[:5].upper() == 'BEGIN'
+        begin_sql = sql if explicit_begin else 'BEGIN IMMEDIATE'
+        for attempt in range(self._retries + 1):
+            try:
+                self._conn.execute(begin_sql)
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e).lower() and 'busy' not in str(e).lower():
+                    self._release()
+                    raise
+                if attempt == self._retries:
+                    self._release()
+                    raise
+                delay = self._backoff * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay))
+        return explicit_begin
+
+    def _release(self):
+        if self._holding:
+            self._holding = False
+            self._write_queue.release()
+
+    def execute(self, sql, parameters=()):
+        if not self._holding and _WRITE_STATEMENT.match(sql):
+            if self._begin_write(sql):
+                return self._conn.cursor()
+        return self._conn.execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not self._holding and _WRITE_STATEMENT.match(sql):
+            self._begin_write(sql)
+        return self._conn.executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        try:
+            self._conn.commit()
+        finally:
+            self._release()
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        finally:
+            self._release()
+
+    def close(self):
+        self.rollback()
+        self._conn.close()
+
+
+_pool_lock = threading.Lock()
+
+
+def apply_pragmas(conn, pragmas):
+    """接続プロファイルの PRAGMA を接続に適用"""
+    for name in PROFILE_PRAGMAS:
+        if name in pragmas:
+            conn.execute(f'PRAGMA {name} = {pragmas[name]}')
+
+
+def get_profile(app=None):
+    """設定 DB_PROFILE に対応する PRAGMA 設定を取得"""
+    app = app or current_app
+    name = app.config.get('DB_PROFILE')
+    if not name:
+        return {}
+    profiles = app.config.get('DB_PROFILES', {})
+    if name not in profiles:
+        raise ValueError(f"Unknown DB_PROFILE: {name} (choose from {', '.join(profiles)})")
+    return profiles[name]
+
+
+def get_pool(app=None, readonly=False):
+    """アプリケーションの接続プールを取得（初回のみ作成）
+
+    readonly=True で読み取り専用接続（mode=ro / query_only）のプールを返す。
+    """
+    app = app or current_app
+    key = 'sqlite_read_pool' if readonly else 'sqlite_pool'
+    pool = app.extensions.get(key)
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    app.config['DATABASE'],
+                    size=app.config.get('DB_POOL_SIZE', 5),
+                    cached_statements=app.config.get('DB_STATEMENT_CACHE_SIZE', 128),
+                    pre_ping=app.config.get('DB_POOL_PRE_PING', True),
+                    pragmas=get_profile(app),
+                    readonly=readonly
+                )
+                app.extensions[key] = pool
+    return pool
+
+
+def get_write_queue(app=None):
+    """アプリケーションの書き込みキューを取得（初回のみ作成）"""
+    app = app or current_app
+    write_queue = app.extensions.get('sqlite_write_queue')
+    if write_queue is None:
+        with _pool_lock:
+            write_queue = app.extensions.setdefault('sqlite_write_queue', WriteQueue())
+    return write_queue
+
+
+def _use_read_connection():
+    """現在のリクエストを読み取り専用接続で処理するか"""
+    if not has_request_context() or request.method not in READ_ONLY_METHODS:
+        return False
+    config = current_app.config
+    return config.get('DB_READ_WRITE_SPLIT', True) and config['DATABASE'] != ':memory:'
 
 
 def get_db():
-    """データベース接続を取得"""
+    """データベース接続を取得（リクエスト内では同じ接続を使い回す）
+
+    GET / HEAD リクエストでは読み取り専用接続を、それ以外（POST・起動処理・
+    スクリプト）では書き込みが直列化される接続を返すため、モデルは get_db() を
+    呼ぶだけで適切な側に振り分けられる。
+    """
     if 'db' not in g:
-        g.db = sqlite3.connect(
-            current_app.config['DATABASE'],
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
+        if _use_read_connection():
+            g.db = get_pool(readonly=True).acquire()
+        else:
+            config = current_app.config
+            g.db = WriterConnection(
+                get_pool().acquire(),
+                get_write_queue(),
+                timeout=config.get('DB_WRITE_TIMEOUT', 10.0),
+                retries=config.get('DB_WRITE_RETRIES', 5),
+                backoff=config.get('DB_WRITE_BACKOFF', 0.05)
+            )
+        stats = get_stats()
+        if stats is not None:
+            g.db = TracedConnection(g.db, stats)
     return g.db
 
 
 def close_db(e=None):
-    """データベース接続を閉じる"""
+    """データベース接続をプールへ返却"""
     db = g.pop('db', None)
-    if db is not None:
-        db.close()
+    if db is None:
+        return
+    if isinstance(db, TracedConnection):
+        db = db.wrapped
+    if isinstance(db, WriterConnection):
+        # 書き込み途中で終わったリクエストのトランザクションを破棄して順番を譲る
+        if db.in_transaction or db._holding:
+            db.rollback()
+        get_pool().release(db.raw)
+    else:
+        get_pool(readonly=True).release(db)
 
 
 def init_db(app):
-    """データベースを初期化"""
+    """データベースを初期化
+
+    スキーマが最新（PRAGMA user_version が最新マイグレーション番号）であれば
+    DDL を一切実行せずに終了する。
+    """
+    # teardown関数を登録
+    app.teardown_appcontext(close_db)
+
     with app.app_context():
         # instanceディレクトリが存在しない場合は作成
         os.makedirs(app.instance_path, exist_ok=True)
 
         db = get_db()
+        migration_files = _list_migration_files()
+        target_version = _migration_version(migration_files[-1]) if migration_files else 0
+        current_version = db.execute('PRAGMA user_version').fetchone()[0]
+        if current_version and current_version >= target_version:
+            return
+
         with app.open_resource('schema.sql', mode='r', encoding='utf-8') as f:
             db.cursor().executescript(f.read())
         db.commit()
@@ -37,34 +384,92 @@ def init_db(app):
 
         print(f"Database initialized at: {app.config['DATABASE']}")
 
-    # teardown関数を登録
-    app.teardown_appcontext(close_db)
-
 
 def run_migrations(app, db):
-    """マイグレーションファイルを実行"""
-    migrations_dir = os.path.join(os.path.dirname(__file__), 'migrations')
-    if not os.path.exists(migrations_dir):
+    """未適用のマイグレーションファイルを1トランザクションで実行
+
+    適用済みのファイルは schema_migrations に記録され、次回以降は実行されない。
+    台帳がまだ無いDB（台帳導入前のDB・新規DB）では、既存マイグレーションを
+    従来どおり「既に存在する」エラーを無視しながら一度だけ再実行して台帳に記録する。
+    """
+    migration_files = _list_migration_files()
+    if not migration_files:
         return
 
-    # マイグレーションファイルをソート順で取得
-    migration_files = sorted([
-        f for f in os.listdir(migrations_dir)
-        if f.endswith('.sql')
-    ])
+    # 複数ワーカーが同時に起動しても1つだけが適用するよう書き込みロックを先に取る
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        adopting = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+        ).fetchone() is None
+        db.execute(_LEDGER_DDL)
+        applied = {
+            row['filename']: row['checksum']
+            for row in db.execute('SELECT filename, checksum FROM schema_migrations')
+        }
 
-    for filename in migration_files:
-        filepath = os.path.join(migrations_dir, filename)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
+        for filename in migration_files:
+            with open(os.path.join(MIGRATIONS_DIR, filename), 'r', encoding='utf-8') as f:
                 sql = f.read()
-            db.cursor().executescript(sql)
-            db.commit()
+            checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+            if filename in applied:
+                if applied[filename] != checksum:
+                    print(f"Migration warning for {filename}: checksum mismatch with applied version")
+                continue
+
+            for statement in _split_statements(sql):
+                if adopting:
+                    _execute_tolerant(db, filename, statement)
+                else:
+                    db.execute(statement)
+            db.execute(
+                'INSERT INTO schema_migrations (filename, checksum) VALUES (?, ?)',
+                (filename, checksum)
+            )
             print(f"Migration applied: {filename}")
-        except Exception as e:
-            # 既にテーブルが存在する場合などのエラーは無視
-            if "already exists" not in str(e).lower():
-                print(f"Migration warning for {filename}: {e}")
+
+        db.execute(f'PRAGMA user_version = {_migration_version(migration_files[-1])}')
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _list_migration_files():
+    """マイグレーションファイル名をソート順で取得"""
+    if not os.path.exists(MIGRATIONS_DIR):
+        return []
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith('.sql'))
+
+
+def _migration_version(filename):
+    """'014_add_supplements.sql' → 14"""
+    return int(filename.split('_', 1)[0])
+
+
+def _split_statements(sql):
+    """SQLスクリプトを文単位に分割"""
+    statements = []
+    buffer = ''
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ''
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def _execute_tolerant(db, filename, statement):
+    """台帳導入前のマイグレーション文を実行（既に適用済みのエラーは無視）"""
+    try:
+        db.execute(statement)
+    except sqlite3.OperationalError as e:
+        if not any(msg in str(e).lower() for msg in _IGNORABLE_MIGRATION_ERRORS):
+            print(f"Migration warning for {filename}: {e}")
 
 
 def query_db(query, args=(), one=False):
@@ -0,0 +1,17 @@
+-- 関連テーブルの絞り込みと一覧の並び順のためのインデックス
+-- Migration: 015_add_relation_and_ordering_indexes
+-- benchmarks/index_advisor.py の推奨から効果を確認したものを採用
+
+-- 植え付けに関連する日記・タスク（DiaryEntry.get_by_location / get_by_location_crop,
+-- Task.get_incomplete_tasks_for_entity など）
+CREATE INDEX IF NOT EXISTS idx_diary_relations_location_crop ON diary_relations(location_crop_id);
+CREATE INDEX IF NOT EXISTS idx_task_relations_location_crop ON task_relations(location_crop_id);
+
+-- 植え付けごとの最新の栽培記録（サムネイル用の相関サブクエリ・栽培記録一覧）
+CREATE INDEX IF NOT EXISTS idx_planting_records_location_crop_date
+    ON planting_records(location_crop_id, recorded_at, created_at);
+
+-- 日記一覧・最近の日記の並び順
+CREATE INDEX IF NOT EXISTS idx_diary_entries_date_created ON diary_entries(entry_date, created_at);
+
+ANALYZE;
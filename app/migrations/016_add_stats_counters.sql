@@ -0,0 +1,218 @@
+-- ダッシュボード統計のカウンターテーブル（トリガーで更新）
+-- Migration: 016_add_stats_counters
+--
+-- 件数は各モデルの count 系メソッドと同じ条件で数える:
+--   crops / locations / diary_entries : 全件
+--   plantings.active : status = 'active' かつ作物・場所が存在する植え付け（Planting.count_active）
+--   harvests         : 植え付け・作物・場所がすべて存在する収穫記録（Harvest.count）
+--   tasks.<status>   : ステータス別のタスク数（Task.count(status)）
+-- 外部キーは無効なので、作物・場所・植え付けの追加／削除で結合の成否が変わる分も
+-- それぞれのトリガーで加減する。ID を直接書き換えた場合などは Stats.rebuild() で再集計する。
+
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name VARCHAR(50) PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- 既存データから初期値を集計
+INSERT OR REPLACE INTO stats_counters (name, value)
+SELECT 'crops', COUNT(*) FROM crops
+UNION ALL
+SELECT 'locations', COUNT(*) FROM locations
+UNION ALL
+SELECT 'diary_entries', COUNT(*) FROM diary_entries
+UNION ALL
+SELECT 'plantings.active', COUNT(*) FROM plantings lc
+    JOIN crops c ON lc.crop_id = c.id
+    JOIN locations l ON lc.location_id = l.id
+    WHERE lc.status = 'active'
+UNION ALL
+SELECT 'harvests', COUNT(*) FROM harvests h
+    JOIN plantings lc ON h.location_crop_id = lc.id
+    JOIN crops c ON lc.crop_id = c.id
+    JOIN locations l ON lc.location_id = l.id
+UNION ALL
+SELECT 'tasks.' || COALESCE(status, ''), COUNT(*) FROM tasks GROUP BY status;
+
+-- 作物
+CREATE TRIGGER IF NOT EXISTS trg_stats_crops_insert AFTER INSERT ON crops
+BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'crops';
+    UPDATE stats_counters SET value = value + (
+        SELECT COUNT(*) FROM plantings lc
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.crop_id = NEW.id AND lc.status = 'active'
+    ) WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value + (
+        SELECT COUNT(*) FROM harvests h
+        JOIN plantings lc ON h.location_crop_id = lc.id
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.crop_id = NEW.id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_crops_delete AFTER DELETE ON crops
+BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'crops';
+    UPDATE stats_counters SET value = value - (
+        SELECT COUNT(*) FROM plantings lc
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.crop_id = OLD.id AND lc.status = 'active'
+    ) WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value - (
+        SELECT COUNT(*) FROM harvests h
+        JOIN plantings lc ON h.location_crop_id = lc.id
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.crop_id = OLD.id
+    ) WHERE name = 'harvests';
+END;
+
+-- 場所
+CREATE TRIGGER IF NOT EXISTS trg_stats_locations_insert AFTER INSERT ON locations
+BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'locations';
+    UPDATE stats_counters SET value = value + (
+        SELECT COUNT(*) FROM plantings lc
+        JOIN crops c ON lc.crop_id = c.id
+        WHERE lc.location_id = NEW.id AND lc.status = 'active'
+    ) WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value + (
+        SELECT COUNT(*) FROM harvests h
+        JOIN plantings lc ON h.location_crop_id = lc.id
+        JOIN crops c ON lc.crop_id = c.id
+        WHERE lc.location_id = NEW.id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_locations_delete AFTER DELETE ON locations
+BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'locations';
+    UPDATE stats_counters SET value = value - (
+        SELECT COUNT(*) FROM plantings lc
+        JOIN crops c ON lc.crop_id = c.id
+        WHERE lc.location_id = OLD.id AND lc.status = 'active'
+    ) WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value - (
+        SELECT COUNT(*) FROM harvests h
+        JOIN plantings lc ON h.location_crop_id = lc.id
+        JOIN crops c ON lc.crop_id = c.id
+        WHERE lc.location_id = OLD.id
+    ) WHERE name = 'harvests';
+END;
+
+-- 植え付け
+CREATE TRIGGER IF NOT EXISTS trg_stats_plantings_insert AFTER INSERT ON plantings
+WHEN EXISTS (SELECT 1 FROM crops WHERE id = NEW.crop_id)
+ AND EXISTS (SELECT 1 FROM locations WHERE id = NEW.location_id)
+BEGIN
+    UPDATE stats_counters SET value = value + (NEW.status = 'active')
+    WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value + (
+        SELECT COUNT(*) FROM harvests WHERE location_crop_id = NEW.id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_plantings_delete AFTER DELETE ON plantings
+WHEN EXISTS (SELECT 1 FROM crops WHERE id = OLD.crop_id)
+ AND EXISTS (SELECT 1 FROM locations WHERE id = OLD.location_id)
+BEGIN
+    UPDATE stats_counters SET value = value - (OLD.status = 'active')
+    WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value - (
+        SELECT COUNT(*) FROM harvests WHERE location_crop_id = OLD.id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_plantings_update
+AFTER UPDATE OF id, crop_id, location_id, status ON plantings
+BEGIN
+    UPDATE stats_counters SET value = value
+        - (OLD.status = 'active'
+           AND EXISTS (SELECT 1 FROM crops WHERE id = OLD.crop_id)
+           AND EXISTS (SELECT 1 FROM locations WHERE id = OLD.location_id))
+        + (NEW.status = 'active'
+           AND EXISTS (SELECT 1 FROM crops WHERE id = NEW.crop_id)
+           AND EXISTS (SELECT 1 FROM locations WHERE id = NEW.location_id))
+    WHERE name = 'plantings.active';
+    UPDATE stats_counters SET value = value
+        - (EXISTS (SELECT 1 FROM crops WHERE id = OLD.crop_id)
+           AND EXISTS (SELECT 1 FROM locations WHERE id = OLD.location_id))
+          * (SELECT COUNT(*) FROM harvests WHERE location_crop_id = OLD.id)
+        + (EXISTS (SELECT 1 FROM crops WHERE id = NEW.crop_id)
+           AND EXISTS (SELECT 1 FROM locations WHERE id = NEW.location_id))
+          * (SELECT COUNT(*) FROM harvests WHERE location_crop_id = NEW.id)
+    WHERE name = 'harvests';
+END;
+
+-- 収穫記録
+CREATE TRIGGER IF NOT EXISTS trg_stats_harvests_insert AFTER INSERT ON harvests
+BEGIN
+    UPDATE stats_counters SET value = value + EXISTS (
+        SELECT 1 FROM plantings lc
+        JOIN crops c ON lc.crop_id = c.id
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.id = NEW.location_crop_id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_harvests_delete AFTER DELETE ON harvests
+BEGIN
+    UPDATE stats_counters SET value = value - EXISTS (
+        SELECT 1 FROM plantings lc
+        JOIN crops c ON lc.crop_id = c.id
+        JOIN locations l ON lc.location_id = l.id
+        WHERE lc.id = OLD.location_crop_id
+    ) WHERE name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_harvests_update
+AFTER UPDATE OF location_crop_id ON harvests
+BEGIN
+    UPDATE stats_counters SET value = value
+        - EXISTS (
+            SELECT 1 FROM plantings lc
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE lc.id = OLD.location_crop_id
+        )
+        + EXISTS (
+            SELECT 1 FROM plantings lc
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE lc.id = NEW.location_crop_id
+        )
+    WHERE name = 'harvests';
+END;
+
+-- 日記
+CREATE TRIGGER IF NOT EXISTS trg_stats_diary_entries_insert AFTER INSERT ON diary_entries
+BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'diary_entries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_diary_entries_delete AFTER DELETE ON diary_entries
+BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'diary_entries';
+END;
+
+-- タスク（ステータス別）
+CREATE TRIGGER IF NOT EXISTS trg_stats_tasks_insert AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO stats_counters (name, value) VALUES ('tasks.' || COALESCE(NEW.status, ''), 1)
+    ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_tasks_delete AFTER DELETE ON tasks
+BEGIN
+    UPDATE stats_counters SET value = value - 1
+    WHERE name = 'tasks.' || COALESCE(OLD.status, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_tasks_update AFTER UPDATE OF status ON tasks
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE stats_counters SET value = value - 1
+    WHERE name = 'tasks.' || COALESCE(OLD.status, '');
+    INSERT INTO stats_counters (name, value) VALUES ('tasks.' || COALESCE(NEW.status, ''), 1)
+    ON CONFLICT (name) DO UPDATE SET value = value + 1;
+END;
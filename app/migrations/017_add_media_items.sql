@@ -0,0 +1,277 @@
+-- 画像の一覧（ダッシュボードのカルーセル・写真ギャラリー用、トリガーで更新）
+-- Migration: 017_add_media_items
+--
+-- 作物・場所・日記・収穫記録・栽培記録のうち画像のあるものを1テーブルにまとめる。
+-- 収穫記録・栽培記録は植え付けと作物を結合できるものだけを含め、作物名などの表示用の列を持つ
+-- （従来のカルーセルの UNION ALL と同じ条件）。
+-- sort_date は NULL の代わりに '' を入れ、(sort_date, entity_type, entity_id) でキーセット
+-- ページングできるようにする。
+
+CREATE TABLE IF NOT EXISTS media_items (
+    entity_type VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    image_path VARCHAR(255) NOT NULL,
+    label TEXT,
+    sort_date TEXT NOT NULL DEFAULT '',
+    crop_name VARCHAR(100),
+    variety VARCHAR(100),
+    icon_path TEXT,
+    image_color TEXT,
+    PRIMARY KEY (entity_type, entity_id)
+) WITHOUT ROWID;
+
+-- WITHOUT ROWID なので (sort_date, entity_type, entity_id) の順に並ぶ
+CREATE INDEX IF NOT EXISTS idx_media_items_sort_date ON media_items(sort_date);
+
+-- 既存データの取り込み
+INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+SELECT 'crop', id, image_path, name, COALESCE(CAST(created_at AS TEXT), ''),
+       name, variety, icon_path, image_color
+FROM crops WHERE image_path IS NOT NULL AND image_path != ''
+UNION ALL
+SELECT 'location', id, image_path, name, COALESCE(CAST(created_at AS TEXT), ''),
+       NULL, NULL, NULL, NULL
+FROM locations WHERE image_path IS NOT NULL AND image_path != ''
+UNION ALL
+SELECT 'diary', id, image_path, title, COALESCE(CAST(entry_date AS TEXT), ''),
+       NULL, NULL, NULL, NULL
+FROM diary_entries WHERE image_path IS NOT NULL AND image_path != ''
+UNION ALL
+SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+       c.name, c.variety, c.icon_path, c.image_color
+FROM harvests h
+JOIN plantings p ON h.location_crop_id = p.id
+JOIN crops c ON p.crop_id = c.id
+WHERE h.image_path IS NOT NULL AND h.image_path != ''
+UNION ALL
+SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+       c.name, c.variety, c.icon_path, c.image_color
+FROM planting_records pr
+JOIN plantings p ON pr.location_crop_id = p.id
+JOIN crops c ON p.crop_id = c.id
+WHERE pr.image_path IS NOT NULL AND pr.image_path != '';
+
+-- 作物（自身の画像と、その作物の収穫記録・栽培記録の表示用の列）
+CREATE TRIGGER IF NOT EXISTS trg_media_crops_insert AFTER INSERT ON crops
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'crop', NEW.id, NEW.image_path, NEW.name, COALESCE(CAST(NEW.created_at AS TEXT), ''),
+           NEW.name, NEW.variety, NEW.icon_path, NEW.image_color
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE p.crop_id = NEW.id AND h.image_path IS NOT NULL AND h.image_path != '';
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE p.crop_id = NEW.id AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_crops_update
+AFTER UPDATE OF id, name, variety, icon_path, image_color, image_path, created_at ON crops
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'crop' AND entity_id = OLD.id;
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'crop', NEW.id, NEW.image_path, NEW.name, COALESCE(CAST(NEW.created_at AS TEXT), ''),
+           NEW.name, NEW.variety, NEW.icon_path, NEW.image_color
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id IN (
+        SELECT id FROM harvests WHERE location_crop_id IN (SELECT id FROM plantings WHERE crop_id IN (OLD.id, NEW.id))
+    );
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id IN (
+        SELECT id FROM planting_records WHERE location_crop_id IN (SELECT id FROM plantings WHERE crop_id IN (OLD.id, NEW.id))
+    );
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE p.crop_id IN (OLD.id, NEW.id) AND h.image_path IS NOT NULL AND h.image_path != '';
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE p.crop_id IN (OLD.id, NEW.id) AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_crops_delete AFTER DELETE ON crops
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'crop' AND entity_id = OLD.id;
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id IN (
+        SELECT id FROM harvests WHERE location_crop_id IN (SELECT id FROM plantings WHERE crop_id = OLD.id)
+    );
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id IN (
+        SELECT id FROM planting_records WHERE location_crop_id IN (SELECT id FROM plantings WHERE crop_id = OLD.id)
+    );
+END;
+
+-- 場所
+CREATE TRIGGER IF NOT EXISTS trg_media_locations_insert AFTER INSERT ON locations
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'location', NEW.id, NEW.image_path, NEW.name, COALESCE(CAST(NEW.created_at AS TEXT), ''),
+           NULL, NULL, NULL, NULL
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_locations_update
+AFTER UPDATE OF id, name, image_path, created_at ON locations
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'location' AND entity_id = OLD.id;
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'location', NEW.id, NEW.image_path, NEW.name, COALESCE(CAST(NEW.created_at AS TEXT), ''),
+           NULL, NULL, NULL, NULL
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_locations_delete AFTER DELETE ON locations
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'location' AND entity_id = OLD.id;
+END;
+
+-- 日記
+CREATE TRIGGER IF NOT EXISTS trg_media_diary_entries_insert AFTER INSERT ON diary_entries
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'diary', NEW.id, NEW.image_path, NEW.title, COALESCE(CAST(NEW.entry_date AS TEXT), ''),
+           NULL, NULL, NULL, NULL
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_diary_entries_update
+AFTER UPDATE OF id, title, image_path, entry_date ON diary_entries
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'diary' AND entity_id = OLD.id;
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'diary', NEW.id, NEW.image_path, NEW.title, COALESCE(CAST(NEW.entry_date AS TEXT), ''),
+           NULL, NULL, NULL, NULL
+    WHERE NEW.image_path IS NOT NULL AND NEW.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_diary_entries_delete AFTER DELETE ON diary_entries
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'diary' AND entity_id = OLD.id;
+END;
+
+-- 植え付け（結合できる収穫記録・栽培記録が変わる）
+CREATE TRIGGER IF NOT EXISTS trg_media_plantings_insert AFTER INSERT ON plantings
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE h.location_crop_id = NEW.id AND h.image_path IS NOT NULL AND h.image_path != '';
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE pr.location_crop_id = NEW.id AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_plantings_update AFTER UPDATE OF id, crop_id ON plantings
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id IN (
+        SELECT id FROM harvests WHERE location_crop_id IN (OLD.id, NEW.id)
+    );
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id IN (
+        SELECT id FROM planting_records WHERE location_crop_id IN (OLD.id, NEW.id)
+    );
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE h.location_crop_id IN (OLD.id, NEW.id) AND h.image_path IS NOT NULL AND h.image_path != '';
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE pr.location_crop_id IN (OLD.id, NEW.id) AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_plantings_delete AFTER DELETE ON plantings
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id IN (
+        SELECT id FROM harvests WHERE location_crop_id = OLD.id
+    );
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id IN (
+        SELECT id FROM planting_records WHERE location_crop_id = OLD.id
+    );
+END;
+
+-- 収穫記録
+CREATE TRIGGER IF NOT EXISTS trg_media_harvests_insert AFTER INSERT ON harvests
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE h.id = NEW.id AND h.image_path IS NOT NULL AND h.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_harvests_update
+AFTER UPDATE OF id, location_crop_id, image_path, harvest_date ON harvests
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id IN (OLD.id, NEW.id);
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'harvest', h.id, h.image_path, '', COALESCE(CAST(h.harvest_date AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM harvests h
+    JOIN plantings p ON h.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE h.id = NEW.id AND h.image_path IS NOT NULL AND h.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_harvests_delete AFTER DELETE ON harvests
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'harvest' AND entity_id = OLD.id;
+END;
+
+-- 栽培記録
+CREATE TRIGGER IF NOT EXISTS trg_media_planting_records_insert AFTER INSERT ON planting_records
+BEGIN
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE pr.id = NEW.id AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_planting_records_update
+AFTER UPDATE OF id, location_crop_id, image_path, recorded_at ON planting_records
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id IN (OLD.id, NEW.id);
+    INSERT OR REPLACE INTO media_items (entity_type, entity_id, image_path, label, sort_date, crop_name, variety, icon_path, image_color)
+    SELECT 'planting_record', pr.id, pr.image_path, '', COALESCE(CAST(pr.recorded_at AS TEXT), ''),
+           c.name, c.variety, c.icon_path, c.image_color
+    FROM planting_records pr
+    JOIN plantings p ON pr.location_crop_id = p.id
+    JOIN crops c ON p.crop_id = c.id
+    WHERE pr.id = NEW.id AND pr.image_path IS NOT NULL AND pr.image_path != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_media_planting_records_delete AFTER DELETE ON planting_records
+BEGIN
+    DELETE FROM media_items WHERE entity_type = 'planting_record' AND entity_id = OLD.id;
+END;
@@ -0,0 +1,184 @@
+-- テーブルごとの更新バージョン（フラグメントキャッシュのキー用、トリガーで更新）
+-- Migration: 018_add_table_versions
+--
+-- 行の追加・更新・削除のたびに該当テーブルの version を 1 増やす。
+-- app/utils/fragment_cache.py はキャッシュキーに依存テーブルの version を含めるので、
+-- 書き込みがあったテーブルに依存するフラグメントだけが描画し直される。
+-- PRAGMA data_version は他の接続からの変更しか検知できず、テーブルの区別もないため使わない。
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_versions (table_name, version) VALUES
+    ('crops', 0),
+    ('locations', 0),
+    ('plantings', 0),
+    ('planting_records', 0),
+    ('harvests', 0),
+    ('diary_entries', 0),
+    ('diary_relations', 0),
+    ('tasks', 0),
+    ('task_relations', 0),
+    ('supplements', 0);
+
+-- 作物
+CREATE TRIGGER IF NOT EXISTS trg_version_crops_insert AFTER INSERT ON crops
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'crops';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_crops_update AFTER UPDATE ON crops
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'crops';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_crops_delete AFTER DELETE ON crops
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'crops';
+END;
+
+-- 場所
+CREATE TRIGGER IF NOT EXISTS trg_version_locations_insert AFTER INSERT ON locations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'locations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_locations_update AFTER UPDATE ON locations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'locations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_locations_delete AFTER DELETE ON locations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'locations';
+END;
+
+-- 植え付け
+CREATE TRIGGER IF NOT EXISTS trg_version_plantings_insert AFTER INSERT ON plantings
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'plantings';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_plantings_update AFTER UPDATE ON plantings
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'plantings';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_plantings_delete AFTER DELETE ON plantings
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'plantings';
+END;
+
+-- 栽培記録
+CREATE TRIGGER IF NOT EXISTS trg_version_planting_records_insert AFTER INSERT ON planting_records
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'planting_records';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_planting_records_update AFTER UPDATE ON planting_records
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'planting_records';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_planting_records_delete AFTER DELETE ON planting_records
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'planting_records';
+END;
+
+-- 収穫記録
+CREATE TRIGGER IF NOT EXISTS trg_version_harvests_insert AFTER INSERT ON harvests
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_harvests_update AFTER UPDATE ON harvests
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'harvests';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_harvests_delete AFTER DELETE ON harvests
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'harvests';
+END;
+
+-- 日記
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_entries_insert AFTER INSERT ON diary_entries
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_entries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_entries_update AFTER UPDATE ON diary_entries
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_entries';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_entries_delete AFTER DELETE ON diary_entries
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_entries';
+END;
+
+-- 日記の関連
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_relations_insert AFTER INSERT ON diary_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_relations_update AFTER UPDATE ON diary_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_diary_relations_delete AFTER DELETE ON diary_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'diary_relations';
+END;
+
+-- タスク
+CREATE TRIGGER IF NOT EXISTS trg_version_tasks_insert AFTER INSERT ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'tasks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_tasks_update AFTER UPDATE ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'tasks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_tasks_delete AFTER DELETE ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'tasks';
+END;
+
+-- タスクの関連
+CREATE TRIGGER IF NOT EXISTS trg_version_task_relations_insert AFTER INSERT ON task_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'task_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_task_relations_update AFTER UPDATE ON task_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'task_relations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_task_relations_delete AFTER DELETE ON task_relations
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'task_relations';
+END;
+
+-- 補足情報
+CREATE TRIGGER IF NOT EXISTS trg_version_supplements_insert AFTER INSERT ON supplements
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'supplements';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_supplements_update AFTER UPDATE ON supplements
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'supplements';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_supplements_delete AFTER DELETE ON supplements
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = 'supplements';
+END;
@@ -0,0 +1,16 @@
+-- テーブルごとの最終更新日時（詳細画面の Last-Modified 用）
+-- Migration: 019_add_table_versions_changed_at
+--
+-- 018 のトリガーが version を増やすと、下のトリガーで changed_at が現在時刻（JST）になる。
+-- 各テーブルの updated_at と違い、行の削除も反映される。
+
+ALTER TABLE table_versions ADD COLUMN changed_at TIMESTAMP;
+
+UPDATE table_versions SET changed_at = datetime('now', '+9 hours');
+
+CREATE TRIGGER IF NOT EXISTS trg_table_versions_changed_at
+AFTER UPDATE OF version ON table_versions
+BEGIN
+    UPDATE table_versions SET changed_at = datetime('now', '+9 hours')
+    WHERE table_name = NEW.table_name;
+END;
@@ -0,0 +1,19 @@
+-- 一覧のキーセットページング（無限スクロール API）のためのインデックス
+-- Migration: 020_add_keyset_pagination_indexes
+--
+-- 各一覧は (並び替えキー..., id) < (前ページ最後の値...) で次ページを読むので、
+-- 並び替えキーのインデックスがあれば何ページ目でも途中から読み始められる。
+-- 日記の (entry_date, created_at) は 015 で追加済み。
+
+-- 収穫記録一覧: harvest_date, created_at, id
+DROP INDEX IF EXISTS idx_harvests_date;
+CREATE INDEX IF NOT EXISTS idx_harvests_date_created ON harvests(harvest_date, created_at);
+
+-- 植え付け一覧: 植え付け日のないものを最後にするため IFNULL(planted_date, '') で並べる
+CREATE INDEX IF NOT EXISTS idx_plantings_planted_date_created
+    ON plantings(IFNULL(planted_date, ''), created_at);
+
+-- 作物一覧: created_at, id
+CREATE INDEX IF NOT EXISTS idx_crops_created ON crops(created_at);
+
+ANALYZE;
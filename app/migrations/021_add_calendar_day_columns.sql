@@ -0,0 +1,32 @@
+-- カレンダーの日付範囲検索のための日付列（生成列）とインデックス
+-- Migration: 021_add_calendar_day_columns
+--
+-- カレンダーは各テーブルの日付を DATE(...) で日単位にして月の範囲で絞り込むが、
+-- WHERE DATE(列) BETWEEN ? AND ? は列を関数で包むためインデックスを使えず全件を読む。
+-- DATE(列) を仮想生成列（*_day）にしてインデックスを張り、*_day BETWEEN ? AND ? で
+-- その月の行だけを読むようにする。値は元の列から自動で計算されるので、
+-- 書き込み側の変更は不要（ALTER TABLE で追加できるのは VIRTUAL のみ。SQLite 3.31 以降）。
+-- 型を TEXT にしているのは、PARSE_DECLTYPES で date に変換されず 'YYYY-MM-DD' の文字列で返すため。
+
+ALTER TABLE crops ADD COLUMN created_day TEXT GENERATED ALWAYS AS (DATE(created_at)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_crops_created_day ON crops(created_day);
+
+ALTER TABLE locations ADD COLUMN created_day TEXT GENERATED ALWAYS AS (DATE(created_at)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_locations_created_day ON locations(created_day);
+
+ALTER TABLE diary_entries ADD COLUMN entry_day TEXT GENERATED ALWAYS AS (DATE(entry_date)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_diary_entries_entry_day ON diary_entries(entry_day);
+
+ALTER TABLE plantings ADD COLUMN planted_day TEXT GENERATED ALWAYS AS (DATE(planted_date)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_plantings_planted_day ON plantings(planted_day);
+
+ALTER TABLE harvests ADD COLUMN harvest_day TEXT GENERATED ALWAYS AS (DATE(harvest_date)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_harvests_harvest_day ON harvests(harvest_day);
+
+ALTER TABLE tasks ADD COLUMN due_day TEXT GENERATED ALWAYS AS (DATE(due_date)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_tasks_due_day ON tasks(due_day);
+
+ALTER TABLE planting_records ADD COLUMN recorded_day TEXT GENERATED ALWAYS AS (DATE(recorded_at)) VIRTUAL;
+CREATE INDEX IF NOT EXISTS idx_planting_records_recorded_day ON planting_records(recorded_day);
+
+ANALYZE;
@@ -0,0 +1,260 @@
+-- カレンダーの月ごとの更新バージョン（月単位のキャッシュの無効化用、トリガーで更新）
+-- Migration: 022_add_calendar_month_versions
+--
+-- カレンダーの月データ（Calendar.get_month_data）は app/utils/calendar_cache.py が
+-- 「年月 + その月の version」をキーにキャッシュする。予定の元になる7テーブルへの
+-- 書き込みで、その行の日付（変更前と変更後）が属する月の version だけを 1 増やすので、
+-- 過去の月のキャッシュは関係する書き込みがない限り使い続けられる。
+-- 作物・場所・植え付けは他の予定の表示名（結合先）にもなるため、それを参照する
+-- 植え付け・収穫・栽培記録の月も増やす（外部キーは無効なので、削除で結合から外れる予定も同様）。
+-- 行のない月の version は 0 とみなす。
+
+CREATE TABLE IF NOT EXISTS calendar_month_versions (
+    month TEXT PRIMARY KEY,  -- 'YYYY-MM'
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- 作物（作物名・品種・アイコンは植え付け・収穫・栽培記録の表示にも使う）
+CREATE TRIGGER IF NOT EXISTS trg_calendar_crops_insert
+AFTER INSERT ON crops
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.created_day AS day
+        UNION ALL SELECT planted_day FROM plantings WHERE crop_id = NEW.id
+        UNION ALL SELECT h.harvest_day FROM harvests h JOIN plantings lc ON h.location_crop_id = lc.id WHERE lc.crop_id = NEW.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.crop_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_crops_delete
+AFTER DELETE ON crops
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.created_day AS day
+        UNION ALL SELECT planted_day FROM plantings WHERE crop_id = OLD.id
+        UNION ALL SELECT h.harvest_day FROM harvests h JOIN plantings lc ON h.location_crop_id = lc.id WHERE lc.crop_id = OLD.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.crop_id = OLD.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_crops_update
+AFTER UPDATE OF name, variety, icon_path, image_color, created_at ON crops
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.created_day AS day
+        UNION ALL SELECT NEW.created_day
+        UNION ALL SELECT planted_day FROM plantings WHERE crop_id = NEW.id
+        UNION ALL SELECT h.harvest_day FROM harvests h JOIN plantings lc ON h.location_crop_id = lc.id WHERE lc.crop_id = NEW.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.crop_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- 場所（場所名は植え付け・栽培記録の表示にも使う）
+CREATE TRIGGER IF NOT EXISTS trg_calendar_locations_insert
+AFTER INSERT ON locations
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.created_day AS day
+        UNION ALL SELECT planted_day FROM plantings WHERE location_id = NEW.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.location_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_locations_delete
+AFTER DELETE ON locations
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.created_day AS day
+        UNION ALL SELECT planted_day FROM plantings WHERE location_id = OLD.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.location_id = OLD.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_locations_update
+AFTER UPDATE OF name, created_at ON locations
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.created_day AS day
+        UNION ALL SELECT NEW.created_day
+        UNION ALL SELECT planted_day FROM plantings WHERE location_id = NEW.id
+        UNION ALL SELECT gr.recorded_day FROM planting_records gr JOIN plantings lc ON gr.location_crop_id = lc.id WHERE lc.location_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- 日記
+CREATE TRIGGER IF NOT EXISTS trg_calendar_diary_entries_insert
+AFTER INSERT ON diary_entries
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.entry_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_diary_entries_delete
+AFTER DELETE ON diary_entries
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.entry_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_diary_entries_update
+AFTER UPDATE OF title, entry_date ON diary_entries
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.entry_day AS day
+        UNION ALL SELECT NEW.entry_day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- 植え付け（作物・場所の付け替えは収穫・栽培記録の表示にも影響する）
+CREATE TRIGGER IF NOT EXISTS trg_calendar_plantings_insert
+AFTER INSERT ON plantings
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.planted_day AS day
+        UNION ALL SELECT harvest_day FROM harvests WHERE location_crop_id = NEW.id
+        UNION ALL SELECT recorded_day FROM planting_records WHERE location_crop_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_plantings_delete
+AFTER DELETE ON plantings
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.planted_day AS day
+        UNION ALL SELECT harvest_day FROM harvests WHERE location_crop_id = OLD.id
+        UNION ALL SELECT recorded_day FROM planting_records WHERE location_crop_id = OLD.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_plantings_update
+AFTER UPDATE OF planted_date, crop_id, location_id ON plantings
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.planted_day AS day
+        UNION ALL SELECT NEW.planted_day
+        UNION ALL SELECT harvest_day FROM harvests WHERE location_crop_id = NEW.id
+        UNION ALL SELECT recorded_day FROM planting_records WHERE location_crop_id = NEW.id
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- 収穫
+CREATE TRIGGER IF NOT EXISTS trg_calendar_harvests_insert
+AFTER INSERT ON harvests
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.harvest_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_harvests_delete
+AFTER DELETE ON harvests
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.harvest_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_harvests_update
+AFTER UPDATE OF harvest_date, location_crop_id, quantity, unit ON harvests
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.harvest_day AS day
+        UNION ALL SELECT NEW.harvest_day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- タスク
+CREATE TRIGGER IF NOT EXISTS trg_calendar_tasks_insert
+AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.due_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_tasks_delete
+AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.due_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_tasks_update
+AFTER UPDATE OF title, status, due_date ON tasks
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.due_day AS day
+        UNION ALL SELECT NEW.due_day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+-- 栽培記録
+CREATE TRIGGER IF NOT EXISTS trg_calendar_planting_records_insert
+AFTER INSERT ON planting_records
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT NEW.recorded_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_planting_records_delete
+AFTER DELETE ON planting_records
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.recorded_day AS day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_calendar_planting_records_update
+AFTER UPDATE OF recorded_at, location_crop_id ON planting_records
+BEGIN
+    INSERT INTO calendar_month_versions (month, version)
+    SELECT DISTINCT substr(day, 1, 7), 1 FROM (
+        SELECT OLD.recorded_day AS day
+        UNION ALL SELECT NEW.recorded_day
+    ) WHERE day IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+END;
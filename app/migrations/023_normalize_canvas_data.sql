@@ -0,0 +1,17 @@
+-- 不正・空のキャンバスデータを既定のキャンバスに置き換える（一度だけの修復）
+-- Migration: 023_normalize_canvas_data
+--
+-- キャンバスデータ取得APIは保存済みの JSON をデコードせずにそのまま返す。
+-- 書き込みは Location._canvas_json で正規化するので、ここでは既存の行のうち
+-- JSON として読めないもの・オブジェクトでないもの・空のオブジェクトを既定のキャンバスにする。
+-- 未保存（NULL / 空文字列）の行は API が既定のキャンバスを返すのでそのままにする。
+
+UPDATE locations
+SET canvas_data = '{"placements":[],"version":"2.0"}'
+WHERE canvas_data IS NOT NULL AND canvas_data != ''
+  AND CASE
+        WHEN json_valid(canvas_data) THEN
+            json_type(canvas_data) != 'object'
+            OR NOT EXISTS (SELECT 1 FROM json_each(locations.canvas_data))
+        ELSE 1
+      END;
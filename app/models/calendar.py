@@ -3,211 +3,277 @@ import calendar
 from datetime import date
 
 
+def _crop_label(name, variety):
+    """作物の表示名「品種（作物名）」（品種がなければ作物名）"""
+    return f"{variety}（{name}）" if variety else name
+
+
+# EVENTS_QUERY の行（列は番号で参照する）:
+#   0 day, 1 kind, 2 id, 3 name, 4 variety, 5 icon_path, 6 image_color,
+#   7 location_id, 8 location_name, 9 quantity, 10 unit, 11 status
+# 種類によって使わない列は NULL。以下は種類ごとに行から予定の辞書を作る関数
+
+def _crop_event(row):
+    return {
+        'id': row[2], 'name': row[3], 'variety': row[4],
+        'icon_path': row[5], 'image_color': row[6],
+        'label': _crop_label(row[3], row[4]), 'url': f"/crops/{row[2]}",
+    }
+
+
+def _location_event(row):
+    return {'id': row[2], 'name': row[3], 'label': f"{row[3]}", 'url': f"/locations/{row[2]}"}
+
+
+def _diary_event(row):
+    return {'id': row[2], 'title': row[3], 'label': f"{row[3]}", 'url': f"/diary/{row[2]}"}
+
+
+def _planting_event(row):
+    return {
+        'id': row[2], 'location_id': row[7], 'crop_name': row[3], 'variety': row[4],
+        'icon_path': row[5], 'image_color': row[6], 'location_name': row[8],
+        'label': f"{_crop_label(row[3], row[4])}@{row[8]}", 'url': f"/plantings/{row[2]}",
+    }
+
+
+def _harvest_event(row):
+    quantity = row[9]
+    qty_str = f" {quantity}{row[10] or ''}" if quantity else ''
+    return {
+        'id': row[2], 'crop_name': row[3], 'variety': row[4],
+        'icon_path': row[5], 'image_color': row[6], 'quantity': quantity, 'unit': row[10],
+        'label': f"{_crop_label(row[3], row[4])}{qty_str}", 'url': f"/harvests/{row[2]}",
+    }
+
+
+def _task_event(row):
+    return {'id': row[2], 'title': row[3], 'status': row[11], 'label': f"{row[3]}", 'url': f"/tasks/{row[2]}"}
+
+
+def _growth_record_event(row):
+    return {
+        'id': row[2], 'location_crop_id': row[7], 'crop_name': row[3], 'variety': row[4],
+        'icon_path': row[5], 'image_color': row[6], 'location_name': row[8],
+        'label': f"{_crop_label(row[3], row[4])}@{row[8]}", 'url': f"/plantings/record/{row[2]}",
+    }
+
+
+# kind（0〜6）ごとの (get_month_data の結果のキー, 予定の辞書を作る関数)
+EVENT_TYPES = (
+    ('crops', _crop_event),
+    ('locations', _location_event),
+    ('diaries', _diary_event),
+    ('location_crops', _planting_event),
+    ('harvests', _harvest_event),
+    ('tasks', _task_event),
+    ('growth_records', _growth_record_event),
+)
+
+
+# SQL で作物の表示名を作る式（_crop_label と同じ。crops の別名は c）
+_CROP_LABEL_SQL = "CASE WHEN c.variety IS NOT NULL AND c.variety != '' THEN c.variety || '（' || c.name || '）' ELSE c.name END"
+
+# get_activity_counts の種類（各日の件数リストの並び順）
+ACTIVITY_TYPES = ('plantings', 'harvests', 'records', 'diaries', 'tasks')
+
+
 class Calendar:
     """カレンダー用データ取得モデル"""
+    # 全種類の予定を日付・種類・種類内の並び順で返す。
+    # sort_at（元の日時列）は並び替えにだけ使い、外側では返さない
+    # （列の型は最初の SELECT の宣言型になり、TIMESTAMP だと日時に変換されてしまうため）
+    EVENTS_QUERY = '''
+        SELECT day, kind, id, name, variety, icon_path, image_color,
+               location_id, location_name, quantity, unit, status
+        FROM (
+            SELECT created_day AS day, 0 AS kind, created_at AS sort_at, id, name, variety,
+                   icon_path, image_color, NULL AS location_id, NULL AS location_name,
+                   NULL AS quantity, NULL AS unit, NULL AS status
+            FROM crops
+            WHERE created_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT created_day, 1, created_at, id, name, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL
+            FROM locations
+            WHERE created_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT entry_day, 2, entry_date, id, title, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL
+            FROM diary_entries
+            WHERE entry_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT lc.planted_day, 3, lc.planted_date, lc.id, c.name, c.variety, c.icon_path, c.image_color,
+                   lc.location_id, l.name, NULL, NULL, NULL
+            FROM plantings lc
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE lc.planted_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT h.harvest_day, 4, h.harvest_date, h.id, c.name, c.variety, c.icon_path, c.image_color,
+                   NULL, NULL, h.quantity, h.unit, NULL
+            FROM harvests h
+            JOIN plantings lc ON h.location_crop_id = lc.id
+            JOIN crops c ON lc.crop_id = c.id
+            WHERE h.harvest_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT due_day, 5, due_date, id, title, NULL, NULL, NULL, NULL, NULL, NULL, NULL, status
+            FROM tasks
+            WHERE due_day BETWEEN :start AND :end
+            UNION ALL
+            SELECT gr.recorded_day, 6, gr.recorded_at, gr.id, c.name, c.variety, c.icon_path, c.image_color,
+                   gr.location_crop_id, l.name, NULL, NULL, NULL
+            FROM planting_records gr
+            JOIN plantings lc ON gr.location_crop_id = lc.id
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE gr.recorded_day BETWEEN :start AND :end
+        )
+        ORDER BY day, kind, sort_at, id
+    '''
+
+    # 種類ごとに日付列（*_day、021 でインデックス済み）で GROUP BY した件数。
+    # 予定の行そのものは読まない。kind は ACTIVITY_TYPES の番号
+    ACTIVITY_QUERY = '''
+        SELECT planted_day AS day, 0 AS kind, COUNT(*) AS count FROM plantings
+        WHERE planted_day BETWEEN :start AND :end GROUP BY planted_day
+        UNION ALL
+        SELECT harvest_day, 1, COUNT(*) FROM harvests
+        WHERE harvest_day BETWEEN :start AND :end GROUP BY harvest_day
+        UNION ALL
+        SELECT recorded_day, 2, COUNT(*) FROM planting_records
+        WHERE recorded_day BETWEEN :start AND :end GROUP BY recorded_day
+        UNION ALL
+        SELECT entry_day, 3, COUNT(*) FROM diary_entries
+        WHERE entry_day BETWEEN :start AND :end GROUP BY entry_day
+        UNION ALL
+        SELECT due_day, 4, COUNT(*) FROM tasks
+        WHERE due_day BETWEEN :start AND :end GROUP BY due_day
+    '''
 
     @staticmethod
     def get_month_data(year, month):
         """指定した年月のカレンダーデータを取得
 
+        全種類の予定を1クエリ（UNION ALL、日付・種類順）で読みながら日ごとにまとめる。
+        予定のある日・種類だけを持つので、テンプレートでは .get(種類, []) で参照する。
+
         Returns:
-            dict: 日付をキーとし、その日のデータを含む辞書
+            dict: 日付をキーとし、その日にある種類の予定のリストを持つ辞書
             {
                 '2024-01-15': {
-                    'crops': [{'id': 1, 'name': 'トマト', 'variety': '桃太郎'}, ...],
-                    'locations': [{'id': 1, 'name': '畑A'}, ...],
-                    'diaries': [{'id': 1, 'title': '種まき'}, ...],
-                    'location_crops': [{'id': 1, 'location_id': 1, 'crop_name': 'トマト', ...}, ...],
-                    'harvests': [{'id': 1, 'crop_name': 'トマト', 'quantity': 5, 'unit': '個'}, ...]
+                    'crops': [{'id': 1, 'name': 'トマト', 'variety': '桃太郎', 'label': ..., 'url': ...}, ...],
+                    'harvests': [{'id': 1, 'crop_name': 'トマト', 'quantity': 5, 'unit': '個', ...}, ...]
                 }, ...
             }
+            種類は crops / locations / diaries / location_crops / harvests / tasks / growth_records
         """
         db = get_db()
 
         # 月の開始日と終了日を取得
         _, last_day = calendar.monthrange(year, month)
-        start_date = f'{year:04d}-{month:02d}-01'
-        end_date = f'{year:04d}-{month:02d}-{last_day:02d}'
+        params = {
+            'start': f'{year:04d}-{month:02d}-01',
+            'end': f'{year:04d}-{month:02d}-{last_day:02d}',
+        }
 
+        event_types = EVENT_TYPES
         result = {}
-
-        # 作物を取得 (created_atの日付部分で取得)
-        crops = db.execute(
-            '''SELECT id, name, variety, icon_path, image_color,
-                      DATE(created_at) as date
-               FROM crops
-               WHERE DATE(created_at) BETWEEN ? AND ?
-               ORDER BY created_at''',
-            (start_date, end_date)
-        ).fetchall()
-        for crop in crops:
-            date_str = crop['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            label = f"{crop['variety']}（{crop['name']}）" if crop['variety'] else crop['name']
-            result[date_str]['crops'].append({
-                'id': crop['id'],
-                'name': crop['name'],
-                'variety': crop['variety'],
-                'icon_path': crop['icon_path'],
-                'image_color': crop['image_color'],
-                'label': label,
-                'url': f"/crops/{crop['id']}"
-            })
-
-        # 場所を取得 (created_atの日付部分で取得)
-        locations = db.execute(
-            '''SELECT id, name, DATE(created_at) as date
-               FROM locations
-               WHERE DATE(created_at) BETWEEN ? AND ?
-               ORDER BY created_at''',
-            (start_date, end_date)
-        ).fetchall()
-        for location in locations:
-            date_str = location['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            result[date_str]['locations'].append({
-                'id': location['id'],
-                'name': location['name'],
-                'label': f"{location['name']}",
-                'url': f"/locations/{location['id']}"
-            })
-
-        # 日記を取得 (entry_dateで取得)
-        diaries = db.execute(
-            '''SELECT id, title, DATE(entry_date) as date
-               FROM diary_entries
-               WHERE DATE(entry_date) BETWEEN ? AND ?
-               ORDER BY entry_date''',
-            (start_date, end_date)
-        ).fetchall()
-        for diary in diaries:
-            date_str = diary['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            result[date_str]['diaries'].append({
-                'id': diary['id'],
-                'title': diary['title'],
-                'label': f"{diary['title']}",
-                'url': f"/diary/{diary['id']}"
-            })
-
-        # 栽培中を取得 (planted_dateで取得)
-        location_crops = db.execute(
-            '''SELECT lc.id, lc.location_id, DATE(lc.planted_date) as date,
-                      c.name as crop_name, c.variety,
-                      c.icon_path, c.image_color, l.name as location_name
-               FROM plantings lc
-               JOIN crops c ON lc.crop_id = c.id
-               JOIN locations l ON lc.location_id = l.id
-               WHERE DATE(lc.planted_date) BETWEEN ? AND ?
-               ORDER BY lc.planted_date''',
-            (start_date, end_date)
-        ).fetchall()
-        for lc in location_crops:
-            date_str = lc['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            crop_label = f"{lc['variety']}（{lc['crop_name']}）" if lc['variety'] else lc['crop_name']
-            result[date_str]['location_crops'].append({
-                'id': lc['id'],
-                'location_id': lc['location_id'],
-                'crop_name': lc['crop_name'],
-                'variety': lc['variety'],
-                'icon_path': lc['icon_path'],
-                'image_color': lc['image_color'],
-                'location_name': lc['location_name'],
-                'label': f"{crop_label}@{lc['location_name']}",
-                'url': f"/plantings/{lc['id']}"
-            })
-
-        # 収穫を取得 (harvest_dateで取得)
-        harvests = db.execute(
-            '''SELECT h.id, h.quantity, h.unit, DATE(h.harvest_date) as date,
-                      c.name as crop_name, c.variety,
-                      c.icon_path, c.image_color
-               FROM harvests h
-               JOIN plantings lc ON h.location_crop_id = lc.id
-               JOIN crops c ON lc.crop_id = c.id
-               WHERE DATE(h.harvest_date) BETWEEN ? AND ?
-               ORDER BY h.harvest_date''',
-            (start_date, end_date)
-        ).fetchall()
-        for harvest in harvests:
-            date_str = harvest['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            crop_label = f"{harvest['variety']}（{harvest['crop_name']}）" if harvest['variety'] else harvest['crop_name']
-            qty_str = f" {harvest['quantity']}{harvest['unit'] or ''}" if harvest['quantity'] else ''
-            result[date_str]['harvests'].append({
-                'id': harvest['id'],
-                'crop_name': harvest['crop_name'],
-                'variety': harvest['variety'],
-                'icon_path': harvest['icon_path'],
-                'image_color': harvest['image_color'],
-                'quantity': harvest['quantity'],
-                'unit': harvest['unit'],
-                'label': f"{crop_label}{qty_str}",
-                'url': f"/harvests/{harvest['id']}"
-            })
-
-        # タスクを取得 (due_dateで取得)
-        tasks = db.execute(
-            '''SELECT id, title, status, DATE(due_date) as date
-               FROM tasks
-               WHERE DATE(due_date) BETWEEN ? AND ?
-               ORDER BY due_date''',
-            (start_date, end_date)
-        ).fetchall()
-        for task in tasks:
-            date_str = task['date']
-            if date_str not in result:
-                result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [], 'harvests': [], 'tasks': [], 'growth_records': []}
-            result[date_str]['tasks'].append({
-                'id': task['id'],
-                'title': task['title'],
-                'status': task['status'],
-                'label': f"{task['title']}",
-                'url': f"/tasks/{task['id']}"
-            })
-
-        # 栽培記録を取得 (recorded_atで取得)
-        growth_records = db.execute(
-            '''SELECT gr.id, gr.location_crop_id, DATE(gr.recorded_at) as date,
-                      c.name as crop_name, c.variety,
-                      c.icon_path, c.image_color, l.name as location_name
-               FROM planting_records gr
-               JOIN plantings lc ON gr.location_crop_id = lc.id
-               JOIN crops c ON lc.crop_id = c.id
-               JOIN locations l ON lc.location_id = l.id
-               WHERE DATE(gr.recorded_at) BETWEEN ? AND ?
-               ORDER BY gr.recorded_at''',
-            (start_date, end_date)
-        ).fetchall()
-        for gr in growth_records:
-            date_str = gr['date']
-            if date_str not in result:
-                result[date_str] = {
-                    'crops': [], 'locations': [], 'diaries': [],
-                    'location_crops': [], 'harvests': [], 'tasks': [],
-                    'growth_records': []
-                }
-            crop_label = f"{gr['variety']}（{gr['crop_name']}）" if gr['variety'] else gr['crop_name']
-            result[date_str]['growth_records'].append({
-                'id': gr['id'],
-                'location_crop_id': gr['location_crop_id'],
-                'crop_name': gr['crop_name'],
-                'variety': gr['variety'],
-                'icon_path': gr['icon_path'],
-                'image_color': gr['image_color'],
-                'location_name': gr['location_name'],
-                'label': f"{crop_label}@{gr['location_name']}",
-                'url': f"/plantings/record/{gr['id']}"
-            })
+        current_day = day_data = None
+        for row in db.execute(Calendar.EVENTS_QUERY, params):
+            # 日付順に並んでいるので、日が変わったときだけ辞書を作る
+            if row[0] != current_day:
+                current_day = row[0]
+                day_data = result[current_day] = {}
+            key, build = event_types[row[1]]
+            item = build(row)
+            items = day_data.get(key)
+            if items is None:
+                day_data[key] = [item]
+            else:
+                items.append(item)
 
         return result
 
+    @staticmethod
+    def get_activity_counts(start, end):
+        """期間内の日ごとの活動件数を種類別に取得
+
+        Args:
+            start: 開始日（date または 'YYYY-MM-DD'、この日を含む）
+            end: 終了日（date または 'YYYY-MM-DD'、この日を含む）
+
+        Returns:
+            dict: 日付をキーとし、ACTIVITY_TYPES の順の件数リストを持つ辞書（活動のない日は含まない）
+            {'2024-01-15': [植え付け, 収穫, 栽培記録, 日記, タスク], ...}
+        """
+        db = get_db()
+        params = {'start': str(start), 'end': str(end)}
+        result = {}
+        for day, kind, count in db.execute(Calendar.ACTIVITY_QUERY, params):
+            counts = result.get(day)
+            if counts is None:
+                counts = result[day] = [0] * len(ACTIVITY_TYPES)
+            counts[kind] = count
+        return dict(sorted(result.items()))
+
+    @staticmethod
+    def iter_feed_items(location_id=None, crop_id=None):
+        """iCalendar フィード用に植え付け・収穫・タスクを1行ずつ返すジェネレーター
+
+        1つの UNION ALL をカーソルから読みながら返すので、全件をメモリに載せない（並び順は不定）。
+
+        Args:
+            location_id: 指定した場所の植え付け・収穫・関連タスクだけにする
+            crop_id: 指定した作物の植え付け・収穫・関連タスクだけにする
+
+        Yields:
+            dict: kind（'planting' / 'harvest' / 'task'）, id, day（'YYYY-MM-DD' または None）,
+                  label, status, description, updated_at（'YYYY-MM-DD HH:MM:SS'）
+        """
+        db = get_db()
+        planting_conditions = []
+        task_conditions = []
+        params = {'location_id': location_id, 'crop_id': crop_id}
+        # タスクは関連付け（作物・場所・植え付け）のどれかで一致すれば含める
+        if location_id is not None:
+            planting_conditions.append('lc.location_id = :location_id')
+            task_conditions.append('''EXISTS (
+                SELECT 1 FROM task_relations tr WHERE tr.task_id = t.id
+                AND (tr.location_id = :location_id OR tr.location_crop_id IN (
+                    SELECT id FROM plantings WHERE location_id = :location_id)))''')
+        if crop_id is not None:
+            planting_conditions.append('lc.crop_id = :crop_id')
+            task_conditions.append('''EXISTS (
+                SELECT 1 FROM task_relations tr WHERE tr.task_id = t.id
+                AND (tr.crop_id = :crop_id OR tr.location_crop_id IN (
+                    SELECT id FROM plantings WHERE crop_id = :crop_id)))''')
+        planting_where = ''.join(f' AND {c}' for c in planting_conditions)
+        task_where = ''.join(f' AND {c}' for c in task_conditions)
+
+        # updated_at は式にして宣言型を外し、文字列のまま返す
+        query = f'''
+            SELECT 'planting' AS kind, lc.id, lc.planted_day AS day,
+                   {_CROP_LABEL_SQL} || '@' || l.name AS label,
+                   lc.status, lc.notes AS description, CAST(lc.updated_at AS TEXT) AS updated_at
+            FROM plantings lc
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE lc.planted_day IS NOT NULL{planting_where}
+            UNION ALL
+            SELECT 'harvest', h.id, h.harvest_day,
+                   {_CROP_LABEL_SQL} || CASE WHEN h.quantity THEN ' ' || h.quantity || IFNULL(h.unit, '') ELSE '' END,
+                   NULL, h.notes, CAST(h.updated_at AS TEXT)
+            FROM harvests h
+            JOIN plantings lc ON h.location_crop_id = lc.id
+            JOIN crops c ON lc.crop_id = c.id
+            WHERE 1=1{planting_where}
+            UNION ALL
+            SELECT 'task', t.id, t.due_day, t.title, t.status, t.description, CAST(t.updated_at AS TEXT)
+            FROM tasks t
+            WHERE 1=1{task_where}
+        '''
+        for row in db.execute(query, params):
+            yield dict(row)
+
     @staticmethod
     def get_calendar_weeks(year, month):
         """指定した年月のカレンダー週リストを取得（日曜始まり）
@@ -10,10 +10,51 @@ class Crop:
         """全作物を取得"""
         db = get_db()
         crops = db.execute(
-            'SELECT * FROM crops ORDER BY created_at DESC'
+            'SELECT * FROM crops ORDER BY created_at DESC, id DESC'
         ).fetchall()
         return [dict(crop) for crop in crops]
 
+    @staticmethod
+    def get_page(limit=30, after=None, crop_types=None):
+        """キーセットページングで作物を取得（一覧の無限スクロール用、get_all と同じ並び）
+
+        Args:
+            after: 前ページ最後の作物の (created_at, id)。None なら先頭から
+            crop_types: 絞り込む作物の種類のリスト（空なら全件）
+
+        Returns:
+            tuple: (作物のリスト, 次ページの after または None)
+        """
+        db = get_db()
+        query = 'SELECT * FROM crops WHERE 1=1'
+        params = []
+        if crop_types:
+            query += f" AND crop_type IN ({','.join('?' * len(crop_types))})"
+            params.extend(crop_types)
+        if after:
+            query += ' AND (created_at, id) < (?, ?)'
+            params.extend(after)
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        # 次ページの有無を知るために1件多く取得
+        params.append(limit + 1)
+        rows = db.execute(query, params).fetchall()
+
+        crops = [dict(row) for row in rows[:limit]]
+        next_after = None
+        if len(rows) > limit:
+            last = crops[-1]
+            next_after = (last['created_at'], last['id'])
+        return crops, next_after
+
+    @staticmethod
+    def count_by_crop_type():
+        """作物の種類ごとの件数を {種類: 件数} で取得（一覧の件数表示・種類フィルター用）"""
+        db = get_db()
+        rows = db.execute(
+            'SELECT crop_type, COUNT(*) as count FROM crops GROUP BY crop_type'
+        ).fetchall()
+        return {row['crop_type']: row['count'] for row in rows}
+
     @staticmethod
     def get_by_id(crop_id):
         """IDで作物を取得"""
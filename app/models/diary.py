@@ -1,4 +1,5 @@
 from app.database import get_db
+from app.models.loader import fetch_grouped
 from app.utils.timezone import get_jst_now
 
 
@@ -9,7 +10,7 @@ class DiaryEntry:
     def get_all(limit=None, offset=None):
         """全日記を取得（ページネーション対応）"""
         db = get_db()
-        query = 'SELECT * FROM diary_entries ORDER BY entry_date DESC, created_at DESC'
+        query = 'SELECT * FROM diary_entries ORDER BY entry_date DESC, created_at DESC, id DESC'
         params = []
 
         if limit:
@@ -69,36 +70,118 @@ class DiaryEntry:
         db.commit()
 
     @staticmethod
-    def count():
-        """日記の総数を取得"""
-        db = get_db()
-        result = db.execute('SELECT COUNT(*) as count FROM diary_entries').fetchone()
-        return result['count'] if result else 0
-
-    @staticmethod
-    def search(keyword, date_from=None, date_to=None):
-        """日記を検索"""
-        db = get_db()
-        query = '''SELECT * FROM diary_entries WHERE 1=1'''
+    def _search_conditions(keyword=None, date_from=None, date_to=None):
+        """検索条件の WHERE 句（先頭の AND 付き）とパラメータ"""
+        conditions = ''
         params = []
 
         if keyword:
-            query += ' AND (title LIKE ? OR content LIKE ?)'
+            conditions += ' AND (title LIKE ? OR content LIKE ?)'
             params.extend([f'%{keyword}%', f'%{keyword}%'])
 
         if date_from:
-            query += ' AND entry_date >= ?'
+            conditions += ' AND entry_date >= ?'
             params.append(date_from)
 
         if date_to:
-            query += ' AND entry_date <= ?'
+            conditions += ' AND entry_date <= ?'
             params.append(date_to)
 
-        query += ' ORDER BY entry_date DESC, created_at DESC'
+        return conditions, params
 
+    @staticmethod
+    def search(keyword, date_from=None, date_to=None):
+        """日記を検索"""
+        db = get_db()
+        conditions, params = DiaryEntry._search_conditions(keyword, date_from, date_to)
+        query = f'''SELECT * FROM diary_entries WHERE 1=1{conditions}
+                    ORDER BY entry_date DESC, created_at DESC, id DESC'''
         entries = db.execute(query, params).fetchall()
         return [dict(entry) for entry in entries]
 
+    @staticmethod
+    def _date_badge_conditions(years=None, months=None):
+        """一覧の年・月バッジの絞り込み条件（先頭の AND 付き）とパラメータ
+
+        年と月の両方を指定したときは両方に一致するもの（date-badge-filter.js と同じ規則）。
+        """
+        conditions = ''
+        params = []
+
+        if years:
+            conditions += f" AND substr(entry_date, 1, 4) IN ({','.join('?' * len(years))})"
+            params.extend(str(y) for y in years)
+
+        if months:
+            conditions += f" AND CAST(substr(entry_date, 6, 2) AS INTEGER) IN ({','.join('?' * len(months))})"
+            params.extend(int(m) for m in months)
+
+        return conditions, params
+
+    @staticmethod
+    def get_page(limit=30, after=None, keyword=None, years=None, months=None):
+        """キーセットページングで日記を取得（一覧の無限スクロール用、get_all と同じ並び）
+
+        Args:
+            after: 前ページ最後の日記の (entry_date, created_at, id)。None なら先頭から
+            keyword: タイトル・内容の検索語
+            years: 絞り込む年のリスト
+            months: 絞り込む月（1〜12）のリスト
+
+        Returns:
+            tuple: (日記のリスト, 次ページの after または None)
+        """
+        db = get_db()
+        conditions, params = DiaryEntry._search_conditions(keyword)
+        badge_conditions, badge_params = DiaryEntry._date_badge_conditions(years, months)
+        conditions += badge_conditions
+        params.extend(badge_params)
+        if after:
+            conditions += ' AND (entry_date, created_at, id) < (?, ?, ?)'
+            params.extend(after)
+        # 次ページの有無を知るために1件多く取得
+        params.append(limit + 1)
+        rows = db.execute(
+            f'''SELECT * FROM diary_entries WHERE 1=1{conditions}
+                ORDER BY entry_date DESC, created_at DESC, id DESC LIMIT ?''',
+            params
+        ).fetchall()
+
+        entries = [dict(row) for row in rows[:limit]]
+        next_after = None
+        if len(rows) > limit:
+            last = entries[-1]
+            next_after = (last['entry_date'], last['created_at'], last['id'])
+        return entries, next_after
+
+    @staticmethod
+    def count(keyword=None, years=None, months=None):
+        """日記の件数を取得（条件を渡すと get_page と同じ条件で数える）"""
+        db = get_db()
+        conditions, params = DiaryEntry._search_conditions(keyword)
+        badge_conditions, badge_params = DiaryEntry._date_badge_conditions(years, months)
+        result = db.execute(
+            f'SELECT COUNT(*) as count FROM diary_entries WHERE 1=1{conditions}{badge_conditions}',
+            params + badge_params
+        ).fetchone()
+        return result['count'] if result else 0
+
+    @staticmethod
+    def count_by_year(keyword=None):
+        """年ごとの日記数を {年: 件数} で取得（一覧の件数表示・年フィルター用）
+
+        日付のない日記は None のキーに数える。keyword を渡すと search と同じ条件で絞り込む。
+        """
+        db = get_db()
+        conditions, params = DiaryEntry._search_conditions(keyword)
+        rows = db.execute(
+            f'''SELECT NULLIF(substr(entry_date, 1, 4), '') as year, COUNT(*) as count
+                FROM diary_entries WHERE 1=1{conditions}
+                GROUP BY year''',
+            params
+        ).fetchall()
+        return {row['year']: row['count'] for row in rows}
+
     @staticmethod
     def get_recent(limit=5):
         """最新の日記を取得"""
@@ -114,31 +197,39 @@ class DiaryEntry:
     @staticmethod
     def get_relations(diary_id):
         """日記に関連するデータを取得"""
-        db = get_db()
+        return DiaryEntry.load_relations_many([diary_id])[diary_id]
+
+    @staticmethod
+    def load_relations_many(diary_ids):
+        """複数の日記の関連データを種類ごとに1クエリで取得
 
+        Returns:
+            dict: {diary_id: {'crops': [...], 'locations': [...],
+                              'location_crops': [...], 'harvests': [...]}}
+        """
         # 関連する作物を取得
-        crops = db.execute(
-            '''SELECT dr.crop_id, c.name as crop_name, c.crop_type, c.variety,
+        crops = fetch_grouped(
+            '''SELECT dr.diary_id, dr.crop_id, c.name as crop_name, c.crop_type, c.variety,
                       c.icon_path, c.image_color, c.image_path as crop_image_path
                FROM diary_relations dr
                JOIN crops c ON dr.crop_id = c.id
-               WHERE dr.diary_id = ? AND dr.relation_type = 'crop' ''',
-            (diary_id,)
-        ).fetchall()
+               WHERE dr.relation_type = 'crop' AND dr.diary_id IN ({keys})''',
+            diary_ids, 'diary_id'
+        )
 
         # 関連する場所を取得
-        locations = db.execute(
-            '''SELECT dr.location_id, l.name as location_name, l.location_type,
+        locations = fetch_grouped(
+            '''SELECT dr.diary_id, dr.location_id, l.name as location_name, l.location_type,
                       l.image_path as location_image_path
                FROM diary_relations dr
                JOIN locations l ON dr.location_id = l.id
-               WHERE dr.diary_id = ? AND dr.relation_type = 'location' ''',
-            (diary_id,)
-        ).fetchall()
+               WHERE dr.relation_type = 'location' AND dr.diary_id IN ({keys})''',
+            diary_ids, 'diary_id'
+        )
 
         # 関連する植え付け場所を取得
-        location_crops = db.execute(
-            '''SELECT lc.id as id, lc.id as location_crop_id, c.name as crop_name, c.variety,
+        location_crops = fetch_grouped(
+            '''SELECT dr.diary_id, lc.id as id, lc.id as location_crop_id, c.name as crop_name, c.variety,
                       c.icon_path, c.image_color, l.name as location_name,
                       lc.location_id, lc.planted_date, lc.status,
                       (SELECT pr.image_path FROM planting_records pr
@@ -148,13 +239,13 @@ class DiaryEntry:
                JOIN plantings lc ON dr.location_crop_id = lc.id
                JOIN crops c ON lc.crop_id = c.id
                JOIN locations l ON lc.location_id = l.id
-               WHERE dr.diary_id = ? AND dr.relation_type = 'location_crop' ''',
-            (diary_id,)
-        ).fetchall()
+               WHERE dr.relation_type = 'location_crop' AND dr.diary_id IN ({keys})''',
+            diary_ids, 'diary_id'
+        )
 
         # 関連する収穫記録を取得
-        harvests = db.execute(
-            '''SELECT h.id as id, h.id as harvest_id, h.harvest_date, h.quantity, h.unit,
+        harvests = fetch_grouped(
+            '''SELECT dr.diary_id, h.id as id, h.id as harvest_id, h.harvest_date, h.quantity, h.unit,
                       h.image_path,
                       c.name as crop_name, c.variety, c.icon_path, c.image_color,
                       l.name as location_name
@@ -163,15 +254,18 @@ class DiaryEntry:
                JOIN plantings lc ON h.location_crop_id = lc.id
                JOIN crops c ON lc.crop_id = c.id
                JOIN locations l ON lc.location_id = l.id
-               WHERE dr.diary_id = ? AND dr.relation_type = 'harvest' ''',
-            (diary_id,)
-        ).fetchall()
+               WHERE dr.relation_type = 'harvest' AND dr.diary_id IN ({keys})''',
+            diary_ids, 'diary_id'
+        )
 
         return {
-            'crops': [dict(c) for c in crops],
-            'locations': [dict(l) for l in locations],
-            'location_crops': [dict(lc) for lc in location_crops],
-            'harvests': [dict(h) for h in harvests]
+            diary_id: {
+                'crops': crops.get(diary_id, []),
+                'locations': locations.get(diary_id, []),
+                'location_crops': location_crops.get(diary_id, []),
+                'harvests': harvests.get(diary_id, [])
+            }
+            for diary_id in diary_ids
         }
 
     @staticmethod
@@ -1,4 +1,5 @@
 from app.database import get_db
+from app.models.loader import fetch_grouped
 from datetime import datetime
 from app.utils.timezone import get_jst_now
 
@@ -18,7 +19,7 @@ class Harvest:
             JOIN plantings lc ON h.location_crop_id = lc.id
             JOIN crops c ON lc.crop_id = c.id
             JOIN locations l ON lc.location_id = l.id
-            ORDER BY h.harvest_date DESC, h.created_at DESC
+            ORDER BY h.harvest_date DESC, h.created_at DESC, h.id DESC
         '''
         params = []
 
@@ -39,6 +40,82 @@ class Harvest:
             result.append(harvest_dict)
         return result
 
+    @staticmethod
+    def get_page(limit=30, after=None, crop_types=None):
+        """キーセットページングで収穫記録を取得（一覧の無限スクロール用、get_all と同じ並び）
+
+        Args:
+            after: 前ページ最後の収穫記録の (harvest_date, created_at, id)。None なら先頭から
+            crop_types: 絞り込む作物の種類のリスト（空なら全件）
+
+        Returns:
+            tuple: (収穫記録のリスト, 次ページの after または None)
+        """
+        db = get_db()
+        query = '''
+            SELECT h.*, c.name as crop_name, c.variety, c.crop_type,
+                   c.icon_path, c.image_color, l.name as location_name,
+                   lc.planted_date
+            FROM harvests h
+            JOIN plantings lc ON h.location_crop_id = lc.id
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE 1=1
+        '''
+        params = []
+        if crop_types:
+            query += f" AND c.crop_type IN ({','.join('?' * len(crop_types))})"
+            params.extend(crop_types)
+        if after:
+            query += ' AND (h.harvest_date, h.created_at, h.id) < (?, ?, ?)'
+            params.extend(after)
+        query += ' ORDER BY h.harvest_date DESC, h.created_at DESC, h.id DESC LIMIT ?'
+        # 次ページの有無を知るために1件多く取得
+        params.append(limit + 1)
+        rows = db.execute(query, params).fetchall()
+
+        harvests = []
+        for h in rows[:limit]:
+            harvest_dict = dict(h)
+            harvest_dict['days_from_planting'] = Harvest._calculate_days(
+                h['planted_date'], h['harvest_date']
+            )
+            harvests.append(harvest_dict)
+        next_after = None
+        if len(rows) > limit:
+            last = harvests[-1]
+            next_after = (last['harvest_date'], last['created_at'], last['id'])
+        return harvests, next_after
+
+    @staticmethod
+    def count_by_crop_type():
+        """作物の種類ごとの収穫記録数を {種類: 件数} で取得（一覧と同じJOIN条件）"""
+        db = get_db()
+        rows = db.execute(
+            '''SELECT c.crop_type, COUNT(*) as count
+               FROM harvests h
+               JOIN plantings lc ON h.location_crop_id = lc.id
+               JOIN crops c ON lc.crop_id = c.id
+               JOIN locations l ON lc.location_id = l.id
+               GROUP BY c.crop_type'''
+        ).fetchall()
+        return {row['crop_type']: row['count'] for row in rows}
+
+    @staticmethod
+    def has_images():
+        """画像付きの収穫記録があるか（一覧のスライドショーボタン用、一覧と同じJOIN条件）"""
+        db = get_db()
+        result = db.execute(
+            '''SELECT EXISTS (
+                   SELECT 1 FROM harvests h
+                   JOIN plantings lc ON h.location_crop_id = lc.id
+                   JOIN crops c ON lc.crop_id = c.id
+                   JOIN locations l ON lc.location_id = l.id
+                   WHERE h.image_path IS NOT NULL AND h.image_path != ''
+               )'''
+        ).fetchone()
+        return bool(result[0])
+
     @staticmethod
     def get_by_id(harvest_id):
         """IDで収穫記録を取得"""
@@ -94,6 +171,32 @@ class Harvest:
             result.append(harvest_dict)
         return result
 
+    @staticmethod
+    def load_many_by_location_crop(location_crop_ids):
+        """複数の栽培記録の収穫一覧を1クエリで取得
+
+        Returns:
+            dict: {location_crop_id: [収穫記録, ...]}（harvest_date DESC順）
+        """
+        grouped = fetch_grouped(
+            '''SELECT h.*, lc.planted_date,
+                      c.name as crop_name, c.variety, c.icon_path, c.image_color,
+                      l.name as location_name
+               FROM harvests h
+               JOIN plantings lc ON h.location_crop_id = lc.id
+               JOIN crops c ON lc.crop_id = c.id
+               JOIN locations l ON lc.location_id = l.id
+               WHERE h.location_crop_id IN ({keys})
+               ORDER BY h.harvest_date DESC''',
+            location_crop_ids, 'location_crop_id'
+        )
+        for harvests in grouped.values():
+            for harvest_dict in harvests:
+                harvest_dict['days_from_planting'] = Harvest._calculate_days(
+                    harvest_dict['planted_date'], harvest_dict['harvest_date']
+                )
+        return grouped
+
     @staticmethod
     def get_by_location(location_id, limit=None):
         """場所の全収穫記録を取得"""
@@ -0,0 +1,37 @@
+"""関連データの一括読み込みヘルパー
+
+詳細画面などで親ごとに子を1件ずつ取得する代わりに、親IDをまとめて
+IN (...) で1回だけ取得し、親IDごとに振り分ける。
+"""
+from app.database import get_db
+
+# SQLite のバインド変数上限（古いビルドは 999）を超えないよう分割する件数
+CHUNK_SIZE = 500
+
+
+def fetch_grouped(query, keys, key_column, params=()):
+    """IN (...) で一括取得して key_column の値ごとにグループ化
+
+    Args:
+        query: キーのプレースホルダー位置に {keys} を含むSQL
+               （{keys} は params の後ろにバインドされる）
+        keys: 親IDのリスト
+        key_column: 結果行のうち親IDが入っている列名
+        params: {keys} より前にある ? へバインドする値
+
+    Returns:
+        dict: {親ID: [dict(row), ...]}（該当なしの親IDは空リスト）
+    """
+    keys = list(dict.fromkeys(k for k in keys if k is not None))
+    grouped = {key: [] for key in keys}
+    if not keys:
+        return grouped
+
+    db = get_db()
+    for i in range(0, len(keys), CHUNK_SIZE):
+        chunk = keys[i:i + CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = db.execute(query.format(keys=placeholders), [*params, *chunk]).fetchall()
+        for row in rows:
+            grouped.setdefault(row[key_column], []).append(dict(row))
+    return grouped
@@ -8,6 +8,9 @@ from app.utils.timezone import get_jst_now
 class Location:
     """場所モデル"""
 
+    # キャンバス未保存・空の場所の既定データ（API はこの文字列をそのまま返す）
+    EMPTY_CANVAS_JSON = '{"placements":[],"version":"2.0"}'
+
     @staticmethod
     def get_all():
         """全場所を取得"""
@@ -142,6 +145,30 @@ class Location:
                 return None
         return None
 
+    @staticmethod
+    def get_canvas_json(location_id):
+        """保存されているキャンバスデータを JSON 文字列のまま取得（未保存なら None）
+
+        書き込み時に _canvas_json で正規化している（既存の不正・空の行はマイグレーション 023 で
+        既定のキャンバスに置き換え済み）ので、API ではデコードせずにそのまま返せる。
+        """
+        db = get_db()
+        result = db.execute(
+            'SELECT canvas_data FROM locations WHERE id = ?',
+            (location_id,)
+        ).fetchone()
+
+        if result and result['canvas_data']:
+            return result['canvas_data']
+        return None
+
+    @staticmethod
+    def _canvas_json(canvas_dict):
+        """保存する JSON 文字列にする（空やオブジェクト以外は既定のキャンバス）"""
+        if not canvas_dict or not isinstance(canvas_dict, dict):
+            return Location.EMPTY_CANVAS_JSON
+        return json.dumps(canvas_dict, ensure_ascii=False)
+
     @staticmethod
     def remove_from_canvas(location_id, location_crop_id):
         """見取り図から指定の植え付けを削除"""
@@ -155,7 +182,7 @@ class Location:
         db = get_db()
         db.execute(
             'UPDATE locations SET canvas_data = ?, updated_at = ? WHERE id = ?',
-            (json.dumps(canvas_data, ensure_ascii=False), get_jst_now(), location_id)
+            (Location._canvas_json(canvas_data), get_jst_now(), location_id)
         )
         db.commit()
 
@@ -165,7 +192,7 @@ class Location:
         from app.models.planting import Planting
 
         db = get_db()
-        canvas_json = json.dumps(canvas_dict, ensure_ascii=False)
+        canvas_json = Location._canvas_json(canvas_dict)
         db.execute(
             '''UPDATE locations SET canvas_data = ?, updated_at = ?
                WHERE id = ?''',
@@ -0,0 +1,83 @@
+from flask import url_for
+from app.database import get_db
+
+
+class MediaItem:
+    """画像一覧（media_items テーブル）モデル
+
+    作物・場所・日記・収穫記録・栽培記録の画像をまとめたテーブルで、
+    マイグレーション 017 のトリガーで更新される。
+    """
+
+    # 種類ごとの (詳細ページのエンドポイント, 引数名, アイコン, 表示名)
+    TYPE_CONFIG = {
+        'crop': ('crops.detail', 'crop_id', 'icon_crop.png', '作物'),
+        'location': ('locations.detail', 'location_id', 'icon_location.png', '場所'),
+        'diary': ('diary.detail', 'diary_id', 'icon_diary.png', '日記'),
+        'harvest': ('harvests.detail', 'harvest_id', 'icon_harvest.png', '収穫'),
+        'planting_record': ('plantings.record_detail', 'record_id', 'icon_location_crop.png', '栽培記録'),
+    }
+
+    @staticmethod
+    def _decorate(rows):
+        """詳細ページのURL・アイコン・表示名を付けた辞書のリストにする"""
+        items = []
+        for row in rows:
+            item = dict(row)
+            endpoint, param, icon, type_label = MediaItem.TYPE_CONFIG[item['type']]
+            item['detail_url'] = url_for(endpoint, **{param: item['id']})
+            item['icon'] = icon
+            item['type_label'] = type_label
+            items.append(item)
+        return items
+
+    @staticmethod
+    def get_recent(limit=20):
+        """新しい順に画像を取得（ダッシュボードのカルーセル用）"""
+        db = get_db()
+        rows = db.execute(
+            '''SELECT entity_type AS type, entity_id AS id, image_path, label, sort_date,
+                      crop_name, variety, icon_path, image_color
+               FROM media_items
+               ORDER BY sort_date DESC, entity_type DESC, entity_id DESC
+               LIMIT ?''',
+            (limit,)
+        ).fetchall()
+        return MediaItem._decorate(rows)
+
+    @staticmethod
+    def get_page(limit=40, before=None):
+        """キーセットページングで画像を取得（写真ギャラリー用）
+
+        Args:
+            before: 前ページ最後の画像の (sort_date, entity_type, entity_id)。None なら先頭から
+
+        Returns:
+            tuple: (画像のリスト, 次ページの before または None)
+        """
+        db = get_db()
+        query = '''SELECT entity_type AS type, entity_id AS id, image_path, label, sort_date,
+                          crop_name, variety, icon_path, image_color
+                   FROM media_items'''
+        params = []
+        if before:
+            query += ' WHERE (sort_date, entity_type, entity_id) < (?, ?, ?)'
+            params.extend(before)
+        query += ' ORDER BY sort_date DESC, entity_type DESC, entity_id DESC LIMIT ?'
+        # 次ページの有無を知るために1件多く取得
+        params.append(limit + 1)
+        rows = db.execute(query, params).fetchall()
+
+        items = MediaItem._decorate(rows[:limit])
+        next_before = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_before = (last['sort_date'], last['type'], last['id'])
+        return items, next_before
+
+    @staticmethod
+    def count():
+        """画像の総数を取得"""
+        db = get_db()
+        result = db.execute('SELECT COUNT(*) as count FROM media_items').fetchone()
+        return result['count'] if result else 0
@@ -287,7 +287,20 @@ class Planting:
     def get_all_with_stats(status=None):
         """全ての作物を取得（作物・場所情報付き、栽培記録の件数・最新画像含む）。statusで絞り込み可能"""
         db = get_db()
-        query = '''SELECT lc.*,
+        query = Planting._stats_query()
+        params = []
+        if status:
+            query += ' AND lc.status = ?'
+            params.append(status)
+        query += " ORDER BY IFNULL(lc.planted_date, '') DESC, lc.created_at DESC, lc.id DESC"
+        crops = db.execute(query, params).fetchall()
+        today = get_jst_now()[:10]
+        return [Planting._with_days(crop, today) for crop in crops]
+
+    @staticmethod
+    def _stats_query():
+        """一覧用の SELECT（作物・場所情報、栽培記録の件数・最新画像付き。WHERE 句は呼び出し側で追加）"""
+        return '''SELECT lc.*,
                       c.name as crop_name, c.crop_type, c.variety,
                       c.icon_path, c.image_color,
                       l.name as location_name, l.location_type,
@@ -313,25 +326,75 @@ class Planting:
                        ORDER BY gr2.recorded_at DESC, gr2.id DESC
                        LIMIT 1
                    )
-               ) gr_img ON gr_img.location_crop_id = lc.id'''
+               ) gr_img ON gr_img.location_crop_id = lc.id
+               WHERE 1=1'''
+
+    @staticmethod
+    def _with_days(row, today):
+        """栽培中なら植え付けからの日数を付けた辞書にする"""
+        crop_dict = dict(row)
+        if crop_dict.get('status') == 'active':
+            crop_dict['days_from_planting'] = Planting._calculate_days(
+                crop_dict.get('planted_date'), today
+            )
+        else:
+            crop_dict['days_from_planting'] = None
+        return crop_dict
+
+    @staticmethod
+    def get_page(limit=30, after=None, status=None, crop_types=None):
+        """キーセットページングで植え付けを取得（一覧の無限スクロール用、get_all_with_stats と同じ並び）
+
+        植え付け日のないものは最後に並ぶよう、植え付け日は空文字に置き換えて比較する。
+
+        Args:
+            after: 前ページ最後の植え付けの (planted_date または '', created_at, id)。None なら先頭から
+            status: 絞り込むステータス（None なら全件）
+            crop_types: 絞り込む作物の種類のリスト（空なら全件）
+
+        Returns:
+            tuple: (植え付けのリスト, 次ページの after または None)
+        """
+        db = get_db()
+        query = Planting._stats_query()
         params = []
         if status:
-            query += ' WHERE lc.status = ?'
+            query += ' AND lc.status = ?'
             params.append(status)
-        query += ' ORDER BY lc.planted_date DESC'
-        crops = db.execute(query, params).fetchall()
+        if crop_types:
+            query += f" AND c.crop_type IN ({','.join('?' * len(crop_types))})"
+            params.extend(crop_types)
+        if after:
+            query += " AND (IFNULL(lc.planted_date, ''), lc.created_at, lc.id) < (?, ?, ?)"
+            params.extend(after)
+        query += " ORDER BY IFNULL(lc.planted_date, '') DESC, lc.created_at DESC, lc.id DESC LIMIT ?"
+        # 次ページの有無を知るために1件多く取得
+        params.append(limit + 1)
+        rows = db.execute(query, params).fetchall()
+
         today = get_jst_now()[:10]
-        result = []
-        for crop in crops:
-            crop_dict = dict(crop)
-            if crop_dict.get('status') == 'active':
-                crop_dict['days_from_planting'] = Planting._calculate_days(
-                    crop_dict.get('planted_date'), today
-                )
-            else:
-                crop_dict['days_from_planting'] = None
-            result.append(crop_dict)
-        return result
+        crops = [Planting._with_days(row, today) for row in rows[:limit]]
+        next_after = None
+        if len(rows) > limit:
+            last = crops[-1]
+            next_after = (last['planted_date'] or '', last['created_at'], last['id'])
+        return crops, next_after
+
+    @staticmethod
+    def count_by_crop_type(status=None):
+        """作物の種類ごとの植え付け数を {種類: 件数} で取得（get_all_with_stats と同じ条件）"""
+        db = get_db()
+        query = '''SELECT c.crop_type, COUNT(*) as count
+                   FROM plantings lc
+                   JOIN crops c ON lc.crop_id = c.id
+                   JOIN locations l ON lc.location_id = l.id'''
+        params = []
+        if status:
+            query += ' WHERE lc.status = ?'
+            params.append(status)
+        query += ' GROUP BY c.crop_type'
+        rows = db.execute(query, params).fetchall()
+        return {row['crop_type']: row['count'] for row in rows}
 
     @staticmethod
     def update_position(location_crop_id, position_x, position_y):
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from app.database import get_db
+from app.models.loader import fetch_grouped
 from app.utils.timezone import get_jst_now
 
 
@@ -22,26 +23,32 @@ class PlantingRecord:
     @staticmethod
     def get_by_location_crop(location_crop_id):
         """特定の栽培に紐づく記録一覧を取得"""
-        db = get_db()
-        records = db.execute(
+        return PlantingRecord.load_many([location_crop_id]).get(location_crop_id, [])
+
+    @staticmethod
+    def load_many(location_crop_ids):
+        """複数の栽培に紐づく記録一覧を1クエリで取得
+
+        Returns:
+            dict: {location_crop_id: [栽培記録, ...]}（recorded_at DESC順）
+        """
+        grouped = fetch_grouped(
             '''SELECT gr.*, c.name as crop_name, c.variety, l.name as location_name,
                       lc.location_id, lc.crop_id, lc.planted_date
                FROM planting_records gr
                JOIN plantings lc ON gr.location_crop_id = lc.id
                JOIN crops c ON lc.crop_id = c.id
                JOIN locations l ON lc.location_id = l.id
-               WHERE gr.location_crop_id = ?
+               WHERE gr.location_crop_id IN ({keys})
                ORDER BY gr.recorded_at DESC, gr.created_at DESC''',
-            (location_crop_id,)
-        ).fetchall()
-        result = []
-        for r in records:
-            record_dict = dict(r)
-            record_dict['days_from_planting'] = PlantingRecord._calculate_days(
-                record_dict.get('planted_date'), record_dict.get('recorded_at')
-            )
-            result.append(record_dict)
-        return result
+            location_crop_ids, 'location_crop_id'
+        )
+        for records in grouped.values():
+            for record_dict in records:
+                record_dict['days_from_planting'] = PlantingRecord._calculate_days(
+                    record_dict.get('planted_date'), record_dict.get('recorded_at')
+                )
+        return grouped
 
     @staticmethod
     def get_recent(limit=5):
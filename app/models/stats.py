@@ -0,0 +1,57 @@
+from app.database import get_db
+
+
+class Stats:
+    """ダッシュボード統計（stats_counters テーブル）モデル
+
+    カウンターはマイグレーション 016 のトリガーで更新される。
+    """
+
+    # 再集計用のクエリ（各モデルの count 系メソッドと同じ条件）
+    REBUILD_QUERY = '''
+        SELECT 'crops', COUNT(*) FROM crops
+        UNION ALL
+        SELECT 'locations', COUNT(*) FROM locations
+        UNION ALL
+        SELECT 'diary_entries', COUNT(*) FROM diary_entries
+        UNION ALL
+        SELECT 'plantings.active', COUNT(*) FROM plantings lc
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+            WHERE lc.status = 'active'
+        UNION ALL
+        SELECT 'harvests', COUNT(*) FROM harvests h
+            JOIN plantings lc ON h.location_crop_id = lc.id
+            JOIN crops c ON lc.crop_id = c.id
+            JOIN locations l ON lc.location_id = l.id
+        UNION ALL
+        SELECT 'tasks.' || COALESCE(status, ''), COUNT(*) FROM tasks GROUP BY status
+    '''
+
+    @staticmethod
+    def get_counters():
+        """全カウンターを {名前: 値} で取得"""
+        db = get_db()
+        rows = db.execute('SELECT name, value FROM stats_counters').fetchall()
+        return {row['name']: row['value'] for row in rows}
+
+    @staticmethod
+    def get_dashboard_stats():
+        """ダッシュボード用の統計情報を取得（1クエリ）"""
+        counters = Stats.get_counters()
+        return {
+            'crop_count': counters.get('crops', 0),
+            'location_count': counters.get('locations', 0),
+            'active_crop_count': counters.get('plantings.active', 0),
+            'diary_count': counters.get('diary_entries', 0),
+            'harvest_count': counters.get('harvests', 0),
+            'pending_task_count': counters.get('tasks.pending', 0) + counters.get('tasks.in_progress', 0),
+        }
+
+    @staticmethod
+    def rebuild():
+        """元のテーブルからカウンターを再集計（手作業でデータを直した後など）"""
+        db = get_db()
+        db.execute('DELETE FROM stats_counters')
+        db.execute(f'INSERT INTO stats_counters (name, value) {Stats.REBUILD_QUERY}')
+        db.commit()
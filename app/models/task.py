@@ -1,4 +1,5 @@
 from app.database import get_db
+from app.models.loader import fetch_grouped
 from app.utils.timezone import get_jst_now
 
 
@@ -161,31 +162,38 @@ class Task:
     @staticmethod
     def get_relations(task_id):
         """タスクに関連するデータを取得"""
-        db = get_db()
+        return Task.load_relations_many([task_id])[task_id]
+
+    @staticmethod
+    def load_relations_many(task_ids):
+        """複数のタスクの関連データを種類ごとに1クエリで取得
 
+        Returns:
+            dict: {task_id: {'crops': [...], 'locations': [...], 'location_crops': [...]}}
+        """
         # 関連する作物を取得
-        crops = db.execute(
-            '''SELECT tr.crop_id, c.name as crop_name, c.crop_type, c.variety,
+        crops = fetch_grouped(
+            '''SELECT tr.task_id, tr.crop_id, c.name as crop_name, c.crop_type, c.variety,
                       c.icon_path, c.image_color, c.image_path as crop_image_path
                FROM task_relations tr
                JOIN crops c ON tr.crop_id = c.id
-               WHERE tr.task_id = ? AND tr.relation_type = 'crop' ''',
-            (task_id,)
-        ).fetchall()
+               WHERE tr.relation_type = 'crop' AND tr.task_id IN ({keys})''',
+            task_ids, 'task_id'
+        )
 
         # 関連する場所を取得
-        locations = db.execute(
-            '''SELECT tr.location_id, l.name as location_name, l.location_type,
+        locations = fetch_grouped(
+            '''SELECT tr.task_id, tr.location_id, l.name as location_name, l.location_type,
                       l.image_path as location_image_path
                FROM task_relations tr
                JOIN locations l ON tr.location_id = l.id
-               WHERE tr.task_id = ? AND tr.relation_type = 'location' ''',
-            (task_id,)
-        ).fetchall()
+               WHERE tr.relation_type = 'location' AND tr.task_id IN ({keys})''',
+            task_ids, 'task_id'
+        )
 
         # 関連する植え付け場所を取得
-        location_crops = db.execute(
-            '''SELECT lc.id as id, lc.id as location_crop_id, c.name as crop_name, c.variety,
+        location_crops = fetch_grouped(
+            '''SELECT tr.task_id, lc.id as id, lc.id as location_crop_id, c.name as crop_name, c.variety,
                       c.icon_path, c.image_color, l.name as location_name,
                       lc.location_id, lc.planted_date, lc.status,
                       (SELECT pr.image_path FROM planting_records pr
@@ -195,14 +203,17 @@ class Task:
                JOIN plantings lc ON tr.location_crop_id = lc.id
                JOIN crops c ON lc.crop_id = c.id
                JOIN locations l ON lc.location_id = l.id
-               WHERE tr.task_id = ? AND tr.relation_type = 'location_crop' ''',
-            (task_id,)
-        ).fetchall()
+               WHERE tr.relation_type = 'location_crop' AND tr.task_id IN ({keys})''',
+            task_ids, 'task_id'
+        )
 
         return {
-            'crops': [dict(c) for c in crops],
-            'locations': [dict(l) for l in locations],
-            'location_crops': [dict(lc) for lc in location_crops]
+            task_id: {
+                'crops': crops.get(task_id, []),
+                'locations': locations.get(task_id, []),
+                'location_crops': location_crops.get(task_id, [])
+            }
+            for task_id in task_ids
         }
 
     @staticmethod
@@ -291,9 +302,13 @@ class Task:
         return Task.STATUS_BADGES.get(status, 'bg-secondary')
 
     @staticmethod
-    def get_upcoming_task_counts(relation_type, entity_ids):
-        """エンティティごとの期限間近タスク数を一括取得（一覧画面用）"""
-        if not entity_ids:
+    def get_upcoming_task_counts(relation_type, entity_ids=None):
+        """エンティティごとの期限間近タスク数を一括取得（一覧画面用）
+
+        entity_ids を省略すると、期限間近タスクのある全エンティティを対象にする
+        （一覧をストリーミング描画する場合は ID を先に集められないため）。
+        """
+        if entity_ids is not None and not entity_ids:
             return {}
         db = get_db()
         col_map = {
@@ -304,18 +319,22 @@ class Task:
         col = col_map.get(relation_type)
         if not col:
             return {}
-        placeholders = ','.join('?' * len(entity_ids))
+        params = [relation_type]
+        id_filter = ''
+        if entity_ids is not None:
+            id_filter = f"AND tr.{col} IN ({','.join('?' * len(entity_ids))})"
+            params.extend(entity_ids)
         rows = db.execute(f'''
             SELECT tr.{col} as entity_id, COUNT(DISTINCT t.id) as task_count
             FROM task_relations tr
             JOIN tasks t ON tr.task_id = t.id
             WHERE tr.relation_type = ?
-              AND tr.{col} IN ({placeholders})
+              {id_filter}
               AND t.status != 'completed'
               AND t.due_date IS NOT NULL
               AND DATE(t.due_date) <= DATE('now', '+9 hours', '+7 days')
             GROUP BY tr.{col}
-        ''', [relation_type] + list(entity_ids)).fetchall()
+        ''', params).fetchall()
         return {row['entity_id']: row['task_count'] for row in rows}
 
     @staticmethod
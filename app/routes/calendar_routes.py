@@ -1,10 +1,26 @@
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, jsonify, abort, current_app, stream_with_context
 from datetime import date
 
-from app.models.calendar import Calendar
+from app.models.calendar import Calendar, ACTIVITY_TYPES
+from app.models.crop import Crop
+from app.models.location import Location
+from app.utils import calendar_cache
+from app.utils.conditional import not_modified
+from app.utils.ical import stream_calendar
 
 bp = Blueprint('calendar', __name__, url_prefix='/calendar')
 
+# 活動件数APIで一度に取得できる最大日数（約3年分）
+MAX_ACTIVITY_DAYS = 3 * 366
+
+
+def _parse_date(value):
+    """'YYYY-MM-DD' を date にする（不正なら None）"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
 
 @bp.route('/')
 def index():
@@ -35,7 +51,7 @@ def index():
 
     # カレンダーデータを取得
     calendar_weeks = Calendar.get_calendar_weeks(year, month)
-    month_data = Calendar.get_month_data(year, month)
+    month_data = calendar_cache.get_month_data(year, month)
 
     return render_template('calendar/index.html',
                            year=year,
@@ -47,3 +63,69 @@ def index():
                            next_month=next_month,
                            calendar_weeks=calendar_weeks,
                            month_data=month_data)
+
+
+@bp.route('/year')
+def year():
+    """年間の活動ヒートマップ（件数は活動件数APIから calendar-heatmap.js で描画）"""
+    today = date.today()
+    year = request.args.get('year', today.year, type=int)
+    year = min(max(year, 1), 9999)
+    return render_template('calendar/year.html', year=year, today=today)
+
+
+@bp.route('/api/activity')
+def api_activity():
+    """期間内の日ごとの活動件数（種類別）を返すAPI
+
+    クエリパラメータ: start, end（YYYY-MM-DD、両端を含む。最大 MAX_ACTIVITY_DAYS 日）
+
+    Returns:
+        {start, end, types: 種類の並び, days: {日付: 種類の並び順の件数リスト}}
+        活動のない日は days に含まない
+    """
+    start = _parse_date(request.args.get('start'))
+    end = _parse_date(request.args.get('end'))
+    if start is None or end is None:
+        return jsonify({'error': 'start and end must be YYYY-MM-DD'}), 400
+    if end < start or (end - start).days >= MAX_ACTIVITY_DAYS:
+        return jsonify({'error': f'range must be 1 to {MAX_ACTIVITY_DAYS} days'}), 400
+
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'types': list(ACTIVITY_TYPES),
+        'days': Calendar.get_activity_counts(start, end),
+    })
+
+
+@bp.route('/feed.ics')
+def feed():
+    """植え付け・収穫・タスクの iCalendar フィード（カレンダーアプリの購読用）
+
+    クエリパラメータ: location_id, crop_id（指定した場所・作物に関係するものだけにする）
+    定期的に取得するクライアントには、どのテーブルにも書き込みがなければ 304 を返す。
+    """
+    response = not_modified(None)
+    if response:
+        return response
+
+    location_id = request.args.get('location_id', type=int)
+    crop_id = request.args.get('crop_id', type=int)
+    names = ['家庭菜園']
+    if location_id is not None:
+        location = Location.get_by_id(location_id)
+        if not location:
+            abort(404)
+        names.append(location['name'])
+    if crop_id is not None:
+        crop = Crop.get_by_id(crop_id)
+        if not crop:
+            abort(404)
+        names.append(crop['name'])
+
+    items = Calendar.iter_feed_items(location_id=location_id, crop_id=crop_id)
+    body = stream_calendar(items, ' - '.join(names), request.host_url.rstrip('/'), request.host)
+    response = current_app.response_class(stream_with_context(body), mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="garden.ics"'
+    return response
@@ -7,19 +7,66 @@ from app.models.harvest import Harvest
 from app.models.task import Task
 from app.models.supplement import Supplement
 from app.utils.upload import save_image, delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
+from app.utils.pagination import (
+    PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, invalid_cursor_response,
+    page_limit, page_response,
+)
 
 bp = Blueprint('crops', __name__, url_prefix='/crops')
 
+# 作物の詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+CROP_DETAIL_TABLES = ('crops', 'plantings', 'locations', 'planting_records', 'harvests',
+                      'diary_entries', 'diary_relations', 'tasks', 'task_relations', 'supplements')
+
 
 @bp.route('/')
 def list():
-    """作物一覧"""
-    crops = Crop.get_all()
-    crop_ids = [c['id'] for c in crops]
-    task_counts = Task.get_upcoming_task_counts('crop', crop_ids)
-    filter_types = sorted(set(c['crop_type'] for c in crops if c['crop_type']))
-    active_crop_ids = Planting.get_active_crop_ids()
-    return render_template('crops/list.html', crops=crops, task_counts=task_counts, filter_types=filter_types, active_crop_ids=active_crop_ids)
+    """作物一覧（先頭ページ。続きは api_list で無限スクロール）"""
+    try:
+        after = decode_cursor(request.args.get('after'), 2)
+    except InvalidCursor:
+        return redirect(url_for('crops.list'))
+
+    crops, next_after = Crop.get_page(PAGE_SIZE, after)
+    type_counts = Crop.count_by_crop_type()
+    return render_template('crops/list.html',
+                           crops=crops,
+                           next_cursor=encode_cursor(next_after),
+                           is_first_page=after is None,
+                           total_count=sum(type_counts.values()),
+                           filter_types=sorted(t for t in type_counts if t),
+                           **_card_context(crops))
+
+
+@bp.route('/api/list')
+def api_list():
+    """作物一覧の続きを返すAPI（無限スクロール用）
+
+    クエリパラメータ: after（カーソル）, limit, type（作物の種類、複数指定可）
+    """
+    try:
+        after = decode_cursor(request.args.get('after'), 2)
+    except InvalidCursor:
+        return invalid_cursor_response()
+
+    crop_types = request.args.getlist('type')
+    crops, next_after = Crop.get_page(page_limit(), after, crop_types)
+    total = None
+    if after is None:
+        type_counts = Crop.count_by_crop_type()
+        total = sum(type_counts.get(t, 0) for t in crop_types) if crop_types else sum(type_counts.values())
+    html = render_template('crops/_cards.html', crops=crops, **_card_context(crops))
+    return page_response(html, next_after, total)
+
+
+def _card_context(crops):
+    """一覧のカードに表示するタスク数・栽培中の作物ID（表示するページの分だけ取得）"""
+    return {
+        'task_counts': Task.get_upcoming_task_counts('crop', [crop['id'] for crop in crops]),
+        'active_crop_ids': Planting.get_active_crop_ids(),
+    }
 
 
 @bp.route('/<int:crop_id>')
@@ -30,16 +77,21 @@ def detail(crop_id):
         flash('作物が見つかりません', 'danger')
         return redirect(url_for('crops.list'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(crop['updated_at'], tables=CROP_DETAIL_TABLES)
+    if response:
+        return response
+
     # 栽培中の植え付けを取得
     related_plantings = Planting.get_by_crop(crop_id, status='active')
     # 関連する収穫を取得
-    related_harvests = Harvest.get_by_crop(crop_id, limit=10)
+    related_harvests = LazyResult(Harvest.get_by_crop, crop_id, limit=10)
     # 関連する日記を取得
-    related_diaries = DiaryEntry.get_by_crop(crop_id, limit=10)
+    related_diaries = LazyResult(DiaryEntry.get_by_crop, crop_id, limit=10)
 
     prev_crop, next_crop = Crop.get_adjacent(crop_id)
-    related_tasks = Task.get_incomplete_tasks_for_entity('crop', crop_id)
-    supplements = Supplement.get_by_entity('crop', crop_id)
+    related_tasks = LazyResult(Task.get_incomplete_tasks_for_entity, 'crop', crop_id)
+    supplements = LazyResult(Supplement.get_by_entity, 'crop', crop_id)
 
     return render_template('crops/detail.html',
                           crop=crop,
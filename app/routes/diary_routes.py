@@ -7,26 +7,63 @@ from app.models.planting import Planting
 from app.models.harvest import Harvest
 from app.models.supplement import Supplement
 from app.utils.upload import save_image, delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
+from app.utils.pagination import (
+    PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, invalid_cursor_response,
+    page_limit, page_response,
+)
 
 bp = Blueprint('diary', __name__, url_prefix='/diary')
 
+# 日記の詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+DIARY_DETAIL_TABLES = ('diary_entries', 'diary_relations', 'crops', 'locations', 'plantings',
+                       'planting_records', 'harvests', 'supplements')
+
 
 @bp.route('/')
 def list():
-    """日記一覧"""
+    """日記一覧（先頭ページ。続きは api_list で無限スクロール）"""
     keyword = request.args.get('keyword', '')
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return redirect(url_for('diary.list', keyword=keyword or None))
 
-    if keyword:
-        entries = DiaryEntry.search(keyword=keyword)
-    else:
-        entries = DiaryEntry.get_all()
-
-    years = sorted(set(str(e['entry_date'])[:4] for e in entries if e.get('entry_date')), reverse=True)
+    entries, next_after = DiaryEntry.get_page(PAGE_SIZE, after, keyword=keyword)
+    year_counts = DiaryEntry.count_by_year(keyword=keyword)
+    years = sorted((y for y in year_counts if y), reverse=True)
 
     return render_template('diary/list.html',
-                          entries=entries,
-                          keyword=keyword,
-                          years=years)
+                           entries=entries,
+                           next_cursor=encode_cursor(next_after),
+                           is_first_page=after is None,
+                           total_count=sum(year_counts.values()),
+                           keyword=keyword,
+                           years=years)
+
+
+@bp.route('/api/list')
+def api_list():
+    """日記一覧の続きを返すAPI（無限スクロール用）
+
+    クエリパラメータ: after（カーソル）, limit, keyword, year・month（年・月バッジ、複数指定可）
+    """
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return invalid_cursor_response()
+
+    keyword = request.args.get('keyword', '')
+    years = request.args.getlist('year', type=int)
+    months = [m for m in request.args.getlist('month', type=int) if 1 <= m <= 12]
+    entries, next_after = DiaryEntry.get_page(page_limit(), after, keyword=keyword,
+                                              years=years, months=months)
+    total = None
+    if after is None:
+        total = DiaryEntry.count(keyword=keyword, years=years, months=months)
+    html = render_template('diary/_cards.html', entries=entries)
+    return page_response(html, next_after, total)
 
 
 @bp.route('/<int:diary_id>')
@@ -37,9 +74,14 @@ def detail(diary_id):
         flash('日記が見つかりません', 'danger')
         return redirect(url_for('diary.list'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(entry['updated_at'], tables=DIARY_DETAIL_TABLES)
+    if response:
+        return response
+
     relations = DiaryEntry.get_relations(diary_id)
     prev_entry, next_entry = DiaryEntry.get_adjacent(diary_id)
-    supplements = Supplement.get_by_entity('diary', diary_id)
+    supplements = LazyResult(Supplement.get_by_entity, 'diary', diary_id)
 
     return render_template('diary/detail.html',
                           entry=entry,
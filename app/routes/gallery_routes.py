@@ -0,0 +1,26 @@
+from flask import Blueprint, render_template, request
+from app.models.media import MediaItem
+
+bp = Blueprint('gallery', __name__, url_prefix='/gallery')
+
+# 1ページあたりの画像数
+PAGE_SIZE = 40
+
+
+@bp.route('/')
+def index():
+    """写真ギャラリー（新しい順、キーセットページング）"""
+    before = None
+    before_date = request.args.get('before_date')
+    before_type = request.args.get('before_type')
+    before_id = request.args.get('before_id', type=int)
+    if before_date is not None and before_type and before_id is not None:
+        before = (before_date, before_type, before_id)
+
+    images, next_before = MediaItem.get_page(PAGE_SIZE, before)
+    # 総数（全件の COUNT）は最初のページの見出しにだけ出す
+    return render_template('gallery/index.html',
+                           images=images,
+                           next_before=next_before,
+                           is_first_page=before is None,
+                           total_count=MediaItem.count() if before is None else None)
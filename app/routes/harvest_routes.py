@@ -5,17 +5,59 @@ from app.models.location import Location
 from app.models.crop import Crop
 from app.models.diary import DiaryEntry
 from app.utils.upload import save_image, delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
+from app.utils.pagination import (
+    PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, invalid_cursor_response,
+    page_limit, page_response,
+)
 from datetime import date
 
 bp = Blueprint('harvests', __name__, url_prefix='/harvests')
 
+# 収穫記録の詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+HARVEST_DETAIL_TABLES = ('harvests', 'plantings', 'crops', 'locations', 'planting_records',
+                         'diary_entries', 'diary_relations')
+
 
 @bp.route('/')
 def list():
-    """収穫記録一覧"""
-    harvests = Harvest.get_all()
-    filter_types = sorted(set(h['crop_type'] for h in harvests if h['crop_type']))
-    return render_template('harvests/list.html', harvests=harvests, filter_types=filter_types)
+    """収穫記録一覧（先頭ページ。続きは api_list で無限スクロール）"""
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return redirect(url_for('harvests.list'))
+
+    harvests, next_after = Harvest.get_page(PAGE_SIZE, after)
+    type_counts = Harvest.count_by_crop_type()
+    return render_template('harvests/list.html',
+                           harvests=harvests,
+                           next_cursor=encode_cursor(next_after),
+                           is_first_page=after is None,
+                           total_count=sum(type_counts.values()),
+                           has_images=Harvest.has_images(),
+                           filter_types=sorted(t for t in type_counts if t))
+
+
+@bp.route('/api/list')
+def api_list():
+    """収穫記録一覧の続きを返すAPI（無限スクロール用）
+
+    クエリパラメータ: after（カーソル）, limit, type（作物の種類、複数指定可）
+    """
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return invalid_cursor_response()
+
+    crop_types = request.args.getlist('type')
+    harvests, next_after = Harvest.get_page(page_limit(), after, crop_types)
+    total = None
+    if after is None:
+        type_counts = Harvest.count_by_crop_type()
+        total = sum(type_counts.get(t, 0) for t in crop_types) if crop_types else sum(type_counts.values())
+    html = render_template('harvests/_cards.html', harvests=harvests)
+    return page_response(html, next_after, total)
 
 
 @bp.route('/<int:harvest_id>')
@@ -26,6 +68,11 @@ def detail(harvest_id):
         flash('収穫記録が見つかりません', 'danger')
         return redirect(url_for('harvests.list'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(harvest['updated_at'], tables=HARVEST_DETAIL_TABLES)
+    if response:
+        return response
+
     prev_harvest, next_harvest = Harvest.get_adjacent(harvest_id)
 
     # 関連する植え付け
@@ -33,7 +80,7 @@ def detail(harvest_id):
     related_plantings = [planting] if planting else []
 
     # 関連する日記
-    related_diaries = DiaryEntry.get_by_harvest(harvest_id, limit=10)
+    related_diaries = LazyResult(DiaryEntry.get_by_harvest, harvest_id, limit=10)
 
     return render_template('harvests/detail.html',
                           harvest=harvest,
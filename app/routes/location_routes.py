@@ -1,5 +1,6 @@
+import hashlib
 from datetime import date
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
 from app.models.location import Location
 from app.models.planting import Planting
 from app.models.crop import Crop
@@ -8,9 +9,15 @@ from app.models.harvest import Harvest
 from app.models.task import Task
 from app.models.supplement import Supplement
 from app.utils.upload import save_image, delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
 
 bp = Blueprint('locations', __name__, url_prefix='/locations')
 
+# 場所の詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+LOCATION_DETAIL_TABLES = ('locations', 'plantings', 'crops', 'planting_records', 'harvests',
+                          'diary_entries', 'diary_relations', 'tasks', 'task_relations', 'supplements')
+
 
 @bp.route('/')
 def list():
@@ -37,25 +44,31 @@ def detail(location_id):
         flash('場所が見つかりません', 'danger')
         return redirect(url_for('locations.list'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(location['updated_at'], tables=LOCATION_DETAIL_TABLES)
+    if response:
+        return response
+
     # 栽培中の作物を取得
     active_crops = Planting.get_by_location(location_id, status='active')
 
-    # 各栽培記録に収穫履歴・植え付け日数を追加
+    # 各栽培記録に収穫履歴・植え付け日数を追加（収穫履歴は一括取得）
     today = date.today().isoformat()
+    harvests_by_planting = Harvest.load_many_by_location_crop([c['id'] for c in active_crops])
     for crop in active_crops:
-        crop['harvests'] = Harvest.get_by_location_crop(crop['id'])
+        crop['harvests'] = harvests_by_planting.get(crop['id'], [])
         crop['days_from_planting'] = Planting._calculate_days(crop.get('planted_date'), today)
 
     # 関連する日記を取得
-    related_diaries = DiaryEntry.get_by_location(location_id, limit=10)
+    related_diaries = LazyResult(DiaryEntry.get_by_location, location_id, limit=10)
 
     # 関連する収穫を取得
-    related_harvests = Harvest.get_by_location(location_id, limit=10)
+    related_harvests = LazyResult(Harvest.get_by_location, location_id, limit=10)
 
     today = date.today().isoformat()
     prev_location, next_location = Location.get_adjacent(location_id)
-    related_tasks = Task.get_incomplete_tasks_for_entity('location', location_id)
-    supplements = Supplement.get_by_entity('location', location_id)
+    related_tasks = LazyResult(Task.get_incomplete_tasks_for_entity, 'location', location_id)
+    supplements = LazyResult(Supplement.get_by_entity, 'location', location_id)
 
     return render_template('locations/detail.html',
                           location=location,
@@ -278,12 +291,17 @@ def canvas(location_id):
 
 @bp.route('/<int:location_id>/canvas/data', methods=['GET'])
 def get_canvas_data(location_id):
-    """キャンバスデータ取得API"""
-    canvas_data = Location.get_canvas_data(location_id)
-    if canvas_data:
-        return jsonify(canvas_data)
-    else:
-        return jsonify({'version': '2.0', 'placements': []})
+    """キャンバスデータ取得API
+
+    保存済みの JSON をデコード・再エンコードせずにそのまま返し、内容のハッシュを ETag にする。
+    プレビュー・履歴・編集画面が繰り返し取得するので、変わっていなければ 304 で済ませる。
+    """
+    canvas_json = Location.get_canvas_json(location_id) or Location.EMPTY_CANVAS_JSON
+    body = canvas_json.encode('utf-8')
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(hashlib.sha1(body).hexdigest())
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @bp.route('/<int:location_id>/canvas/history/range', methods=['GET'])
@@ -8,23 +8,67 @@ from app.models.task import Task
 from app.models.harvest import Harvest
 from app.models.diary import DiaryEntry
 from app.utils.upload import save_image, delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
+from app.utils.pagination import (
+    PAGE_SIZE, InvalidCursor, decode_cursor, encode_cursor, invalid_cursor_response,
+    page_limit, page_response,
+)
 from datetime import date
 
 bp = Blueprint('plantings', __name__, url_prefix='/plantings')
 
+# 植え付けの詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+PLANTING_DETAIL_TABLES = ('plantings', 'crops', 'locations', 'planting_records', 'harvests',
+                          'diary_entries', 'diary_relations', 'tasks', 'task_relations')
+
 
 @bp.route('/')
 def index():
-    """栽培記録一覧（タブフィルター付き）"""
+    """栽培記録一覧（タブフィルター付き、先頭ページ。続きは api_list で無限スクロール）"""
     status = request.args.get('status', 'active')
-    if status == 'all':
-        crops = Planting.get_all_with_stats(status=None)
-    else:
-        crops = Planting.get_all_with_stats(status=status)
-    planting_ids = [c['id'] for c in crops]
-    task_counts = Task.get_upcoming_task_counts('location_crop', planting_ids)
-    filter_types = sorted(set(c['crop_type'] for c in crops if c['crop_type']))
-    return render_template('plantings/list.html', crops=crops, current_status=status, task_counts=task_counts, filter_types=filter_types)
+    status_filter = None if status == 'all' else status
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return redirect(url_for('plantings.index', status=status))
+
+    crops, next_after = Planting.get_page(PAGE_SIZE, after, status=status_filter)
+    type_counts = Planting.count_by_crop_type(status=status_filter)
+    return render_template('plantings/list.html',
+                           crops=crops,
+                           next_cursor=encode_cursor(next_after),
+                           is_first_page=after is None,
+                           total_count=sum(type_counts.values()),
+                           current_status=status,
+                           task_counts=Task.get_upcoming_task_counts('location_crop', [c['id'] for c in crops]),
+                           filter_types=sorted(t for t in type_counts if t))
+
+
+@bp.route('/api/list')
+def api_list():
+    """栽培記録一覧の続きを返すAPI（無限スクロール用）
+
+    クエリパラメータ: after（カーソル）, limit, status（active / harvested / all）,
+    type（作物の種類、複数指定可）
+    """
+    status = request.args.get('status', 'active')
+    status_filter = None if status == 'all' else status
+    try:
+        after = decode_cursor(request.args.get('after'), 3)
+    except InvalidCursor:
+        return invalid_cursor_response()
+
+    crop_types = request.args.getlist('type')
+    crops, next_after = Planting.get_page(page_limit(), after, status=status_filter, crop_types=crop_types)
+    total = None
+    if after is None:
+        type_counts = Planting.count_by_crop_type(status=status_filter)
+        total = sum(type_counts.get(t, 0) for t in crop_types) if crop_types else sum(type_counts.values())
+    html = render_template('plantings/_cards.html',
+                           crops=crops,
+                           task_counts=Task.get_upcoming_task_counts('location_crop', [c['id'] for c in crops]))
+    return page_response(html, next_after, total)
 
 
 @bp.route('/<int:location_crop_id>')
@@ -35,6 +79,11 @@ def detail(location_crop_id):
         flash('栽培情報が見つかりません', 'danger')
         return redirect(url_for('plantings.index'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(location_crop['updated_at'], tables=PLANTING_DETAIL_TABLES)
+    if response:
+        return response
+
     records = PlantingRecord.get_by_location_crop(location_crop_id)
     location = Location.get_by_id(location_crop['location_id'])
     today = date.today().isoformat()
@@ -47,9 +96,9 @@ def detail(location_crop_id):
             canvas_snapshot = None
 
     prev_planting, next_planting = Planting.get_adjacent(location_crop_id)
-    related_tasks = Task.get_incomplete_tasks_for_entity('location_crop', location_crop_id)
-    related_harvests = Harvest.get_by_location_crop(location_crop_id, limit=10)
-    related_diaries = DiaryEntry.get_by_location_crop(location_crop_id, limit=10)
+    related_tasks = LazyResult(Task.get_incomplete_tasks_for_entity, 'location_crop', location_crop_id)
+    related_harvests = LazyResult(Harvest.get_by_location_crop, location_crop_id, limit=10)
+    related_diaries = LazyResult(DiaryEntry.get_by_location_crop, location_crop_id, limit=10)
 
     return render_template('plantings/detail.html',
                           records=records,
@@ -5,9 +5,15 @@ from app.models.crop import Crop
 from app.models.location import Location
 from app.models.supplement import Supplement
 from app.utils.upload import delete_image
+from app.utils.fragment_cache import LazyResult
+from app.utils.conditional import not_modified
 
 bp = Blueprint('tasks', __name__, url_prefix='/tasks')
 
+# タスクの詳細画面が表示するテーブル（条件付き GET の検証子に使う）
+TASK_DETAIL_TABLES = ('tasks', 'task_relations', 'crops', 'locations', 'plantings',
+                      'planting_records', 'supplements')
+
 
 @bp.route('/')
 def list():
@@ -39,9 +45,14 @@ def detail(task_id):
         flash('タスクが見つかりません', 'danger')
         return redirect(url_for('tasks.list'))
 
+    # 内容が変わっていなければ描画せずに 304 を返す
+    response = not_modified(task['updated_at'], tables=TASK_DETAIL_TABLES)
+    if response:
+        return response
+
     relations = Task.get_relations(task_id)
     prev_task, next_task = Task.get_adjacent(task_id)
-    supplements = Supplement.get_by_entity('task', task_id)
+    supplements = LazyResult(Supplement.get_by_entity, 'task', task_id)
 
     return render_template('tasks/detail.html',
                           task=task,
@@ -7,11 +7,18 @@
  *   [data-filter-type]       … フィルタ対象のカードラッパー
  *   #filter-count            … 件数表示（data-suffix="件の作物" 等）
  *   #filter-empty-msg        … 0件時メッセージ（初期 display:none）
+ *
+ * 一覧が無限スクロール（#infinite-list、infinite-list.js）の場合は、
+ * 読み込み済みのカードを隠すのではなく type パラメータ付きで API から読み直す。
  */
 document.addEventListener('DOMContentLoaded', function () {
     var container = document.getElementById('badge-filter-container');
     if (!container) return;
 
+    var infinite = window.InfiniteList
+        ? window.InfiniteList.attach(document.getElementById('infinite-list'))
+        : null;
+
     var badges = container.querySelectorAll('.badge-filter');
     var items = document.querySelectorAll('[data-filter-type]');
     var countEl = document.getElementById('filter-count');
@@ -36,6 +43,11 @@ document.addEventListener('DOMContentLoaded', function () {
     });
 
     function applyFilter() {
+        if (infinite) {
+            infinite.reload({ type: Array.from(selectedTypes) }).then(showCount);
+            return;
+        }
+
         var visibleCount = 0;
         items.forEach(function (item) {
             var types = item.dataset.filterType ? item.dataset.filterType.split(',') : [];
@@ -43,11 +55,16 @@ document.addEventListener('DOMContentLoaded', function () {
             item.style.display = show ? '' : 'none';
             if (show) visibleCount++;
         });
+        showCount(visibleCount);
+    }
+
+    function showCount(count) {
+        if (count === null || count === undefined) return;
         if (countEl) {
-            countEl.textContent = visibleCount + suffix;
+            countEl.textContent = count + suffix;
         }
         if (emptyMsg) {
-            emptyMsg.style.display = visibleCount === 0 ? '' : 'none';
+            emptyMsg.style.display = count === 0 ? '' : 'none';
         }
     }
 });
@@ -0,0 +1,186 @@
+/**
+ * calendar-heatmap.js — 年間の活動ヒートマップ（カレンダーの活動件数API）
+ *
+ * 規約:
+ *   #activityHeatmap[data-year][data-activity-url][data-activity-types]  … 描画先
+ *   #heatmapTypes   … 種類の切り替えボタンの置き場所
+ *   #heatmapSummary … 年間の合計
+ *
+ * 1年分の日ごとの件数を1回のAPI呼び出しで取得し、列が週・行が曜日（日曜始まり）の
+ * マス目に描く。色の濃さは表示中の種類（またはすべての合計）の年間最大値に対する割合。
+ */
+(function () {
+    // 色の段階数（level-0 は活動なし）
+    var LEVELS = 4;
+    var WEEKDAY_LABELS = ['日', '', '火', '', '木', '', '土'];
+
+    function pad2(n) {
+        return (n < 10 ? '0' : '') + n;
+    }
+
+    function escapeHtml(str) {
+        return String(str)
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;');
+    }
+
+    function Heatmap(el) {
+        this.el = el;
+        this.year = parseInt(el.dataset.year, 10);
+        this.today = el.dataset.today;
+        this.monthUrl = el.dataset.monthUrl;
+        this.types = JSON.parse(el.dataset.activityTypes);
+        this.days = {};
+        // 表示中の種類の番号（null はすべての合計）
+        this.selected = null;
+    }
+
+    Heatmap.prototype.load = function () {
+        var self = this;
+        var url = this.el.dataset.activityUrl +
+            '?start=' + this.year + '-01-01&end=' + this.year + '-12-31';
+        return fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(function (res) {
+                if (!res.ok) throw new Error('HTTP ' + res.status);
+                return res.json();
+            })
+            .then(function (data) {
+                self.days = data.days;
+                self.renderTypeButtons();
+                self.render();
+            })
+            .catch(function (err) {
+                console.error('活動件数の読み込みに失敗しました:', err);
+                self.el.innerHTML = '<p class="text-danger">活動件数を読み込めませんでした</p>';
+            });
+    };
+
+    // 日の値（表示中の種類の件数、またはすべての合計）
+    Heatmap.prototype.value = function (counts) {
+        if (!counts) return 0;
+        if (this.selected !== null) return counts[this.selected];
+        return counts.reduce(function (sum, n) { return sum + n; }, 0);
+    };
+
+    Heatmap.prototype.renderTypeButtons = function () {
+        var container = document.getElementById('heatmapTypes');
+        if (!container) return;
+        var self = this;
+        var buttons = [{ label: 'すべて', index: null }].concat(this.types.map(function (type, index) {
+            return { label: type.label, icon: type.icon, index: index };
+        }));
+        container.innerHTML = buttons.map(function (button) {
+            var icon = button.icon
+                ? '<img src="' + escapeHtml(button.icon) + '" alt="" class="icon-img"> ' : '';
+            return '<button type="button" class="btn btn-sm btn-outline-success heatmap-type-btn' +
+                   (button.index === self.selected ? ' active' : '') + '"' +
+                   ' data-index="' + (button.index === null ? '' : button.index) + '">' +
+                   icon + escapeHtml(button.label) + '</button>';
+        }).join('');
+        container.addEventListener('click', function (e) {
+            var btn = e.target.closest('.heatmap-type-btn');
+            if (!btn) return;
+            self.selected = btn.dataset.index === '' ? null : parseInt(btn.dataset.index, 10);
+            [].slice.call(container.querySelectorAll('.heatmap-type-btn')).forEach(function (b) {
+                b.classList.toggle('active', b === btn);
+            });
+            self.render();
+        });
+    };
+
+    Heatmap.prototype.render = function () {
+        var self = this;
+        var year = this.year;
+        var first = new Date(year, 0, 1);
+        var offset = first.getDay();
+        var max = 0;
+        Object.keys(this.days).forEach(function (day) {
+            max = Math.max(max, self.value(self.days[day]));
+        });
+
+        var html = [];
+        // 曜日ラベル（1列目）
+        WEEKDAY_LABELS.forEach(function (label, weekday) {
+            html.push('<span class="heatmap-weekday" style="grid-row:' + (weekday + 2) + ';grid-column:1">' +
+                      label + '</span>');
+        });
+
+        var date = new Date(year, 0, 1);
+        var activeDays = 0;
+        while (date.getFullYear() === year) {
+            var month = date.getMonth() + 1;
+            var day = date.getDate();
+            var index = offset + Math.round((date - first) / 86400000);
+            var column = Math.floor(index / 7) + 2;
+            var row = date.getDay() + 2;
+            var dateStr = year + '-' + pad2(month) + '-' + pad2(day);
+            var counts = this.days[dateStr];
+            var value = this.value(counts);
+            var level = value ? Math.ceil(value / max * LEVELS) : 0;
+            if (value) activeDays++;
+
+            // 月の1日の列に月ラベル
+            if (day === 1) {
+                html.push('<span class="heatmap-month" style="grid-row:1;grid-column:' + column + '">' +
+                          month + '月</span>');
+            }
+            html.push('<a class="heatmap-cell level-' + level + (dateStr === this.today ? ' today' : '') + '"' +
+                      ' style="grid-row:' + row + ';grid-column:' + column + '"' +
+                      ' href="' + escapeHtml(this.monthUrl + '?year=' + year + '&month=' + month) + '"' +
+                      ' title="' + escapeHtml(this.describe(month, day, counts)) + '"></a>');
+            date.setDate(day + 1);
+        }
+        this.el.innerHTML = html.join('');
+        this.renderSummary(activeDays);
+    };
+
+    // セルのツールチップ「1月15日: 収穫 3件、日記 1件」
+    Heatmap.prototype.describe = function (month, day, counts) {
+        var parts = [];
+        if (counts) {
+            this.types.forEach(function (type, index) {
+                if (counts[index]) parts.push(type.label + ' ' + counts[index] + '件');
+            });
+        }
+        return month + '月' + day + '日: ' + (parts.length ? parts.join('、') : '活動なし');
+    };
+
+    Heatmap.prototype.renderSummary = function (activeDays) {
+        var summary = document.getElementById('heatmapSummary');
+        if (!summary) return;
+        var totals = this.types.map(function () { return 0; });
+        var days = this.days;
+        Object.keys(days).forEach(function (day) {
+            days[day].forEach(function (n, index) { totals[index] += n; });
+        });
+        summary.textContent = this.year + '年の合計: ' + this.types.map(function (type, index) {
+            return type.label + ' ' + totals[index].toLocaleString() + '件';
+        }).join(' / ') + '（活動のあった日 ' + activeDays + '日）';
+    };
+
+    /**
+     * ← → キーで前年・次年へ移動
+     */
+    function initKeyboardNavigation() {
+        document.addEventListener('keydown', function (e) {
+            if (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA') return;
+            var link = null;
+            if (e.key === 'ArrowLeft') {
+                link = document.getElementById('prevYearLink');
+            } else if (e.key === 'ArrowRight') {
+                link = document.getElementById('nextYearLink');
+            }
+            if (link) window.location.href = link.href;
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var el = document.getElementById('activityHeatmap');
+        if (el && el.dataset.activityUrl) {
+            new Heatmap(el).load();
+        }
+        initKeyboardNavigation();
+    });
+})();
@@ -1,8 +1,17 @@
 // カレンダービュー用JavaScript
 
+// 前後の月を描画するために先読みする月数（表示中の月の前後それぞれ）
+var PREFETCH_MONTHS = 3;
+
+// クライアント側で月を切り替えるための状態（initMonthNavigation で設定）
+var calendarState = null;
+
 document.addEventListener('DOMContentLoaded', function() {
+    // 前後の月のクライアント側描画（Tooltip 初期化前の表示を保存するため先に行う）
+    initMonthNavigation();
+
     // Bootstrap Tooltipの初期化
-    initTooltips();
+    initTooltips(document);
 
     // キーボードナビゲーションの設定
     initKeyboardNavigation();
@@ -14,13 +23,23 @@ document.addEventListener('DOMContentLoaded', function() {
 /**
  * Bootstrap Tooltipを初期化
  */
-function initTooltips() {
-    var tooltipTriggerList = [].slice.call(document.querySelectorAll('.calendar-icon-btn[title]'));
+function initTooltips(root) {
+    var tooltipTriggerList = [].slice.call(root.querySelectorAll('.calendar-icon-btn[title]'));
     tooltipTriggerList.forEach(function(el) {
         new bootstrap.Tooltip(el, { trigger: 'hover focus' });
     });
 }
 
+/**
+ * Bootstrap Tooltipを破棄（表示を差し替える前に呼ぶ）
+ */
+function disposeTooltips(root) {
+    [].slice.call(root.querySelectorAll('.calendar-icon-btn')).forEach(function(el) {
+        var tooltip = bootstrap.Tooltip.getInstance(el);
+        if (tooltip) tooltip.dispose();
+    });
+}
+
 /**
  * アイコンボタンクリックでモーダルを表示
  */
@@ -34,7 +53,8 @@ function initCalendarIconClick() {
 
     document.addEventListener('click', function(e) {
         var btn = e.target.closest('.calendar-icon-btn');
-        if (!btn) return;
+        // クライアント側で描画した月のアイコンは詳細表示へのリンクなのでそのまま遷移
+        if (!btn || !btn.dataset.items) return;
         e.preventDefault();
 
         var typeLabel = btn.dataset.typeLabel;
@@ -89,15 +109,247 @@ function initKeyboardNavigation() {
             return;
         }
 
-        var prevLink = document.getElementById('prevMonthLink');
-        var nextLink = document.getElementById('nextMonthLink');
-
-        if (e.key === 'ArrowLeft' && prevLink) {
+        if (e.key === 'ArrowLeft') {
             // ← キーで前月
-            window.location.href = prevLink.href;
-        } else if (e.key === 'ArrowRight' && nextLink) {
+            moveMonth(-1);
+        } else if (e.key === 'ArrowRight') {
             // → キーで次月
-            window.location.href = nextLink.href;
+            moveMonth(1);
+        }
+    });
+
+    ['prevMonthLink', 'nextMonthLink'].forEach(function(id, i) {
+        var link = document.getElementById(id);
+        if (!link) return;
+        link.addEventListener('click', function(e) {
+            if (!calendarState) return;
+            e.preventDefault();
+            moveMonth(i === 0 ? -1 : 1);
+        });
+    });
+}
+
+/**
+ * 前月・次月へ移動（クライアント側で描画できなければ通常のページ遷移）
+ */
+function moveMonth(delta) {
+    if (calendarState) {
+        var target = addMonths(calendarState.year, calendarState.month, delta);
+        showMonth(target.year, target.month, true);
+        return;
+    }
+    var link = document.getElementById(delta < 0 ? 'prevMonthLink' : 'nextMonthLink');
+    if (link) window.location.href = link.href;
+}
+
+/**
+ * 前後の月のクライアント側描画を初期化
+ * 表示中の前後 PREFETCH_MONTHS か月の日ごとの件数を活動件数APIからまとめて先読みし、
+ * 月の移動ではサーバーに問い合わせずに件数のアイコンで描画する。
+ * 最初に表示した月に戻ったときはサーバーが描画した詳細（モーダル付き）を使う。
+ */
+function initMonthNavigation() {
+    var table = document.getElementById('calendarTable');
+    var body = document.getElementById('calendarBody');
+    if (!table || !body || !table.dataset.activityUrl || !window.fetch || !window.history.pushState) return;
+
+    var year = parseInt(table.dataset.year, 10);
+    var month = parseInt(table.dataset.month, 10);
+    calendarState = {
+        table: table,
+        body: body,
+        year: year,
+        month: month,
+        initial: { year: year, month: month, html: body.innerHTML },
+        types: JSON.parse(table.dataset.activityTypes),
+        // 日付 → 件数リスト（types の順）
+        days: {},
+        // 'YYYY-MM' → その月を含むAPI呼び出しの Promise
+        requests: {},
+        // 'YYYY-MM' → 件数を days に読み込み済みなら true
+        loaded: {}
+    };
+
+    window.history.replaceState({ year: year, month: month }, '', window.location.href);
+    window.addEventListener('popstate', function(e) {
+        if (e.state && e.state.year) {
+            showMonth(e.state.year, e.state.month, false);
         }
     });
+
+    prefetchAround(year, month);
+}
+
+function pad2(n) {
+    return (n < 10 ? '0' : '') + n;
+}
+
+function monthKey(year, month) {
+    return year + '-' + pad2(month);
+}
+
+function addMonths(year, month, delta) {
+    var index = year * 12 + (month - 1) + delta;
+    return { year: Math.floor(index / 12), month: index % 12 + 1 };
+}
+
+function monthUrl(year, month) {
+    return calendarState.table.dataset.monthUrl + '?year=' + year + '&month=' + month;
+}
+
+/**
+ * 指定月の前 before か月〜後 after か月の件数を読み込む（読み込み済み・読み込み中の月は再取得しない）
+ * 未取得の月は1回のAPI呼び出しでまとめて取得する。
+ */
+function ensureMonths(year, month, before, after) {
+    var state = calendarState;
+    var waits = [];
+    var missing = [];
+    for (var i = -before; i <= after; i++) {
+        var ym = addMonths(year, month, i);
+        var key = monthKey(ym.year, ym.month);
+        if (state.requests[key]) {
+            waits.push(state.requests[key]);
+        } else {
+            missing.push(ym);
+        }
+    }
+
+    if (missing.length) {
+        var first = missing[0];
+        var last = missing[missing.length - 1];
+        var lastDay = new Date(last.year, last.month, 0).getDate();
+        var url = state.table.dataset.activityUrl +
+            '?start=' + monthKey(first.year, first.month) + '-01' +
+            '&end=' + monthKey(last.year, last.month) + '-' + pad2(lastDay);
+        // 間の読み込み済みの月も含めて取得する（範囲は連続させる）
+        var keys = [];
+        for (var ym2 = first; monthKey(ym2.year, ym2.month) <= monthKey(last.year, last.month);
+             ym2 = addMonths(ym2.year, ym2.month, 1)) {
+            keys.push(monthKey(ym2.year, ym2.month));
+        }
+        var request = fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(function(res) {
+                if (!res.ok) throw new Error('HTTP ' + res.status);
+                return res.json();
+            })
+            .then(function(data) {
+                Object.keys(data.days).forEach(function(day) {
+                    state.days[day] = data.days[day];
+                });
+                keys.forEach(function(key) {
+                    state.loaded[key] = true;
+                });
+            })
+            .catch(function(err) {
+                // 失敗した月は次の移動で取り直す
+                keys.forEach(function(key) {
+                    if (state.requests[key] === request) delete state.requests[key];
+                });
+                throw err;
+            });
+        keys.forEach(function(key) {
+            if (!state.requests[key]) state.requests[key] = request;
+        });
+        waits.push(request);
+    }
+    return Promise.all(waits);
+}
+
+/**
+ * 指定月を表示（push: 履歴に追加するか）
+ */
+function showMonth(year, month, push) {
+    var state = calendarState;
+    state.year = year;
+    state.month = month;
+
+    var prev = addMonths(year, month, -1);
+    var next = addMonths(year, month, 1);
+    document.getElementById('calendarTitle').textContent = year + '年 ' + month + '月';
+    document.getElementById('prevMonthLink').href = monthUrl(prev.year, prev.month);
+    document.getElementById('nextMonthLink').href = monthUrl(next.year, next.month);
+    var yearLink = document.getElementById('yearViewLink');
+    if (yearLink) yearLink.href = state.table.dataset.yearUrl + '?year=' + year;
+    if (push) {
+        window.history.pushState({ year: year, month: month }, '', monthUrl(year, month));
+    }
+
+    if (year === state.initial.year && month === state.initial.month) {
+        replaceBody(state.initial.html);
+    } else {
+        replaceBody(renderActivityMonth(year, month));
+        if (!state.loaded[monthKey(year, month)]) {
+            // 未取得なら件数なしの枠を先に出し、届いたら描き直す
+            ensureMonths(year, month, 0, 0).then(function() {
+                if (state.year === year && state.month === month) {
+                    replaceBody(renderActivityMonth(year, month));
+                }
+            }).catch(function(err) {
+                console.error('カレンダーの読み込みに失敗しました:', err);
+            });
+        }
+    }
+    prefetchAround(year, month);
+}
+
+/**
+ * 表示中の月の前後 PREFETCH_MONTHS か月を先読み
+ */
+function prefetchAround(year, month) {
+    ensureMonths(year, month, PREFETCH_MONTHS, PREFETCH_MONTHS).catch(function(err) {
+        console.error('カレンダーの先読みに失敗しました:', err);
+    });
+}
+
+function replaceBody(html) {
+    var body = calendarState.body;
+    disposeTooltips(body);
+    body.innerHTML = html;
+    initTooltips(body);
+}
+
+/**
+ * 日ごとの件数から月のカレンダー（tbody の中身）の HTML を作る（日曜始まり）
+ */
+function renderActivityMonth(year, month) {
+    var state = calendarState;
+    var today = state.table.dataset.today;
+    var firstWeekday = new Date(year, month - 1, 1).getDay();
+    var lastDay = new Date(year, month, 0).getDate();
+    var detailUrl = monthUrl(year, month);
+    var rows = [];
+    var cells = [];
+
+    for (var i = 0; i < firstWeekday; i++) {
+        cells.push('<td class="calendar-cell empty"></td>');
+    }
+    for (var day = 1; day <= lastDay; day++) {
+        var dateStr = monthKey(year, month) + '-' + pad2(day);
+        var counts = state.days[dateStr];
+        var weekday = (firstWeekday + day - 1) % 7;
+        var classes = 'calendar-cell' + (dateStr === today ? ' today' : '') + (counts ? ' has-data' : '');
+        var numberClass = weekday === 0 ? ' weekday-sun' : (weekday === 6 ? ' weekday-sat' : '');
+        var icons = counts ? state.types.map(function(type, index) {
+            var count = counts[index];
+            if (!count) return '';
+            return '<a class="calendar-icon-btn" href="' + escapeHtml(detailUrl) + '"' +
+                   ' title="' + escapeHtml(type.label + ' ' + count + '件') + '">' +
+                   '<img src="' + escapeHtml(type.icon) + '" alt="' + escapeHtml(type.label) + '">' +
+                   (count > 1 ? '<span class="icon-badge">' + count + '</span>' : '') +
+                   '</a>';
+        }).join('') : '';
+        cells.push('<td class="' + classes + '" data-date="' + dateStr + '">' +
+                   '<div class="day-number' + numberClass + '">' + day + '</div>' +
+                   '<div class="day-icons">' + icons + '</div></td>');
+        if (cells.length === 7) {
+            rows.push('<tr>' + cells.join('') + '</tr>');
+            cells = [];
+        }
+    }
+    if (cells.length) {
+        while (cells.length < 7) cells.push('<td class="calendar-cell empty"></td>');
+        rows.push('<tr>' + cells.join('') + '</tr>');
+    }
+    return rows.join('');
 }
@@ -11,11 +11,18 @@
  *   [data-filter-status]             … ステータスフィルタ対象（任意）
  *   #filter-count[data-suffix]       … 件数表示
  *   #filter-empty-msg                … 0件メッセージ（初期 display:none）
+ *
+ * 一覧が無限スクロール（#infinite-list、infinite-list.js）の場合は、
+ * year・month パラメータ付きで API から読み直す（ステータスバッジは非対応）。
  */
 document.addEventListener('DOMContentLoaded', function () {
     var container = document.getElementById('date-badge-filter');
     if (!container) return;
 
+    var infinite = window.InfiniteList
+        ? window.InfiniteList.attach(document.getElementById('infinite-list'))
+        : null;
+
     var yearBadges = container.querySelectorAll('.badge-filter[data-year]');
     var seasonBadges = container.querySelectorAll('.badge-filter[data-season]');
     var monthBadges = container.querySelectorAll('.badge-filter[data-month]');
@@ -146,6 +153,15 @@ document.addEventListener('DOMContentLoaded', function () {
     function applyFilter() {
         var hasYears = selectedYears.size > 0;
         var effectiveMonths = getEffectiveMonths();
+
+        if (infinite) {
+            infinite.reload({
+                year: Array.from(selectedYears),
+                month: Array.from(effectiveMonths)
+            }).then(showCount);
+            return;
+        }
+
         var hasMonths = effectiveMonths.size > 0;
         var hasStatuses = selectedStatuses.size > 0;
         var anyDateSelected = hasYears || hasMonths;
@@ -180,11 +196,16 @@ document.addEventListener('DOMContentLoaded', function () {
             if (show) visibleCount++;
         });
 
+        showCount(visibleCount);
+    }
+
+    function showCount(count) {
+        if (count === null || count === undefined) return;
         if (countEl) {
-            countEl.textContent = visibleCount + suffix;
+            countEl.textContent = count + suffix;
         }
         if (emptyMsg) {
-            emptyMsg.style.display = visibleCount === 0 ? '' : 'none';
+            emptyMsg.style.display = count === 0 ? '' : 'none';
         }
     }
 });
@@ -0,0 +1,129 @@
+/**
+ * infinite-list.js — 一覧画面の無限スクロール（キーセットページングの JSON API）
+ *
+ * 規約:
+ *   #infinite-list[data-api-url]  … カードの親（data-next-cursor="次ページのカーソル"、最後なら空）
+ *   #infinite-more                … 「もっと見る」リンク（画面に近づいたら次ページを読む。JS 無効時は通常のリンク）
+ *
+ * API は {html, next_cursor, total} を返す（total は先頭ページのみ）。
+ * 絞り込みのあるスクリプト（badge-filter.js・date-badge-filter.js）は
+ * InfiniteList.attach(el).reload(params) で条件を変えて先頭から読み直す。
+ */
+(function () {
+    // 画面下端からこの距離に「もっと見る」が来たら次ページを読む
+    var PRELOAD_MARGIN = 600;
+
+    function InfiniteList(listEl) {
+        this.listEl = listEl;
+        this.moreEl = document.getElementById('infinite-more');
+        this.apiUrl = listEl.dataset.apiUrl;
+        this.nextCursor = listEl.dataset.nextCursor || null;
+        this.params = {};
+        this.loading = false;
+        // 条件変更で古いレスポンスを捨てるための世代番号
+        this.generation = 0;
+
+        var self = this;
+        if (this.moreEl) {
+            this.moreEl.addEventListener('click', function (e) {
+                e.preventDefault();
+                self.loadMore();
+            });
+            if ('IntersectionObserver' in window) {
+                this.observer = new IntersectionObserver(function (entries) {
+                    if (entries.some(function (entry) { return entry.isIntersecting; })) {
+                        self.loadMore();
+                    }
+                }, { rootMargin: '0px 0px ' + PRELOAD_MARGIN + 'px 0px' });
+                this.observer.observe(this.moreEl);
+            }
+        }
+    }
+
+    InfiniteList.attach = function (listEl) {
+        if (!listEl || !listEl.dataset.apiUrl) return null;
+        if (!listEl._infiniteList) {
+            listEl._infiniteList = new InfiniteList(listEl);
+        }
+        return listEl._infiniteList;
+    };
+
+    InfiniteList.prototype.buildUrl = function (cursor) {
+        var url = new URL(this.apiUrl, window.location.href);
+        var params = this.params;
+        Object.keys(params).forEach(function (key) {
+            [].concat(params[key]).forEach(function (value) {
+                url.searchParams.append(key, value);
+            });
+        });
+        if (cursor) url.searchParams.set('after', cursor);
+        return url.toString();
+    };
+
+    InfiniteList.prototype.fetchPage = function (cursor) {
+        var self = this;
+        var generation = this.generation;
+        this.loading = true;
+        return fetch(this.buildUrl(cursor), { headers: { 'Accept': 'application/json' } })
+            .then(function (res) {
+                if (!res.ok) throw new Error('HTTP ' + res.status);
+                return res.json();
+            })
+            .then(function (data) {
+                // 読み込み中に条件が変わった場合は捨てる
+                if (generation !== self.generation) return null;
+                if (!cursor) self.listEl.innerHTML = '';
+                self.listEl.insertAdjacentHTML('beforeend', data.html);
+                self.setNextCursor(data.next_cursor);
+                return data;
+            })
+            .catch(function (err) {
+                console.error('一覧の読み込みに失敗しました:', err);
+                return null;
+            })
+            .finally(function () {
+                if (generation === self.generation) {
+                    self.loading = false;
+                    self.fillViewport();
+                }
+            });
+    };
+
+    InfiniteList.prototype.setNextCursor = function (cursor) {
+        this.nextCursor = cursor || null;
+        this.listEl.dataset.nextCursor = this.nextCursor || '';
+        if (this.moreEl) {
+            this.moreEl.style.display = this.nextCursor ? '' : 'none';
+        }
+    };
+
+    // 次ページを読んで末尾に追加
+    InfiniteList.prototype.loadMore = function () {
+        if (this.loading || !this.nextCursor) return Promise.resolve(null);
+        return this.fetchPage(this.nextCursor);
+    };
+
+    // 条件を変えて先頭ページから読み直す（解決値は条件に合う件数）
+    InfiniteList.prototype.reload = function (params) {
+        this.params = params || {};
+        this.generation++;
+        return this.fetchPage(null).then(function (data) {
+            return data ? data.total : null;
+        });
+    };
+
+    // 追加後も「もっと見る」が画面内に残っていれば続けて読む（IntersectionObserver は再通知しないため）
+    InfiniteList.prototype.fillViewport = function () {
+        if (!this.moreEl || !this.nextCursor || !this.observer) return;
+        var rect = this.moreEl.getBoundingClientRect();
+        if (rect.top < window.innerHeight + PRELOAD_MARGIN) {
+            this.loadMore();
+        }
+    };
+
+    window.InfiniteList = InfiniteList;
+
+    document.addEventListener('DOMContentLoaded', function () {
+        InfiniteList.attach(document.getElementById('infinite-list'));
+    });
+})();
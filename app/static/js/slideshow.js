@@ -1,17 +1,21 @@
 // スライドショー（栽培記録画像ビューア）
 document.addEventListener('DOMContentLoaded', function () {
-    const targets = document.querySelectorAll('img.slideshow-target');
-    if (targets.length === 0) return;
+    var slideshowBtn = document.getElementById('slideshow-btn');
+    if (!slideshowBtn && document.querySelectorAll('img.slideshow-target').length === 0) return;
 
-    // DOMから画像データを収集
-    const slides = Array.from(targets).map(function (img) {
-        return {
-            src: img.src,
-            date: img.dataset.slideshowDate || '',
-            days: img.dataset.slideshowDays || '',
-            caption: img.dataset.slideshowCaption || ''
-        };
-    });
+    // DOMから画像データを収集（無限スクロールで後から追加された画像も含めるため開くたびに集め直す）
+    function collectSlides() {
+        return Array.from(document.querySelectorAll('img.slideshow-target')).map(function (img) {
+            return {
+                src: img.src,
+                date: img.dataset.slideshowDate || '',
+                days: img.dataset.slideshowDays || '',
+                caption: img.dataset.slideshowCaption || ''
+            };
+        });
+    }
+
+    var slides = collectSlides();
 
     var currentIndex = 0;
 
@@ -76,9 +80,10 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     // スライドショーボタン
-    var slideshowBtn = document.getElementById('slideshow-btn');
     if (slideshowBtn) {
         slideshowBtn.addEventListener('click', function () {
+            slides = collectSlides();
+            if (slides.length === 0) return;
             open(0);
         });
     }
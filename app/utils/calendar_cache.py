@@ -0,0 +1,93 @@
+"""カレンダーの月データ（Calendar.get_month_data）の月単位のメモリキャッシュ
+
+過去の月の予定はほとんど変わらないので、月ごとの結果をプロセス内に保持する。
+キャッシュキーは「年月 + その月の version」で、version はマイグレーション 022 のトリガーが
+予定の元になる行の書き込みのたびに、その行の日付が属する月についてだけ増やす
+（calendar_month_versions）。書き込みのない月のキャッシュはそのまま使い続けられ、
+古い version のエントリは LRU で追い出される。
+
+version は月データを計算する前に読むので、計算中に書き込みがあっても
+古い version のキーに新しめのデータが入るだけで、次の取得で計算し直される。
+"""
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from app.database import get_db
+from app.models.calendar import Calendar
+
+
+class MonthCache:
+    """件数に上限のある LRU キャッシュ（スレッドセーフ）"""
+
+    def __init__(self, max_months=120):
+        self.max_months = max_months
+        self._entries = OrderedDict()   # (年, 月, version) → 月データ
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            # 同じ月の古い version は二度と使われないので先に捨てる
+            for old_key in [k for k in self._entries if k[:2] == key[:2]]:
+                del self._entries[old_key]
+            self._entries[key] = value
+            while len(self._entries) > self.max_months:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """件数・ヒット数・ミス数を返す"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def month_version(year, month):
+    """calendar_month_versions の指定月の version（行がなければ 0）"""
+    row = get_db().execute(
+        'SELECT version FROM calendar_month_versions WHERE month = ?',
+        (f'{year:04d}-{month:02d}',)
+    ).fetchone()
+    return row['version'] if row else 0
+
+
+def get_month_data(year, month):
+    """Calendar.get_month_data の結果をキャッシュから返す（なければ計算して保存する）
+
+    返す辞書はキャッシュと共有しているので、呼び出し側で変更しないこと。
+    """
+    cache = current_app.extensions.get('calendar_cache') if has_app_context() else None
+    if cache is None:
+        return Calendar.get_month_data(year, month)
+
+    key = (year, month, month_version(year, month))
+    month_data = cache.get(key)
+    if month_data is None:
+        month_data = Calendar.get_month_data(year, month)
+        cache.set(key, month_data)
+    return month_data
+
+
+def init_app(app):
+    """有効ならアプリごとの月データキャッシュを作成する"""
+    if app.config.get('CALENDAR_CACHE_ENABLED', True):
+        app.extensions['calendar_cache'] = MonthCache(
+            max_months=app.config.get('CALENDAR_CACHE_MAX_MONTHS', 120),
+        )
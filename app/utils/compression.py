@@ -0,0 +1,149 @@
+"""レスポンス圧縮（gzip / brotli）と事前圧縮済み静的ファイルの配信
+
+HTML・JSON・CSS・JS などのレスポンスを Accept-Encoding に応じて圧縮する。
+brotli パッケージがインストールされていれば br を優先し、なければ gzip のみ使う。
+ストリーミングレスポンスはチャンクごとにフラッシュしながら圧縮するので、
+先に送った部分がブラウザで先に表示される性質は保たれる。
+
+静的ファイルは app/utils/precompress_static.py で作った .br / .gz を
+元ファイルの代わりにそのまま返す（リクエストごとには圧縮しない）。
+"""
+import mimetypes
+import os
+import zlib
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 事前圧縮ファイルの拡張子（優先順）
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def available_encodings():
+    """このプロセスで使える圧縮形式（優先順）"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _choose_encoding(accept_encodings, encodings):
+    """クライアントが受け付ける形式のうち最初のものを返す"""
+    for encoding in encodings:
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=5):
+    """バイト列を一括圧縮"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip ヘッダー付き
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding, gzip_level=6, brotli_quality=5):
+    """チャンクごとにフラッシュしながら圧縮するジェネレーター"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if not chunk:
+                continue
+            data = process(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def _precompressed_path(static_folder, filename, suffix):
+    """元ファイル以降に作られた事前圧縮ファイルがあればそのパスを返す"""
+    original = safe_join(static_folder, filename)
+    if original is None or not os.path.isfile(original):
+        return None
+    compressed = original + suffix
+    if not os.path.isfile(compressed) or os.path.getmtime(compressed) < os.path.getmtime(original):
+        return None
+    return compressed
+
+
+def init_app(app):
+    """圧縮の after_request と、事前圧縮ファイルを返す静的ファイルビューを登録"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+    mimetypes_allowed = set(app.config.get('COMPRESS_MIMETYPES', ()))
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 5)
+    encodings = available_encodings()
+
+    @app.after_request
+    def _compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in mimetypes_allowed):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = _choose_encoding(request.accept_encodings, encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding, gzip_level, brotli_quality)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress(data, encoding, gzip_level, brotli_quality))
+
+        response.headers['Content-Encoding'] = encoding
+        # 圧縮後のバイト列は元と異なるので、強い ETag は弱い ETag にする
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    if not app.config.get('COMPRESS_STATIC_PRECOMPRESSED', True) or not app.has_static_folder:
+        return
+
+    def static(filename):
+        """静的ファイル（事前圧縮ファイルがあり、受け付けられるならそちらを返す）"""
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if request.accept_encodings[encoding] <= 0:
+                continue
+            compressed = _precompressed_path(app.static_folder, filename, suffix)
+            if compressed is None:
+                continue
+            response = send_from_directory(
+                app.static_folder, filename + suffix,
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                max_age=app.get_send_file_max_age(filename),
+            )
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+        response = app.send_static_file(filename)
+        if any(_precompressed_path(app.static_folder, filename, suffix) for _, suffix in PRECOMPRESSED_SUFFIXES):
+            response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
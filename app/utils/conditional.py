@@ -0,0 +1,134 @@
+"""詳細画面の条件付き GET（ETag / Last-Modified → 304）
+
+詳細画面には本体の行のほか、関連する日記・収穫・タスク・前後ナビなど多くのテーブルの
+内容が載る。そこで検証子は「本体の updated_at」と「画面が表示するテーブルの table_versions の
+バージョン（マイグレーション 018 / 019 のトリガーで更新）」と今日の日付、デプロイ内容
+（ソース・テンプレート）のハッシュから作る。表示するテーブルに書き込みがあれば検証子が変わるので
+関連行の削除も取りこぼさず、関係のないテーブルへの書き込みでは 304 のまま。確認は1クエリで済む。
+Last-Modified も同じ入力（日付の切り替わりとデプロイ内容の更新時刻を含む）の最大の時刻にする。
+
+ルートでは本体の行を取得した直後に、画面が表示するテーブルを渡して呼ぶ:
+
+    response = not_modified(crop['updated_at'], tables=CROP_DETAIL_TABLES)
+    if response:
+        return response
+"""
+import hashlib
+import os
+from datetime import date, datetime
+from flask import current_app, g, request, session
+from werkzeug.http import is_resource_modified
+from app.database import get_db
+from app.utils.timezone import JST
+
+# デプロイ内容のハッシュの対象（HTML を作る Python のソースとテンプレート）。
+# static/ は画像だけで数十 MB あり、起動のたびに読むと遅いので含めない
+# （静的ファイルの URL は static_assets がファイルごとのハッシュで変える）
+_FINGERPRINT_TEMPLATES_DIR = 'templates'
+_FINGERPRINT_SKIP_DIRS = frozenset({'__pycache__', 'static'})
+
+
+def _parse_timestamp(value):
+    """'YYYY-MM-DD HH:MM:SS'（JST）を datetime にする。解釈できなければ None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=JST)
+    except ValueError:
+        return None
+
+
+def deploy_fingerprint(root):
+    """root 以下の *.py とテンプレートの内容のハッシュと、最も新しい更新時刻（JST の datetime）を返す
+
+    どのワーカー・再起動でも同じファイルなら同じ値になるので、検証子の入力に使える。
+    """
+    digest = hashlib.sha1()
+    latest = 0.0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in _FINGERPRINT_SKIP_DIRS)
+        in_templates = os.path.relpath(dirpath, root).split(os.sep)[0] == _FINGERPRINT_TEMPLATES_DIR
+        for filename in sorted(filenames):
+            if not (in_templates or filename.endswith('.py')):
+                continue
+            path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(path, root).encode('utf-8') + b'\0')
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(65536), b''):
+                    digest.update(block)
+            latest = max(latest, os.path.getmtime(path))
+    return digest.hexdigest()[:16], datetime.fromtimestamp(int(latest), JST)
+
+
+def _validators(updated_at, tables=None):
+    """(ETag, Last-Modified) を計算（tables が None なら全テーブルのバージョンを使う）"""
+    where = ''
+    params = []
+    if tables is not None:
+        where = f" WHERE table_name IN ({','.join('?' * len(tables))})"
+        params.extend(tables)
+    row = get_db().execute(
+        f'''SELECT group_concat(version, '.') AS versions, MAX(changed_at) AS changed_at
+            FROM (SELECT version, changed_at FROM table_versions{where} ORDER BY table_name)''',
+        params
+    ).fetchone()
+    token, deployed_at = current_app.extensions['conditional_token']
+    today = date.today()
+    source = '|'.join([
+        token,
+        # フィードなどクエリパラメータで内容が変わるものがあるのでクエリ文字列も含める
+        request.full_path,
+        # 経過日数や期限切れの表示は日付で変わる
+        today.isoformat(),
+        str(updated_at or ''),
+        row['versions'] or '',
+    ])
+    etag = hashlib.sha1(source.encode('utf-8')).hexdigest()[:20]
+
+    # ETag の入力のうち時刻で表せるものすべての最大（日付はこのサーバーで today が切り替わった時刻）
+    day_started = datetime.combine(today, datetime.min.time()).astimezone(JST)
+    candidates = [t for t in (_parse_timestamp(updated_at), _parse_timestamp(row['changed_at'])) if t]
+    last_modified = max(candidates + [day_started, deployed_at])
+    return etag, last_modified
+
+
+def not_modified(updated_at, tables=None):
+    """クライアントのキャッシュが有効なら 304 レスポンスを返し、そうでなければ None を返す
+
+    tables には画面が表示するテーブル名のタプルを渡す（None なら全テーブル）。
+    None の場合は検証子を g に保存し、after_request で 200 レスポンスに付ける。
+    フラッシュメッセージが残っているときは、その表示を含むページをキャッシュさせないよう
+    何もしない。
+    """
+    if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+        return None
+
+    etag, last_modified = _validators(updated_at, tables)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = current_app.response_class(status=304)
+        _set_headers(response, etag, last_modified)
+        return response
+
+    g.conditional_validators = (etag, last_modified)
+    return None
+
+
+def _set_headers(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    # 毎回再検証させる（内容が変わっていなければ 304 で済む）
+    response.headers['Cache-Control'] = 'no-cache'
+
+
+def init_app(app):
+    """200 レスポンスに検証子を付ける after_request を登録"""
+    # ソースやテンプレートを更新するデプロイで検証子が変わるようにする
+    # （内容から作るので、ワーカー間・再起動の前後では同じ値になる）
+    app.extensions['conditional_token'] = deploy_fingerprint(app.root_path)
+
+    @app.after_request
+    def _add_validators(response):
+        validators = g.pop('conditional_validators', None)
+        if validators and response.status_code == 200 and '_flashes' not in session:
+            _set_headers(response, *validators)
+        return response
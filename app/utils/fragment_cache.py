@@ -0,0 +1,187 @@
+"""テンプレート断片（フラグメント）のメモリキャッシュ
+
+詳細画面の関連カードやダッシュボードのウィジェットなど、同じ内容を何度も描画する断片を
+描画済みの HTML ごとプロセス内に保持する。キャッシュキーは
+「断片の名前 + エンティティなどのキー + 依存テーブルのバージョン」で、バージョンは
+マイグレーション 018 のトリガーが書き込みのたびに増やす table_versions から読む。
+書き込みがあればキーが変わるので明示的な削除は不要で、古いエントリは LRU で追い出される。
+
+テンプレートでは次のように使う（依存テーブルは FRAGMENTS に登録しておく）:
+
+    {% cache 'related_diaries', 'crop', crop.id %}
+        {% include '_related_diaries_card.html' %}
+    {% endcache %}
+
+ルートから断片の元データを渡すときは LazyResult で包むと、キャッシュが効いた場合は
+クエリ自体が実行されない。
+"""
+import threading
+from collections import OrderedDict
+from flask import current_app, g, has_app_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from app.database import get_db
+
+
+# 断片の名前 → 内容が依存するテーブル
+FRAGMENTS = {
+    'related_diaries': ('diary_entries', 'diary_relations', 'plantings'),
+    'related_harvests': ('harvests', 'plantings', 'crops', 'locations'),
+    'tasks': ('tasks', 'task_relations'),
+    'supplements': ('supplements',),
+    'dashboard.recent_diaries': ('diary_entries',),
+    'dashboard.pending_tasks': ('tasks',),
+    'dashboard.recent_plantings': ('plantings', 'crops', 'locations'),
+    'dashboard.recent_growth_records': ('planting_records', 'plantings', 'crops', 'locations'),
+    'dashboard.recent_harvests': ('harvests', 'plantings', 'crops', 'locations'),
+}
+
+
+class FragmentCache:
+    """件数と合計バイト数に上限のある LRU キャッシュ（スレッドセーフ）"""
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # キー → (HTML, バイト数)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """件数・バイト数・ヒット数・ミス数を返す"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class LazyResult:
+    """最初に参照されたときに初めて関数を呼ぶリスト代わりのオブジェクト
+
+    render_template に渡しておけば、断片がキャッシュから返された場合は呼ばれない。
+    """
+
+    _UNSET = object()
+
+    def __init__(self, func, *args, **kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._value = self._UNSET
+
+    @property
+    def value(self):
+        if self._value is self._UNSET:
+            self._value = self._func(*self._args, **self._kwargs)
+        return self._value
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __getitem__(self, index):
+        return self.value[index]
+
+
+def _table_versions():
+    """table_versions を {テーブル名: バージョン} で取得（リクエスト内では1回だけ読む）"""
+    versions = g.get('_table_versions')
+    if versions is None:
+        rows = get_db().execute('SELECT table_name, version FROM table_versions').fetchall()
+        versions = {row['table_name']: row['version'] for row in rows}
+        g._table_versions = versions
+    return versions
+
+
+def cached_fragment(name, key, render):
+    """断片をキャッシュから返す。なければ render() で描画して保存する
+
+    Args:
+        name: FRAGMENTS に登録した断片の名前
+        key: エンティティの種類・ID など断片を区別する値のタプル
+        render: HTML を返す関数（キャッシュミス時のみ呼ばれる）
+    """
+    if name not in FRAGMENTS:
+        raise ValueError(f'未登録のフラグメントです: {name}')
+
+    cache = current_app.extensions.get('fragment_cache') if has_app_context() else None
+    if cache is None:
+        return render()
+
+    versions = _table_versions()
+    cache_key = (name, tuple(key), tuple(versions.get(t, 0) for t in FRAGMENTS[name]))
+    html = cache.get(cache_key)
+    if html is None:
+        html = render()
+        cache.set(cache_key, html)
+    return html
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'name', key... %}...{% endcache %} タグ"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        key = []
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render', [name, nodes.List(key)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, name, key, caller):
+        return Markup(cached_fragment(name, key, caller))
+
+
+def init_app(app):
+    """{% cache %} タグを登録し、有効ならアプリごとのキャッシュを作成する"""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        app.extensions['fragment_cache'] = FragmentCache(
+            max_entries=app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 1024),
+            max_bytes=app.config.get('FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024),
+        )
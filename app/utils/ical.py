@@ -0,0 +1,120 @@
+"""iCalendar（RFC 5545）形式の文字列化とストリーミング
+
+カレンダーアプリ（スマートフォンの購読カレンダーなど）向けのフィードを、
+モデルのジェネレーターから1件ずつ VEVENT / VTODO にして送り出す。
+文書全体を組み立てずに COMPONENTS_PER_CHUNK 件ごとにまとめて返す。
+"""
+from datetime import datetime, timezone
+from app.utils.timezone import JST
+
+# 1チャンクにまとめるコンポーネント（VEVENT / VTODO）の数
+COMPONENTS_PER_CHUNK = 100
+
+# 1行の上限（オクテット、改行を除く）。超える分は折り返す
+LINE_LIMIT = 75
+
+PRODID = '-//garden-app//calendar feed//JA'
+
+# タスクのステータス → VTODO の STATUS
+TODO_STATUS = {
+    'pending': 'NEEDS-ACTION',
+    'in_progress': 'IN-PROCESS',
+    'completed': 'COMPLETED',
+}
+
+
+def escape_text(value):
+    """TEXT 値のエスケープ（\\ ; , 改行）"""
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace(';', '\\;')
+            .replace(',', '\\,')
+            .replace('\r\n', '\\n')
+            .replace('\n', '\\n')
+            .replace('\r', '\\n'))
+
+
+def fold_line(line):
+    """75オクテットを超える行を折り返し、CRLF を付けて返す（UTF-8 の文字の途中では切らない）"""
+    if len(line.encode('utf-8')) <= LINE_LIMIT:
+        return line + '\r\n'
+    parts = []
+    current = ''
+    size = 0
+    limit = LINE_LIMIT
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(current)
+            # 継続行は先頭の空白1文字の分だけ短くする
+            current, size, limit = '', 0, LINE_LIMIT - 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_date(day):
+    """'YYYY-MM-DD' → 'YYYYMMDD'（終日の DATE 値）"""
+    return day.replace('-', '')
+
+
+def format_timestamp(value):
+    """'YYYY-MM-DD HH:MM:SS'（JST）→ UTC の 'YYYYMMDDTHHMMSSZ'（解釈できなければ None）"""
+    try:
+        moment = datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=JST)
+    except (TypeError, ValueError):
+        return None
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def component_lines(item, base_url, host, dtstamp):
+    """Calendar.iter_feed_items の1件を VEVENT / VTODO の行のリストにする"""
+    kind = item['kind']
+    stamp = format_timestamp(item['updated_at']) or dtstamp
+    if kind == 'task':
+        lines = ['BEGIN:VTODO', f"UID:task-{item['id']}@{host}", f'DTSTAMP:{stamp}',
+                 f"SUMMARY:{escape_text(item['label'])}",
+                 f"STATUS:{TODO_STATUS.get(item['status'], 'NEEDS-ACTION')}"]
+        if item['day']:
+            lines.append(f"DUE;VALUE=DATE:{format_date(item['day'])}")
+        url = f"{base_url}/tasks/{item['id']}"
+        end = 'END:VTODO'
+    else:
+        title = '植え付け' if kind == 'planting' else '収穫'
+        lines = ['BEGIN:VEVENT', f"UID:{kind}-{item['id']}@{host}", f'DTSTAMP:{stamp}',
+                 f"DTSTART;VALUE=DATE:{format_date(item['day'])}",
+                 f"SUMMARY:{escape_text(title + ': ' + item['label'])}",
+                 'TRANSP:TRANSPARENT']
+        url = f"{base_url}/{'plantings' if kind == 'planting' else 'harvests'}/{item['id']}"
+        end = 'END:VEVENT'
+    if item['description']:
+        lines.append(f"DESCRIPTION:{escape_text(item['description'])}")
+    lines.append(f'URL:{url}')
+    lines.append(end)
+    return lines
+
+
+def stream_calendar(items, name, base_url, host):
+    """VCALENDAR を少しずつ返すジェネレーター
+
+    Args:
+        items: Calendar.iter_feed_items のジェネレーター
+        name: カレンダー名（X-WR-CALNAME）
+        base_url: 詳細画面の URL の先頭（例: 'https://example.com'）
+        host: UID のドメイン部分
+    """
+    # updated_at のない行の DTSTAMP（RFC 5545 では必須）
+    dtstamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN',
+              'METHOD:PUBLISH', f'X-WR-CALNAME:{escape_text(name)}', 'X-WR-TIMEZONE:Asia/Tokyo']
+    chunk = [fold_line(line) for line in header]
+    count = 0
+    for item in items:
+        chunk.extend(fold_line(line) for line in component_lines(item, base_url, host, dtstamp))
+        count += 1
+        if count % COMPONENTS_PER_CHUNK == 0:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(fold_line('END:VCALENDAR'))
+    yield ''.join(chunk)
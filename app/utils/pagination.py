@@ -0,0 +1,76 @@
+"""一覧のキーセットページング（カーソル）と無限スクロール API の共通処理
+
+カーソルは前ページ最後の行の並び替えキー（例: (harvest_date, created_at, id)）を
+JSON にして URL セーフな base64 にした文字列。OFFSET と違い、深いページでも
+インデックスの途中から読み始められるので速さが変わらない。
+"""
+import base64
+import binascii
+import json
+from flask import jsonify, request
+
+# 一覧の1ページあたりの件数（3列表示で割り切れる数）
+PAGE_SIZE = 30
+# API の limit パラメータの上限
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """カーソル文字列が壊れている・形式が違う"""
+
+
+def encode_cursor(values):
+    """並び替えキーのタプルをカーソル文字列にする（None はそのまま None）"""
+    if values is None:
+        return None
+    # DATE / TIMESTAMP 列は date / datetime で返るので、SQLite に保存されている形式の文字列にする
+    data = json.dumps(list(values), ensure_ascii=False, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, length):
+    """カーソル文字列を並び替えキーのタプルに戻す
+
+    Args:
+        token: encode_cursor で作った文字列。空なら None を返す
+        length: キーの要素数
+
+    Raises:
+        InvalidCursor: 復号できない、または要素数が違う
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursor(str(e)) from e
+    if (not isinstance(values, list) or len(values) != length
+            or not all(v is None or isinstance(v, (str, int)) for v in values)):
+        raise InvalidCursor('unexpected cursor shape')
+    return tuple(values)
+
+
+def page_limit():
+    """リクエストの limit パラメータ（1〜MAX_PAGE_SIZE、省略時は PAGE_SIZE）"""
+    limit = request.args.get('limit', PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def page_response(html, next_after, total=None):
+    """無限スクロール API のレスポンス
+
+    Returns:
+        {html: 追加するカードの HTML, next_cursor: 次ページのカーソル（最後なら null）,
+         total: 条件に合う件数（先頭ページのみ、それ以外は null）}
+    """
+    return jsonify({
+        'html': html,
+        'next_cursor': encode_cursor(next_after),
+        'total': total,
+    })
+
+
+def invalid_cursor_response():
+    """不正なカーソルへの 400 レスポンス"""
+    return jsonify({'error': 'invalid cursor'}), 400
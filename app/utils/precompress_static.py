@@ -0,0 +1,67 @@
+"""静的ファイルの事前圧縮スクリプト（.gz / .br を元ファイルの隣に作成）
+実行: uv run python app/utils/precompress_static.py
+
+app/static 以下のテキスト系ファイル（CSS・JS・SVG など）を最大圧縮率で圧縮しておき、
+app/utils/compression.py の静的ファイルビューがリクエストごとに圧縮せずにそのまま返す。
+元ファイルより古い圧縮ファイルは使われないので、CSS・JS を編集したら再実行する。
+.br は brotli パッケージがインストールされている場合のみ作成する。
+"""
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_FOLDER = 'app/static'
+EXTENSIONS = {'.css', '.js', '.svg', '.json', '.html', '.txt', '.map'}
+# 圧縮後がこの割合より大きければ圧縮ファイルを作らない（効果が小さい）
+MAX_RATIO = 0.9
+
+
+def _write_if_smaller(path, data, original_size):
+    """圧縮結果が十分小さければ書き込み、そうでなければ古い圧縮ファイルを消す"""
+    if len(data) > original_size * MAX_RATIO:
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def precompress_file(path):
+    """1ファイルを圧縮し、作成した拡張子のリストを返す"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    created = []
+    if _write_if_smaller(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0), len(data)):
+        created.append('.gz')
+    if brotli is not None and _write_if_smaller(path + '.br', brotli.compress(data, quality=11), len(data)):
+        created.append('.br')
+    return created
+
+
+def main():
+    if brotli is None:
+        print("brotli がインストールされていないため .gz のみ作成します")
+
+    total = 0
+    for root, dirs, files in os.walk(STATIC_FOLDER):
+        # アップロード画像は対象外
+        dirs[:] = [d for d in dirs if d != 'uploads']
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            created = precompress_file(path)
+            if created:
+                total += 1
+                print(f"  {path}: {' '.join(created)}")
+
+    print(f"\n完了: {total}ファイルを圧縮")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""リクエスト単位のSQL計測
+
+get_db() が返す接続をラップして、1リクエスト内で実行された文の数と所要時間を集計する。
+レスポンスには Server-Timing ヘッダー（DB時間・クエリ数・テンプレート描画時間）を付け、
+しきい値を超えた文は EXPLAIN QUERY PLAN と一緒にログへ出力する。
+N+1 検出を有効にすると、同じ形の文が1リクエストで何度も実行された場合に
+呼び出し元のモデルメソッドとルートを警告（テスト時は例外）で知らせる。
+
+ストリーミングのレスポンス（iCalendar フィードなど）は本文の送信中にも文が実行される。
+ヘッダーは本文より先に送るので、Server-Timing は本文を送り始める前までの値になる。
+遅い文のログと N+1 検出は、本文を送り終えた時点の全件で行う。
+"""
+import inspect
+import os
+import re
+import sys
+import time
+from collections import Counter
+from flask import (
+    g, current_app, request, before_render_template, template_rendered, stream_with_context,
+)
+
+
+_MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+# SQLの形を正規化するためのパターン
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+
+
+class NPlusOneQueryError(Exception):
+    """同じ形の文が1リクエスト内でしきい値を超えて実行された"""
+
+
+class QueryStats:
+    """1リクエスト分のSQL計測結果"""
+
+    def __init__(self, track_callers=False):
+        self.started = time.perf_counter()
+        self.track_callers = track_callers
+        self.statements = []    # [sql, params, 秒数, 呼び出し元モデルメソッド]
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self._template_started = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def record(self, sql, params, seconds):
+        caller = _model_caller() if self.track_callers else None
+        entry = [sql, params, seconds, caller]
+        self.statements.append(entry)
+        self.db_time += seconds
+        return entry
+
+    def add_time(self, entry, seconds):
+        """カーソルからの読み出し時間を文の所要時間に加算"""
+        entry[2] += seconds
+        self.db_time += seconds
+
+    def start_template(self):
+        self._template_started.append(time.perf_counter())
+
+    def finish_template(self):
+        if self._template_started:
+            self.template_time += time.perf_counter() - self._template_started.pop()
+
+
+class TracedCursor:
+    """fetch の時間も元の文に加算するカーソルラッパー"""
+
+    def __init__(self, cursor, stats, entry):
+        self._cursor = cursor
+        self._stats = stats
+        self._entry = entry
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._stats.add_time(self._entry, time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._timed(self._cursor.__next__)
+
+
+class TracedConnection:
+    """execute / executemany を計測する接続ラッパー"""
+
+    def __init__(self, conn, stats):
+        self.wrapped = conn
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        cursor = self.wrapped.execute(sql, parameters)
+        entry = self._stats.record(sql, parameters, time.perf_counter() - started)
+        return TracedCursor(cursor, self._stats, entry)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        cursor = self.wrapped.executemany(sql, seq_of_parameters)
+        self._stats.record(sql, None, time.perf_counter() - started)
+        return cursor
+
+
+def normalize_sql(sql):
+    """リテラル・IN リスト・空白の違いを除いたSQLの形"""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return ' '.join(shape.split())
+
+
+def _model_caller():
+    """文を実行したモデルメソッド名（例: 'Harvest.get_by_location_crop'）"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_MODELS_DIR):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+def find_repeated_queries(stats, threshold):
+    """しきい値を超えて繰り返された文の形を (回数, 形, 呼び出し元) で返す"""
+    counts = Counter()
+    callers = {}
+    for sql, _params, _seconds, caller in stats.statements:
+        shape = normalize_sql(sql)
+        counts[shape] += 1
+        if caller:
+            callers.setdefault(shape, set()).add(caller)
+    return [
+        (count, shape, sorted(callers.get(shape, ())))
+        for shape, count in counts.most_common()
+        if count > threshold
+    ]
+
+
+def get_stats():
+    """現在のリクエストの計測結果（計測無効時は None）"""
+    return g.get('sql_stats')
+
+
+def _server_timing(stats):
+    total = time.perf_counter() - stats.started
+    return ', '.join([
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.count} queries"',
+        f'tpl;dur={stats.template_time * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+def _log_slow_queries(stats):
+    """しきい値を超えた文を実行計画と一緒にログ出力"""
+    threshold = current_app.config.get('SQL_SLOW_QUERY_MS', 100) / 1000
+    db = g.get('db')
+    for sql, params, seconds, _caller in stats.statements:
+        if seconds < threshold:
+            continue
+        plan = ''
+        if db is not None and params is not None:
+            try:
+                rows = db.wrapped.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+                plan = '\n'.join(f'    {row[3]}' for row in rows)
+            except Exception as e:
+                plan = f'    (EXPLAIN failed: {e})'
+        current_app.logger.warning(
+            'Slow SQL (%.1f ms) in %s:\n%s\n%s',
+            seconds * 1000, g.get('sql_endpoint') or '-', ' '.join(sql.split()), plan
+        )
+
+
+def _check_n_plus_one(stats):
+    """N+1 の疑いがある文を警告（SQL_NPLUS1_RAISE なら例外）"""
+    threshold = current_app.config.get('SQL_NPLUS1_THRESHOLD', 5)
+    repeated = find_repeated_queries(stats, threshold)
+    if not repeated:
+        return
+    endpoint = g.get('sql_endpoint') or '-'
+    lines = [
+        f"  {count}x {', '.join(callers) or '(unknown caller)'}: {shape}"
+        for count, shape, callers in repeated
+    ]
+    message = f"N+1 query suspected in {endpoint}:\n" + '\n'.join(lines)
+    if current_app.config.get('SQL_NPLUS1_RAISE', False):
+        raise NPlusOneQueryError(message)
+    current_app.logger.warning(message)
+
+
+def init_app(app):
+    """SQL計測を有効化（設定 SQL_TRACE が False なら何もしない）"""
+    if not app.config.get('SQL_TRACE', True):
+        return
+    detect_n_plus_one = app.config.get('SQL_NPLUS1_DETECT', False)
+
+    @app.before_request
+    def _start_sql_stats():
+        g.sql_stats = QueryStats(track_callers=detect_n_plus_one)
+        g.sql_endpoint = request.endpoint
+
+    def _finish(stats):
+        _log_slow_queries(stats)
+        if detect_n_plus_one:
+            _check_n_plus_one(stats)
+
+    def _finish_after_body(chunks, stats):
+        """本文を送り終えてから集計を確定するジェネレーター"""
+        try:
+            yield from chunks
+            current_app.logger.debug('Streamed %s: %s', g.get('sql_endpoint') or '-', _server_timing(stats))
+            _finish(stats)
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    @app.after_request
+    def _add_server_timing(response):
+        stats = get_stats()
+        if stats is None:
+            return response
+        response.headers['Server-Timing'] = _server_timing(stats)
+        if inspect.isgenerator(response.response):
+            # 本文がジェネレーターなら送信中にも文が実行されるので、
+            # リクエストコンテキスト（g.db・g.sql_stats）を送信が終わるまで保持する
+            response.response = stream_with_context(_finish_after_body(response.response, stats))
+        else:
+            _finish(stats)
+        return response
+
+    def _template_started(sender, **extra):
+        stats = get_stats()
+        if stats is not None:
+            stats.start_template()
+
+    def _template_finished(sender, **extra):
+        stats = get_stats()
+        if stats is not None:
+            stats.finish_template()
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
@@ -0,0 +1,101 @@
+"""静的ファイルのフィンガープリント（内容ハッシュ付き URL）と長期キャッシュ
+
+url_for('static', filename='css/custom.css') を '/static/css/custom.<ハッシュ>.css' に変換する。
+ハッシュ付き URL は内容が変われば URL も変わるので、1年間の immutable キャッシュを付けて
+ブラウザの再検証をなくす。ハッシュは最初に URL を作るときにファイルごとに計算して
+メモリ上のマニフェストに保持する（DEBUG 時は更新日時が変わったら計算し直す）。
+
+アップロード画像（uploads/ 以下）は UUID のファイル名で内容が変わらないため、
+ハッシュを付けずにそのまま長期キャッシュする。
+"""
+import hashlib
+import os
+import re
+import threading
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+UPLOADS_PREFIX = 'uploads/'
+HASH_LENGTH = 12
+
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)?$' % HASH_LENGTH)
+
+
+class StaticManifest:
+    """元のファイル名 → ハッシュ付きファイル名の対応表"""
+
+    def __init__(self, static_folder, check_mtime=False):
+        self.static_folder = static_folder
+        self.check_mtime = check_mtime
+        self._entries = {}      # 元のファイル名 → (更新日時, ハッシュ)
+        self._lock = threading.Lock()
+
+    def _file_hash(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path) if self.check_mtime else None
+        except OSError:
+            return None
+        entry = self._entries.get(filename)
+        if entry is not None and (not self.check_mtime or entry[0] == mtime):
+            return entry[1]
+
+        digest = hashlib.sha1()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(65536), b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        file_hash = digest.hexdigest()[:HASH_LENGTH]
+        with self._lock:
+            self._entries[filename] = (mtime, file_hash)
+        return file_hash
+
+    def hashed_name(self, filename):
+        """ハッシュ付きのファイル名を返す（対象外・存在しないファイルはそのまま）"""
+        if filename.startswith(UPLOADS_PREFIX) or '..' in filename:
+            return filename
+        file_hash = self._file_hash(filename)
+        if file_hash is None:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return f'{stem}.{file_hash}{ext}'
+
+    def resolve(self, filename):
+        """ハッシュ付きのファイル名を (元のファイル名, ハッシュが現在の内容と一致するか) にする"""
+        match = _HASHED_NAME.match(filename)
+        if match:
+            original = match.group('stem') + (match.group('ext') or '')
+            if os.path.isfile(os.path.join(self.static_folder, original)):
+                return original, self._file_hash(original) == match.group('hash')
+        return filename, False
+
+
+def init_app(app):
+    """url_for('static') にハッシュを付け、静的ファイルビューでハッシュ付き名を解決する
+
+    compression.init_app で差し替えた静的ファイルビューを包むので、その後に呼ぶ。
+    """
+    if not app.config.get('STATIC_FINGERPRINT', True) or not app.has_static_folder:
+        return
+
+    manifest = StaticManifest(app.static_folder, check_mtime=app.debug)
+    app.extensions['static_manifest'] = manifest
+
+    @app.url_defaults
+    def _fingerprint_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.hashed_name(values['filename'])
+
+    serve_static = app.view_functions['static']
+
+    def static(filename):
+        """静的ファイル（ハッシュ付き URL とアップロード画像は長期キャッシュ）"""
+        original, fingerprinted = manifest.resolve(filename)
+        response = serve_static(original)
+        if response.status_code in (200, 304) and (fingerprinted or original.startswith(UPLOADS_PREFIX)):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            response.expires = None
+        return response
+
+    app.view_functions['static'] = static
@@ -0,0 +1,53 @@
+"""Jinja テンプレートのバイトコードキャッシュと起動時のウォームアップ
+
+コンパイル済みテンプレートをファイルに保存し、再起動後やワーカーの入れ替え後も
+テンプレートごとの初回コンパイルを省く。ウォームアップを有効にすると、起動時に
+app/templates 以下の全テンプレートを読み込んでおき、初回リクエストの遅延をなくす。
+"""
+import hashlib
+import os
+import time
+import jinja2
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+
+def _environment_fingerprint(env):
+    """コンパイル結果に影響する設定（Jinja のバージョン・拡張）から作る識別子
+
+    同じテンプレートでも拡張の有無で生成コードが変わるので、キャッシュファイル名に含める。
+    """
+    source = '|'.join([jinja2.__version__, *sorted(env.extensions)])
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:8]
+
+
+def warm_up(app):
+    """全テンプレートを読み込んでコンパイルしておく
+
+    Returns:
+        int: 読み込んだテンプレート数
+    """
+    started = time.perf_counter()
+    count = 0
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(name)
+            count += 1
+        except TemplateError as e:
+            app.logger.warning('テンプレートのウォームアップに失敗しました: %s (%s)', name, e)
+    app.logger.info('テンプレートのウォームアップ: %d件 %.0fms', count, (time.perf_counter() - started) * 1000)
+    return count
+
+
+def init_app(app):
+    """バイトコードキャッシュを設定し、有効ならウォームアップする
+
+    拡張（{% cache %} など）の登録後に呼ぶ。
+    """
+    if app.config.get('TEMPLATE_BYTECODE_CACHE', True):
+        cache_dir = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        pattern = f'__jinja2_{_environment_fingerprint(app.jinja_env)}_%s.cache'
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir, pattern)
+
+    if app.config.get('TEMPLATE_WARMUP', False):
+        warm_up(app)
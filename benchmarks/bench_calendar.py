@@ -0,0 +1,227 @@
+"""カレンダーの月データ取得（Calendar.get_month_data）のベンチマーク
+実行: uv run python benchmarks/bench_calendar.py [--years 10] [--iterations 5]
+
+予定の密度が高い複数年分の菜園（既定で10年・栽培記録30万件など）を test_data.py で生成し
+（生成済みなら再利用）、全ての月について現在の実装（UNION ALL の1クエリ）と
+以前の実装（種類ごとの7クエリ＋日ごとに7種類の空リストを持つ辞書）を比較する。
+両者の結果が一致することも確認する（以前の実装の空リストは除いて比較）。
+"""
+import argparse
+import calendar
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# プロジェクトルートをPythonパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.database import get_db
+from app.models.calendar import Calendar
+from test_data import build_database
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'garden_bench')
+
+# 1日あたりの予定が多い「密な」菜園の件数
+DENSE_COUNTS = {
+    'crops': 300, 'locations': 40, 'plantings': 20000, 'planting_records': 300000,
+    'harvests': 150000, 'diaries': 30000, 'tasks': 20000, 'supplements': 0,
+}
+
+
+def _day(result, date_str):
+    """日付の辞書を返す（なければ7種類の空リストで作る）"""
+    if date_str not in result:
+        result[date_str] = {'crops': [], 'locations': [], 'diaries': [], 'location_crops': [],
+                            'harvests': [], 'tasks': [], 'growth_records': []}
+    return result[date_str]
+
+
+def legacy_month_data(year, month):
+    """以前の実装（種類ごとに1クエリ、行ごとに Python で日付別の辞書へ振り分け）"""
+    db = get_db()
+    _, last_day = calendar.monthrange(year, month)
+    start_date = f'{year:04d}-{month:02d}-01'
+    end_date = f'{year:04d}-{month:02d}-{last_day:02d}'
+    result = {}
+
+    for crop in db.execute(
+            '''SELECT id, name, variety, icon_path, image_color, created_day as date
+               FROM crops WHERE created_day BETWEEN ? AND ? ORDER BY created_at, id''',
+            (start_date, end_date)):
+        day = _day(result, crop['date'])
+        label = f"{crop['variety']}（{crop['name']}）" if crop['variety'] else crop['name']
+        day['crops'].append({
+            'id': crop['id'], 'name': crop['name'], 'variety': crop['variety'],
+            'icon_path': crop['icon_path'], 'image_color': crop['image_color'],
+            'label': label, 'url': f"/crops/{crop['id']}",
+        })
+
+    for location in db.execute(
+            '''SELECT id, name, created_day as date
+               FROM locations WHERE created_day BETWEEN ? AND ? ORDER BY created_at, id''',
+            (start_date, end_date)):
+        day = _day(result, location['date'])
+        day['locations'].append({
+            'id': location['id'], 'name': location['name'],
+            'label': f"{location['name']}", 'url': f"/locations/{location['id']}",
+        })
+
+    for diary in db.execute(
+            '''SELECT id, title, entry_day as date
+               FROM diary_entries WHERE entry_day BETWEEN ? AND ? ORDER BY entry_date, id''',
+            (start_date, end_date)):
+        day = _day(result, diary['date'])
+        day['diaries'].append({
+            'id': diary['id'], 'title': diary['title'],
+            'label': f"{diary['title']}", 'url': f"/diary/{diary['id']}",
+        })
+
+    for lc in db.execute(
+            '''SELECT lc.id, lc.location_id, lc.planted_day as date,
+                      c.name as crop_name, c.variety, c.icon_path, c.image_color,
+                      l.name as location_name
+               FROM plantings lc
+               JOIN crops c ON lc.crop_id = c.id
+               JOIN locations l ON lc.location_id = l.id
+               WHERE lc.planted_day BETWEEN ? AND ?
+               ORDER BY lc.planted_date, lc.id''',
+            (start_date, end_date)):
+        day = _day(result, lc['date'])
+        crop_label = f"{lc['variety']}（{lc['crop_name']}）" if lc['variety'] else lc['crop_name']
+        day['location_crops'].append({
+            'id': lc['id'], 'location_id': lc['location_id'], 'crop_name': lc['crop_name'],
+            'variety': lc['variety'], 'icon_path': lc['icon_path'], 'image_color': lc['image_color'],
+            'location_name': lc['location_name'],
+            'label': f"{crop_label}@{lc['location_name']}", 'url': f"/plantings/{lc['id']}",
+        })
+
+    for harvest in db.execute(
+            '''SELECT h.id, h.quantity, h.unit, h.harvest_day as date,
+                      c.name as crop_name, c.variety, c.icon_path, c.image_color
+               FROM harvests h
+               JOIN plantings lc ON h.location_crop_id = lc.id
+               JOIN crops c ON lc.crop_id = c.id
+               WHERE h.harvest_day BETWEEN ? AND ?
+               ORDER BY h.harvest_date, h.id''',
+            (start_date, end_date)):
+        day = _day(result, harvest['date'])
+        crop_label = f"{harvest['variety']}（{harvest['crop_name']}）" if harvest['variety'] else harvest['crop_name']
+        qty_str = f" {harvest['quantity']}{harvest['unit'] or ''}" if harvest['quantity'] else ''
+        day['harvests'].append({
+            'id': harvest['id'], 'crop_name': harvest['crop_name'], 'variety': harvest['variety'],
+            'icon_path': harvest['icon_path'], 'image_color': harvest['image_color'],
+            'quantity': harvest['quantity'], 'unit': harvest['unit'],
+            'label': f"{crop_label}{qty_str}", 'url': f"/harvests/{harvest['id']}",
+        })
+
+    for task in db.execute(
+            '''SELECT id, title, status, due_day as date
+               FROM tasks WHERE due_day BETWEEN ? AND ? ORDER BY due_date, id''',
+            (start_date, end_date)):
+        day = _day(result, task['date'])
+        day['tasks'].append({
+            'id': task['id'], 'title': task['title'], 'status': task['status'],
+            'label': f"{task['title']}", 'url': f"/tasks/{task['id']}",
+        })
+
+    for gr in db.execute(
+            '''SELECT gr.id, gr.location_crop_id, gr.recorded_day as date,
+                      c.name as crop_name, c.variety, c.icon_path, c.image_color,
+                      l.name as location_name
+               FROM planting_records gr
+               JOIN plantings lc ON gr.location_crop_id = lc.id
+               JOIN crops c ON lc.crop_id = c.id
+               JOIN locations l ON lc.location_id = l.id
+               WHERE gr.recorded_day BETWEEN ? AND ?
+               ORDER BY gr.recorded_at, gr.id''',
+            (start_date, end_date)):
+        day = _day(result, gr['date'])
+        crop_label = f"{gr['variety']}（{gr['crop_name']}）" if gr['variety'] else gr['crop_name']
+        day['growth_records'].append({
+            'id': gr['id'], 'location_crop_id': gr['location_crop_id'], 'crop_name': gr['crop_name'],
+            'variety': gr['variety'], 'icon_path': gr['icon_path'], 'image_color': gr['image_color'],
+            'location_name': gr['location_name'],
+            'label': f"{crop_label}@{gr['location_name']}", 'url': f"/plantings/record/{gr['id']}",
+        })
+
+    return result
+
+
+def _without_empty(month_data):
+    """空の種類を除いた月データ（以前の実装との比較用）"""
+    return {day: {key: items for key, items in data.items() if items}
+            for day, data in month_data.items()}
+
+
+def _months(db_path):
+    """データのある期間の (年, 月) の一覧"""
+    conn = sqlite3.connect(db_path)
+    try:
+        first, last = conn.execute(
+            'SELECT MIN(recorded_day), MAX(recorded_day) FROM planting_records'
+        ).fetchone()
+    finally:
+        conn.close()
+    year, month = int(first[:4]), int(first[5:7])
+    end = (int(last[:4]), int(last[5:7]))
+    months = []
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _time_per_month(func, months):
+    """全月を1回ずつ取得したときの1か月あたりの時間（ms）"""
+    started = time.perf_counter()
+    for year, month in months:
+        func(year, month)
+    return (time.perf_counter() - started) * 1000 / len(months)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='カレンダーの月データ取得のベンチマーク')
+    parser.add_argument('--years', type=int, default=10, help='生成する期間（年）')
+    parser.add_argument('--iterations', type=int, default=5, help='全月の計測の繰り返し回数（最速の回を採る）')
+    parser.add_argument('--seed', type=int, default=42, help='テストデータの乱数シード')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='生成したDBの保存先')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    db_path = os.path.join(args.data_dir, f'calendar_dense_{args.years}y_seed{args.seed}.db')
+    if not os.path.exists(db_path):
+        print(f"テストデータを生成中: {db_path}")
+        if not build_database(db_path, DENSE_COUNTS, seed=args.seed, years=args.years, reset=True):
+            raise SystemExit(1)
+
+    app = create_app('production', config_overrides={'DATABASE': db_path, 'SECRET_KEY': 'bench'})
+    app.logger.setLevel(logging.ERROR)
+    months = _months(db_path)
+
+    with app.test_request_context('/'):
+        events = 0
+        for year, month in months:
+            current = Calendar.get_month_data(year, month)
+            if current != _without_empty(legacy_month_data(year, month)):
+                print(f"エラー: {year}年{month}月の結果が以前の実装と一致しません")
+                raise SystemExit(1)
+            events += sum(len(items) for data in current.values() for items in data.values())
+        print(f"{len(months)}か月・予定{events}件（1か月平均{events / len(months):.0f}件）で結果が一致")
+
+        # 1回空回ししてページキャッシュを温めてから、両方を交互に計測して最速の回を採る
+        _time_per_month(legacy_month_data, months)
+        legacy_ms = current_ms = float('inf')
+        for _ in range(args.iterations):
+            legacy_ms = min(legacy_ms, _time_per_month(legacy_month_data, months))
+            current_ms = min(current_ms, _time_per_month(Calendar.get_month_data, months))
+
+    print(f"以前の実装（7クエリ）  : {legacy_ms:8.2f} ms/月")
+    print(f"現在の実装（UNION ALL）: {current_ms:8.2f} ms/月  ({legacy_ms / current_ms:.2f}倍)")
+
+
+if __name__ == '__main__':
+    main()
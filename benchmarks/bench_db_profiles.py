@@ -0,0 +1,175 @@
+"""SQLite 接続プロファイル別のスループット比較ベンチマーク
+実行: uv run python benchmarks/bench_db_profiles.py [--readers 4] [--duration 5]
+
+プロファイルごとに一時DBを作成して同じデータを投入し、
+複数の読み取りスレッド（ダッシュボード / 収穫記録一覧）と
+1つの書き込みスレッド（収穫記録の登録）を同時に走らせて、
+秒間リクエスト数と「database is locked」エラー数を表示する。
+登録ルートは例外をフラッシュメッセージにしてリダイレクトするので、書き込みの成否は
+リダイレクト先とフラッシュメッセージで判定し、終了後に実際の行数とも突き合わせる。
+読み取りは 200 以外をエラーとして数える。
+'none' は PRAGMA を何も設定しない（従来の）接続で、比較の基準になる。
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# プロジェクトルートをPythonパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import Config
+
+READ_PATHS = ['/', '/harvests/']
+
+SEED_HARVESTS = 3000
+
+# 登録に成功したときのリダイレクト先（場所の詳細）
+CREATED_REDIRECT = re.compile(r'/locations/\d+$')
+
+
+def seed(db_path, crops=200, locations=50, plantings=2000, harvests=SEED_HARVESTS):
+    """ベンチマーク用のデータを投入"""
+    conn = sqlite3.connect(db_path)
+    rng = random.Random(42)
+    conn.executemany(
+        'INSERT INTO crops (name, crop_type, variety) VALUES (?, ?, ?)',
+        [(f'作物{i}', f'種類{i % 12}', f'品種{i}') for i in range(crops)]
+    )
+    conn.executemany(
+        'INSERT INTO locations (name, location_type) VALUES (?, ?)',
+        [(f'場所{i}', '畑') for i in range(locations)]
+    )
+    conn.executemany(
+        '''INSERT INTO plantings (location_id, crop_id, planted_date, status)
+           VALUES (?, ?, ?, ?)''',
+        [(rng.randint(1, locations), rng.randint(1, crops),
+          f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+          'active' if rng.random() < 0.3 else 'harvested')
+         for _ in range(plantings)]
+    )
+    conn.executemany(
+        '''INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit)
+           VALUES (?, ?, ?, ?)''',
+        [(rng.randint(1, plantings),
+          f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+          rng.randint(1, 20), '個')
+         for _ in range(harvests)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_profile(profile, readers, duration):
+    """1プロファイル分のベンチマークを実行して結果を返す"""
+    tmpdir = tempfile.mkdtemp(prefix=f'bench_{profile}_')
+    db_path = os.path.join(tmpdir, 'garden.db')
+    app = create_app('production', config_overrides={
+        'DATABASE': db_path,
+        'DB_PROFILE': None if profile == 'none' else profile,
+        'SECRET_KEY': 'bench',
+    })
+    seed(db_path)
+
+    stop = threading.Event()
+    counts = {'reads': 0, 'read_errors': 0, 'writes': 0, 'locked': 0, 'write_errors': 0}
+    lock = threading.Lock()
+
+    def reader():
+        client = app.test_client()
+        n = errors = 0
+        while not stop.is_set():
+            response = client.get(READ_PATHS[n % len(READ_PATHS)])
+            if response.status_code == 200:
+                n += 1
+            else:
+                errors += 1
+        with lock:
+            counts['reads'] += n
+            counts['read_errors'] += errors
+
+    def writer():
+        client = app.test_client()
+        n = locked = errors = 0
+        while not stop.is_set():
+            try:
+                response = client.post('/harvests/create', data={
+                    'location_crop_id': random.randint(1, 2000),
+                    'harvest_date': '2025-06-01',
+                    'quantity': '3',
+                    'unit': '個',
+                })
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+                continue
+            # 成功すると場所の詳細へ、失敗するとフラッシュ付きで登録フォームへリダイレクトされる
+            if response.status_code == 302 and CREATED_REDIRECT.search(response.headers.get('Location', '')):
+                n += 1
+                continue
+            with client.session_transaction() as sess:
+                messages = [message for _category, message in sess.pop('_flashes', [])]
+            if any('locked' in message for message in messages):
+                locked += 1
+            else:
+                errors += 1
+        with lock:
+            counts['writes'] += n
+            counts['locked'] += locked
+            counts['write_errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        from app.database import get_db
+        db = get_db()
+        journal_mode = db.execute('PRAGMA journal_mode').fetchone()[0]
+        inserted = db.execute('SELECT COUNT(*) FROM harvests').fetchone()[0] - SEED_HARVESTS
+    if inserted != counts['writes']:
+        print(f"警告: {profile}: 成功と判定した書き込み {counts['writes']} 件に対し、"
+              f"実際に追加された行は {inserted} 件です", file=sys.stderr)
+
+    return {
+        'profile': profile,
+        'journal_mode': journal_mode,
+        'reads_per_sec': counts['reads'] / elapsed,
+        'writes_per_sec': counts['writes'] / elapsed,
+        'locked': counts['locked'],
+        'errors': counts['read_errors'] + counts['write_errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 接続プロファイルのスループット比較')
+    parser.add_argument('--readers', type=int, default=4, help='読み取りスレッド数')
+    parser.add_argument('--duration', type=float, default=5.0, help='プロファイルごとの計測秒数')
+    parser.add_argument('--profiles', nargs='*', default=['none', *Config.DB_PROFILES],
+                        help="比較するプロファイル名（'none' は SQLite の既定値）")
+    args = parser.parse_args()
+
+    results = [run_profile(p, args.readers, args.duration) for p in args.profiles]
+
+    print(f"\n{'profile':<12} {'journal':<8} {'reads/s':>10} {'writes/s':>10} {'locked':>8} {'errors':>8}")
+    for r in results:
+        print(f"{r['profile']:<12} {r['journal_mode']:<8} {r['reads_per_sec']:>10.1f} "
+              f"{r['writes_per_sec']:>10.1f} {r['locked']:>8} {r['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""ルート単位のレイテンシ・クエリ数ベンチマーク
+実行: uv run python benchmarks/bench_routes.py [--scales small medium] [--save | --compare]
+
+test_data.py で規模ごとのDBを生成（生成済みなら再利用）し、Flask のテストクライアントで
+主要なエンドポイントを繰り返し叩いて p50 / p95 / p99 レイテンシとクエリ数を計測する。
+--save で結果をベースライン（JSON）に保存し、--compare でベースラインと比較して
+許容範囲を超えて遅くなった／クエリが増えたエンドポイントを報告する（該当があれば終了コード1）。
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# プロジェクトルートをPythonパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from test_data import SCALES, build_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'garden_bench')
+
+_QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def _sample_ids(db_path):
+    """ベンチマーク対象のID（配置の多い場所など）を選ぶ"""
+    conn = sqlite3.connect(db_path)
+    try:
+        location_id, history_date = conn.execute(
+            '''SELECT location_id, MAX(planted_date) FROM plantings
+               GROUP BY location_id ORDER BY COUNT(*) DESC LIMIT 1'''
+        ).fetchone()
+        return {
+            'location_id': location_id,
+            'history_date': history_date,
+            'crop_id': conn.execute('SELECT MIN(id) FROM crops').fetchone()[0],
+            'diary_id': conn.execute('SELECT MAX(id) FROM diary_entries').fetchone()[0],
+            'planting_id': conn.execute(
+                "SELECT MAX(id) FROM plantings WHERE status = 'active'"
+            ).fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def endpoints(ids):
+    """(名前, URL) の一覧"""
+    loc = ids['location_id']
+    return [
+        ('index', '/'),
+        ('crops.list', '/crops/'),
+        ('crops.detail', f"/crops/{ids['crop_id']}"),
+        ('locations.list', '/locations/'),
+        ('locations.detail', f'/locations/{loc}'),
+        ('plantings.index', '/plantings/'),
+        ('plantings.detail', f"/plantings/{ids['planting_id']}"),
+        ('harvests.list', '/harvests/'),
+        ('diary.list', '/diary/'),
+        ('diary.detail', f"/diary/{ids['diary_id']}"),
+        ('tasks.list', '/tasks/'),
+        ('calendar.index', '/calendar/'),
+        ('gallery.index', '/gallery/'),
+        ('locations.get_canvas_data', f'/locations/{loc}/canvas/data'),
+        ('locations.canvas_history_range', f'/locations/{loc}/canvas/history/range'),
+        ('locations.canvas_history', f"/locations/{loc}/canvas/history?date={ids['history_date']}"),
+    ]
+
+
+def percentile(samples, pct):
+    """最近傍順位法によるパーセンタイル"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def prepare_database(scale, data_dir, seed):
+    """規模ごとのDBを用意（生成済みなら再利用）"""
+    os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(data_dir, f'{scale}_seed{seed}.db')
+    if not os.path.exists(db_path):
+        print(f"[{scale}] テストデータを生成中: {db_path}")
+        if not build_database(db_path, SCALES[scale], seed=seed, reset=True):
+            raise SystemExit(1)
+    return db_path
+
+
+def bench_scale(scale, db_path, iterations, warmup, only=None):
+    """1規模分の計測結果を {エンドポイント名: 結果} で返す"""
+    app = create_app('production', config_overrides={
+        'DATABASE': db_path,
+        'SECRET_KEY': 'bench',
+        'SQL_TRACE': True,
+    })
+    app.logger.setLevel(logging.ERROR)
+    client = app.test_client()
+
+    results = {}
+    for name, url in endpoints(_sample_ids(db_path)):
+        if only and name not in only:
+            continue
+        for _ in range(warmup):
+            client.get(url)
+        samples = []
+        queries = status = None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            samples.append((time.perf_counter() - started) * 1000)
+            status = response.status_code
+            match = _QUERY_COUNT.search(response.headers.get('Server-Timing', ''))
+            queries = int(match.group(1)) if match else None
+        results[name] = {
+            'url': url,
+            'status': status,
+            'queries': queries,
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'p99_ms': round(percentile(samples, 99), 2),
+        }
+        print(f"[{scale}] {name:<34} p50={results[name]['p50_ms']:>9.2f}ms "
+              f"p95={results[name]['p95_ms']:>9.2f}ms queries={queries}")
+    return results
+
+
+def compare(current, baseline, tolerance, min_delta_ms):
+    """ベースラインとの比較結果（回帰の一覧）を返す"""
+    regressions = []
+    for scale, routes in current.items():
+        for name, result in routes.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base:
+                continue
+            if result['status'] != base['status']:
+                regressions.append(f"{scale}/{name}: status {base['status']} -> {result['status']}")
+            if base['queries'] is not None and result['queries'] is not None \
+                    and result['queries'] > base['queries']:
+                regressions.append(f"{scale}/{name}: queries {base['queries']} -> {result['queries']}")
+            for key in ('p50_ms', 'p95_ms'):
+                limit = base[key] * (1 + tolerance)
+                if result[key] > limit and result[key] - base[key] > min_delta_ms:
+                    regressions.append(
+                        f"{scale}/{name}: {key} {base[key]:.2f} -> {result[key]:.2f} "
+                        f"(+{(result[key] / base[key] - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ルート単位のレイテンシ・クエリ数ベンチマーク')
+    parser.add_argument('--scales', nargs='*', default=['small'], choices=list(SCALES),
+                        help='計測するデータ規模')
+    parser.add_argument('--iterations', type=int, default=30, help='エンドポイントごとの計測回数')
+    parser.add_argument('--warmup', type=int, default=3, help='計測前の空回し回数')
+    parser.add_argument('--only', nargs='*', help='計測するエンドポイント名（省略時はすべて）')
+    parser.add_argument('--seed', type=int, default=42, help='テストデータの乱数シード')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='生成したDBの保存先')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='ベースラインJSONのパス')
+    parser.add_argument('--save', action='store_true', help='結果をベースラインとして保存')
+    parser.add_argument('--compare', action='store_true', help='ベースラインと比較して回帰を報告')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='レイテンシの許容増加率（0.25 = 25%%）')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='これ未満のレイテンシ増加は回帰とみなさない（ミリ秒）')
+    args = parser.parse_args()
+
+    current = {}
+    for scale in args.scales:
+        db_path = prepare_database(scale, args.data_dir, args.seed)
+        current[scale] = bench_scale(scale, db_path, args.iterations, args.warmup, args.only)
+
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"エラー: ベースラインがありません: {args.baseline}（--save で作成できます）")
+            return 1
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(current, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n[回帰] {len(regressions)}件")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1
+        else:
+            print('\n[OK] ベースラインからの回帰はありません')
+
+    if args.save:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                saved = json.load(f).get('results', {})
+        saved.update(current)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'sqlite': sqlite3.sqlite_version,
+                    'machine': platform.machine(),
+                    'iterations': args.iterations,
+                    'seed': args.seed,
+                },
+                'results': saved,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n[保存] {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""モデルのクエリに対する実行計画チェックとインデックス提案
+実行: uv run python benchmarks/index_advisor.py [--scale medium] [--emit-migration]
+
+app/models/*.py のモデルクラスの静的メソッドを、引数名からサンプル値を組み立てて
+生成済みDB（test_data.py）に対して読み取り専用接続で呼び出し、実行された文を記録する。
+各文の EXPLAIN QUERY PLAN から
+  - インデックスを使わない全件スキャン（SCAN）
+  - ORDER BY / GROUP BY / DISTINCT のための一時B-tree
+  - 相関サブクエリ
+を報告し、WHERE / ON の比較と ORDER BY から推奨インデックスを組み立てる。
+--emit-migration を付けると推奨インデックスを app/migrations/NNN_*.sql として書き出す
+（ヒューリスティックな提案なので、書き出したファイルは確認してから採用すること）。
+書き込みを行うメソッドは読み取り専用接続で失敗するので、スキップとして扱う。
+"""
+import argparse
+import importlib
+import inspect
+import itertools
+import logging
+import os
+import pkgutil
+import re
+import sqlite3
+import sys
+import warnings
+from datetime import date
+
+# プロジェクトルートをPythonパスに追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.models
+from app import create_app
+from app.database import MIGRATIONS_DIR, _list_migration_files, _migration_version, get_db
+from app.utils.sql_trace import QueryStats, normalize_sql
+from bench_routes import DEFAULT_DATA_DIR, prepare_database
+from flask import g
+from test_data import SCALES
+
+# 引数名ごとのサンプル値（複数あるものはすべての組み合わせで呼び出す）
+_SAMPLE_ARGS = {
+    'relation_type': ['crop', 'location', 'location_crop'],
+    'entity_type': ['crop', 'location', 'diary', 'task'],
+    'status': ['active', None],
+    'keyword': ['トマト'],
+    'limit': [5],
+    'offset': [0],
+}
+
+# 定数・パラメータ・他テーブルの列との比較（LIKE はインデックスが効かないので対象外）
+_COMPARISON = re.compile(
+    r"(?:\b(\w+)\.)?\b(\w+)\s*(=|>=|<=|>|<|\bIN\b|\bBETWEEN\b)\s*(?:(\w+\.\w+)|(?=\?|:|'|\d|\())",
+    re.IGNORECASE
+)
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_ORDER_BY = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\)|$)', re.IGNORECASE | re.DOTALL)
+# 単独インデックスを提案しない列の値の種類数の上限
+LOW_SELECTIVITY_DISTINCT = 16
+
+_SQL_KEYWORDS = {
+    'where', 'join', 'left', 'inner', 'cross', 'on', 'order', 'group', 'limit',
+    'union', 'using', 'as', 'outer', 'natural', 'having', 'window',
+}
+
+
+def _sample_values(db_path):
+    """DBから引数のサンプル値を取得"""
+    conn = sqlite3.connect(db_path)
+    try:
+        def one(sql):
+            return conn.execute(sql).fetchone()[0]
+
+        location_id = one('SELECT location_id FROM plantings GROUP BY location_id ORDER BY COUNT(*) DESC LIMIT 1')
+        planting_id = one("SELECT MAX(id) FROM plantings WHERE status = 'active'")
+        values = {
+            'crop_id': one('SELECT crop_id FROM plantings GROUP BY crop_id ORDER BY COUNT(*) DESC LIMIT 1'),
+            'location_id': location_id,
+            'location_crop_id': planting_id,
+            'harvest_id': one('SELECT MAX(id) FROM harvests'),
+            'diary_id': one('SELECT MAX(id) FROM diary_entries'),
+            'task_id': one('SELECT MAX(id) FROM tasks'),
+            'record_id': one('SELECT MAX(id) FROM planting_records'),
+            'supplement_id': one('SELECT MAX(id) FROM supplements'),
+            'entity_id': planting_id,
+            'target_date': one('SELECT MAX(planted_date) FROM plantings'),
+            'year': date.today().year,
+            'month': date.today().month,
+        }
+        id_lists = {
+            'location_crop_ids': 'SELECT id FROM plantings ORDER BY id DESC LIMIT 50',
+            'diary_ids': 'SELECT id FROM diary_entries ORDER BY id DESC LIMIT 50',
+            'task_ids': 'SELECT id FROM tasks ORDER BY id DESC LIMIT 50',
+            'entity_ids': 'SELECT id FROM plantings ORDER BY id DESC LIMIT 50',
+        }
+        for name, sql in id_lists.items():
+            values[name] = [row[0] for row in conn.execute(sql)]
+    finally:
+        conn.close()
+    samples = {name: [value] for name, value in values.items()}
+    samples.update(_SAMPLE_ARGS)
+    return samples
+
+
+def model_methods():
+    """(クラス名.メソッド名, 関数) の一覧"""
+    for module_info in pkgutil.iter_modules(app.models.__path__):
+        module = importlib.import_module(f'app.models.{module_info.name}')
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for name, attr in cls.__dict__.items():
+                if isinstance(attr, staticmethod):
+                    yield f'{cls_name}.{name}', attr.__func__
+
+
+def _call_variants(func, samples):
+    """必須引数をサンプル値で埋めた引数リストを返す（埋められなければ None）"""
+    params = [p for p in inspect.signature(func).parameters.values() if p.default is p.empty]
+    if any(p.name not in samples for p in params):
+        return None
+    choices = [samples[p.name] for p in params]
+    return [dict(zip([p.name for p in params], combo)) for combo in itertools.product(*choices)]
+
+
+def collect_statements(flask_app, samples):
+    """モデルメソッドを呼び出して実行された文を集める
+
+    Returns:
+        tuple: ({正規化した文: (sql, params, {呼び出し元})}, [スキップしたメソッド])
+    """
+    statements = {}
+    skipped = []
+    for qualname, func in model_methods():
+        variants = _call_variants(func, samples)
+        if variants is None:
+            skipped.append((qualname, '引数を組み立てられない'))
+            continue
+        for kwargs in variants:
+            # GET のリクエストコンテキストでは読み取り専用接続になる
+            with flask_app.test_request_context('/', method='GET'):
+                g.sql_stats = QueryStats()
+                try:
+                    func(**kwargs)
+                except sqlite3.OperationalError as e:
+                    if 'readonly' not in str(e):
+                        raise
+                    skipped.append((qualname, '書き込みを行う'))
+                    break
+                except sqlite3.Error as e:
+                    skipped.append((qualname, f'{type(e).__name__}: {e}'))
+                    break
+                for sql, params, _seconds, _caller in g.sql_stats.statements:
+                    if params is None or sql.lstrip().upper().startswith(('PRAGMA', 'BEGIN')):
+                        continue
+                    key = normalize_sql(sql)
+                    entry = statements.setdefault(key, (sql, params, set()))
+                    entry[2].add(qualname)
+    return statements, skipped
+
+
+def _table_refs(sql, table_columns):
+    """{別名: テーブル名}（テーブル名自身も含む）"""
+    refs = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        if table not in table_columns:
+            continue
+        refs[table] = table
+        if alias and alias.lower() not in _SQL_KEYWORDS:
+            refs[alias] = table
+    return refs
+
+
+def _resolve(qualifier, column, refs, table_columns):
+    """列参照をテーブル名に解決（曖昧なら None）"""
+    if qualifier:
+        table = refs.get(qualifier)
+        return table if table and column in table_columns[table] else None
+    owners = {t for t in refs.values() if column in table_columns[t]}
+    return owners.pop() if len(owners) == 1 else None
+
+
+def suggest_index(sql, plan_problems, table_columns):
+    """問題のあるテーブルに対する推奨インデックス [(テーブル, (列, ...))]
+
+    plan_problems は analyze_plan() が返す (種類, テーブル別名, 相関サブクエリ内か) の一覧。
+    """
+    refs = _table_refs(sql, table_columns)
+    equality, joins, ranges = {}, {}, {}
+    for qualifier, column, op, other in _COMPARISON.findall(sql):
+        table = _resolve(qualifier, column, refs, table_columns)
+        if not table or column == 'id':
+            continue
+        if op.upper() in ('=', 'IN'):
+            target = joins if other else equality
+        else:
+            target = ranges
+        cols = target.setdefault(table, [])
+        if column not in cols:
+            cols.append(column)
+
+    # 1つのテーブルの列だけで並べている ORDER BY 句（サブクエリ内も含む）
+    order_cols = {}
+    for clause in _ORDER_BY.findall(sql):
+        resolved = []
+        for term in clause.split(','):
+            parts = term.strip().split()
+            if not parts:
+                continue
+            qualifier, _, column = parts[0].rpartition('.')
+            resolved.append((_resolve(qualifier, column, refs, table_columns), column))
+        tables = {table for table, _ in resolved}
+        if len(tables) == 1 and None not in tables:
+            order_cols.setdefault(tables.pop(), [column for _, column in resolved])
+
+    suggestions = []
+    for kind, alias, correlated in plan_problems:
+        table = refs.get(alias, alias)
+        if table not in table_columns:
+            continue
+        # 相関サブクエリでは外側の列との等値比較が検索キーになる
+        leading = equality.get(table, []) + (joins.get(table, []) if correlated else [])
+        if kind == 'scan':
+            cols = leading + ranges.get(table, [])[:1]
+        else:
+            cols = leading + order_cols.get(table, [])
+        if cols:
+            suggestions.append((table, tuple(dict.fromkeys(cols))))
+
+    # 計画に問題がある文では、結合相手のテーブルで定数により絞り込んでいる列にも
+    # 単独インデックスを提案する（OR で結ばれた条件は両方の列にインデックスがあれば
+    # MULTI-INDEX OR になる）
+    targeted = {refs.get(alias, alias) for _, alias, _ in plan_problems}
+    if plan_problems:
+        for table, cols in equality.items():
+            if table not in targeted:
+                suggestions.extend((table, (col,)) for col in cols)
+    return suggestions
+
+
+def analyze_plan(conn, sql, params):
+    """実行計画から (問題の一覧, [(種類, テーブル別名, 相関サブクエリ内か)]) を返す"""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    nodes = {row[0]: (row[1], row[3]) for row in rows}
+
+    def in_correlated(node_id):
+        parent = nodes[node_id][0]
+        while parent in nodes:
+            if nodes[parent][1].startswith('CORRELATED'):
+                return True
+            parent = nodes[parent][0]
+        return False
+
+    problems, targets = [], []
+    last_scan = None
+    for row in rows:
+        detail = row[3]
+        if detail.startswith(('SCAN ', 'SEARCH ')) \
+                and not detail.startswith(('SCAN CONSTANT', 'SCAN (')):
+            last_scan = (detail.split()[1], in_correlated(row[0]))
+            # インデックス順の全走査（SCAN ... USING INDEX）も全件読みになる
+            if detail.startswith('SCAN ') and 'COVERING INDEX' not in detail:
+                problems.append(f'全件スキャン: {detail}')
+                targets.append(('scan',) + last_scan)
+        if 'TEMP B-TREE' in detail:
+            problems.append(f'一時B-tree: {detail}')
+            if 'ORDER BY' in detail and last_scan:
+                targets.append(('order',) + last_scan)
+        if detail.startswith('CORRELATED'):
+            problems.append(f'相関サブクエリ: {detail}')
+    return problems, targets
+
+
+def _existing_indexes(conn):
+    """{テーブル: [(列, ...), ...]}（主キー以外のインデックス）"""
+    existing = {}
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    for table in tables:
+        for index in conn.execute(f'PRAGMA index_list({table})').fetchall():
+            cols = tuple(r[2] for r in conn.execute(f'PRAGMA index_info({index[1]})'))
+            existing.setdefault(table, []).append(cols)
+    return existing
+
+
+def _is_covered(cols, indexes):
+    return any(index[:len(cols)] == cols for index in indexes)
+
+
+def _is_low_selectivity(conn, table, column, cache):
+    """値の種類が少なく単独インデックスの効果が薄い列か（relation_type, status など）
+
+    cache: 呼び出し側が接続（DB）ごとに用意する {(テーブル, 列): 判定} の辞書
+    """
+    key = (table, column)
+    if key not in cache:
+        distinct = conn.execute(f'SELECT COUNT(DISTINCT {column}) FROM {table}').fetchone()[0]
+        cache[key] = distinct <= LOW_SELECTIVITY_DISTINCT
+    return cache[key]
+
+
+def consolidate(recommendations):
+    """他の推奨インデックスの先頭部分に含まれる推奨をまとめる"""
+    merged = {}
+    for (table, cols), callers in sorted(recommendations.items(), key=lambda kv: -len(kv[0][1])):
+        longer = next((key for key in merged if key[0] == table and key[1][:len(cols)] == cols), None)
+        if longer:
+            merged[longer] |= callers
+        else:
+            merged[(table, cols)] = set(callers)
+    return merged
+
+
+def emit_migration(recommendations):
+    """推奨インデックスを次の番号のマイグレーションとして書き出す"""
+    files = _list_migration_files()
+    number = max((_migration_version(f) for f in files), default=0) + 1
+    name = f'{number:03d}_add_advised_indexes'
+    lines = ['-- index_advisor.py が推奨したインデックス', f'-- Migration: {name}', '']
+    for (table, cols), callers in sorted(consolidate(recommendations).items()):
+        lines.append(f"-- {', '.join(sorted(callers))}")
+        lines.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(cols)} "
+                     f"ON {table}({', '.join(cols)});")
+    lines += ['', 'ANALYZE;', '']
+    path = os.path.join(MIGRATIONS_DIR, f'{name}.sql')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='モデルのクエリの実行計画チェックとインデックス提案')
+    parser.add_argument('--scale', choices=list(SCALES), default='medium', help='データ規模')
+    parser.add_argument('--seed', type=int, default=42, help='テストデータの乱数シード')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='生成したDBの保存先')
+    parser.add_argument('--emit-migration', action='store_true',
+                        help='推奨インデックスをマイグレーションとして書き出す')
+    parser.add_argument('--verbose', action='store_true', help='問題のない文も表示する')
+    args = parser.parse_args()
+    # モデルが date をそのまま渡す箇所の DeprecationWarning を抑止
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    db_path = prepare_database(args.scale, args.data_dir, args.seed)
+    flask_app = create_app('production', config_overrides={
+        'DATABASE': db_path, 'SECRET_KEY': 'advisor', 'SQL_TRACE': True,
+    })
+    flask_app.logger.setLevel(logging.ERROR)
+
+    samples = _sample_values(db_path)
+    statements, skipped = collect_statements(flask_app, samples)
+
+    recommendations = {}
+    flagged = 0
+    with flask_app.test_request_context('/', method='GET'):
+        conn = get_db()
+        table_columns = {
+            r[0]: {c[1] for c in conn.execute(f'PRAGMA table_info({r[0]})')}
+            for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        existing = _existing_indexes(conn)
+        selectivity = {}
+        for sql, params, callers in statements.values():
+            problems, targets = analyze_plan(conn, sql, params)
+            if not problems and not args.verbose:
+                continue
+            flagged += bool(problems)
+            print(f"\n■ {', '.join(sorted(callers))}")
+            print(f"  {' '.join(sql.split())[:200]}")
+            for problem in problems or ['問題なし']:
+                print(f'    - {problem}')
+            for table, cols in suggest_index(sql, targets, table_columns):
+                if _is_covered(cols, existing.get(table, [])) \
+                        or (len(cols) == 1 and _is_low_selectivity(conn, table, cols[0], selectivity)):
+                    continue
+                if (table, cols) in recommendations:
+                    recommendations[(table, cols)].update(callers)
+                    continue
+                print(f"    → 推奨: {table}({', '.join(cols)})")
+                recommendations.setdefault((table, cols), set()).update(callers)
+
+    recommendations = consolidate(recommendations)
+    print(f"\n[結果] 文 {len(statements)} 件中 {flagged} 件に問題、推奨インデックス {len(recommendations)} 件")
+    for (table, cols), callers in sorted(recommendations.items()):
+        print(f"  {table}({', '.join(cols)}) ← {', '.join(sorted(callers))}")
+    for qualname, reason in skipped:
+        print(f'  スキップ: {qualname}（{reason}）')
+
+    if args.emit_migration and recommendations:
+        print(f'\n[出力] {emit_migration(recommendations)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,109 +1,372 @@
-"""テストデータを作成するスクリプト"""
+"""テストデータ（合成データセット）を作成するスクリプト
+
+実行例:
+    uv run python test_data.py                              # small を instance/garden.db に投入
+    uv run python test_data.py --scale large --db instance/bench_large.db --reset
+    uv run python test_data.py --scale medium --harvests 200000 --seed 7
+
+作物・場所・植え付け（見取り図の配置付き）・栽培記録・収穫記録・日記（関連付き）・
+タスク（関連付き）・補足情報を、1トランザクション内の一括INSERTで生成する。
+同じ --seed / --scale / --years なら同じデータが再現される。
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
 from app import create_app
-from app.models.crop import Crop
-from app.models.location import Location
-from app.models.location_crop import LocationCrop
-
-app = create_app()
-
-with app.app_context():
-    # 作物を登録
-    print("=== 作物を登録中 ===")
-    crops_data = [
-        {
-            'name': 'ミニトマト',
-            'crop_type': 'トマト',
-            'variety': 'アイコ',
-            'planting_season': '4月～5月',
-            'harvest_season': '7月～9月',
-            'notes': '日当たりの良い場所で栽培'
-        },
-        {
-            'name': '丸なす',
-            'crop_type': 'なす',
-            'variety': '千両二号',
-            'planting_season': '5月～6月',
-            'harvest_season': '7月～10月',
-            'notes': '水を多めに与える'
-        },
-        {
-            'name': 'きゅうり',
-            'crop_type': 'きゅうり',
-            'variety': '夏すずみ',
-            'planting_season': '5月～6月',
-            'harvest_season': '6月～9月',
-            'notes': 'ネット栽培がおすすめ'
-        }
-    ]
-
-    crop_ids = []
-    for data in crops_data:
-        crop_id = Crop.create(data)
-        crop_ids.append(crop_id)
-        print(f"[OK] 作物「{data['name']}」を登録しました (ID: {crop_id})")
-
-    # 場所を登録
-    print("\n=== 場所を登録中 ===")
-    locations_data = [
-        {
-            'name': '南側の畑',
-            'location_type': '畑',
-            'area_size': 10.5,
-            'sun_exposure': '全日',
-            'notes': 'メインの栽培場所'
-        },
-        {
-            'name': 'ベランダプランター1',
-            'location_type': 'プランター',
-            'area_size': 0.3,
-            'sun_exposure': '半日',
-            'notes': 'ベランダ左側'
-        }
-    ]
-
-    location_ids = []
-    for data in locations_data:
-        location_id = Location.create(data)
-        location_ids.append(location_id)
-        print(f"[OK] 場所「{data['name']}」を登録しました (ID: {location_id})")
-
-    # 作物を植え付け
-    print("\n=== 作物を植え付け中 ===")
-    planting_data = [
-        {
-            'location_id': location_ids[0],
-            'crop_id': crop_ids[0],
-            'planted_date': '2024-05-15',
-            'quantity': 5,
-            'notes': '苗から植え付け'
-        },
-        {
-            'location_id': location_ids[0],
-            'crop_id': crop_ids[1],
-            'planted_date': '2024-05-20',
-            'quantity': 3,
-            'notes': '苗から植え付け'
-        },
-        {
-            'location_id': location_ids[1],
-            'crop_id': crop_ids[2],
-            'planted_date': '2024-05-25',
-            'quantity': 2,
-            'notes': 'プランター栽培'
+from app.config import Config
+
+# 規模ごとの件数
+SCALES = {
+    'small': {
+        'crops': 50, 'locations': 10, 'plantings': 300, 'planting_records': 2000,
+        'harvests': 1000, 'diaries': 500, 'tasks': 200, 'supplements': 200,
+    },
+    'medium': {
+        'crops': 1000, 'locations': 200, 'plantings': 10000, 'planting_records': 100000,
+        'harvests': 50000, 'diaries': 20000, 'tasks': 5000, 'supplements': 5000,
+    },
+    'large': {
+        'crops': 10000, 'locations': 2000, 'plantings': 200000, 'planting_records': 2000000,
+        'harvests': 1000000, 'diaries': 200000, 'tasks': 50000, 'supplements': 50000,
+    },
+}
+
+CROP_TYPES = {
+    'トマト': ['桃太郎', 'アイコ', '麗夏', 'シシリアンルージュ'],
+    'なす': ['千両二号', '米なす', '水なす', '長なす'],
+    'きゅうり': ['夏すずみ', '四葉', 'フリーダム'],
+    'ピーマン': ['京みどり', 'エース', 'こどもピーマン'],
+    'じゃがいも': ['男爵', 'メークイン', 'キタアカリ'],
+    'だいこん': ['青首', '聖護院', '三浦'],
+    'にんじん': ['向陽二号', '五寸', '金時'],
+    'ほうれんそう': ['オーライ', 'ミストラル'],
+    'たまねぎ': ['ネオアース', '泉州黄', '湘南レッド'],
+    'いちご': ['章姫', 'とちおとめ', 'よつぼし'],
+    'オクラ': ['アーリーファイブ', '島オクラ'],
+    'えだまめ': ['湯あがり娘', '茶豆', '黒豆'],
+}
+LOCATION_TYPES = ['畑', 'プランター', '鉢', 'ベランダ', '花壇']
+SUN_EXPOSURES = ['全日', '半日', '日陰']
+WEATHERS = ['晴れ', '曇り', '雨', '雪', '晴れ時々曇り']
+UNITS = ['個', 'kg', 'g', '本', '枚', '束']
+TASK_STATUSES = ['pending', 'in_progress', 'completed']
+CROP_COLORS = ['#4CAF50', '#E53935', '#8E24AA', '#FB8C00', '#FDD835', '#6D4C41']
+ICON_DIR = os.path.join(os.path.dirname(__file__), 'app', 'static', 'images', 'crop_icons')
+
+# 見取り図キャンバスのサイズ（canvas-editor.js と同じ座標系）
+CANVAS_WIDTH = 800
+CANVAS_HEIGHT = 600
+
+
+def _timestamp(day, rng):
+    return f"{day.isoformat()} {rng.randint(6, 20):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+
+
+class GardenGenerator:
+    """合成データの生成器"""
+
+    def __init__(self, conn, counts, seed=42, years=5):
+        self.conn = conn
+        self.counts = counts
+        self.rng = random.Random(seed)
+        self.end = date.today()
+        self.start = self.end - timedelta(days=365 * years)
+        self.span = (self.end - self.start).days
+        self.icons = sorted(os.listdir(ICON_DIR)) if os.path.isdir(ICON_DIR) else []
+        self.crops = []       # (id, name, variety, icon_path, image_color)
+        self.plantings = []   # (id, location_id, crop_id, planted_date, end_date or None)
+
+    def _random_day(self, after=None):
+        base = after or self.start
+        remaining = max((self.end - base).days, 0)
+        return base + timedelta(days=self.rng.randint(0, remaining))
+
+    def _next_id(self, table):
+        return (self.conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}').fetchone()[0]) + 1
+
+    def generate(self):
+        steps = [
+            ('crops', self.generate_crops),
+            ('locations', self.generate_locations),
+            ('plantings', self.generate_plantings),
+            ('planting_records', self.generate_planting_records),
+            ('harvests', self.generate_harvests),
+            ('diaries', self.generate_diaries),
+            ('tasks', self.generate_tasks),
+            ('supplements', self.generate_supplements),
+        ]
+        self.conn.execute('BEGIN')
+        try:
+            for name, step in steps:
+                started = time.perf_counter()
+                step(self.counts[name])
+                print(f"[OK] {name}: {self.counts[name]:,}件 ({time.perf_counter() - started:.1f}s)")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def generate_crops(self, n):
+        first_id = self._next_id('crops')
+        rows = []
+        crop_types = list(CROP_TYPES)
+        for i in range(n):
+            crop_type = self.rng.choice(crop_types)
+            variety = self.rng.choice(CROP_TYPES[crop_type] + [None])
+            name = f"{crop_type}{i + 1}" if i >= len(crop_types) else crop_type
+            icon = self.rng.choice(self.icons) if self.icons else None
+            color = self.rng.choice(CROP_COLORS)
+            created = _timestamp(self._random_day(), self.rng)
+            rows.append((name, crop_type, variety, f"{crop_type}の特徴", '4月～5月', '7月～9月',
+                         None, icon, color, created, created))
+            self.crops.append((first_id + i, name, variety, icon, color))
+        self.conn.executemany(
+            '''INSERT INTO crops (name, crop_type, variety, characteristics, planting_season,
+               harvest_season, notes, icon_path, image_color, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            rows
+        )
+
+    def generate_locations(self, n):
+        self.location_first_id = self._next_id('locations')
+        self.location_count = n
+        rows = []
+        for i in range(n):
+            created = _timestamp(self._random_day(), self.rng)
+            rows.append((f"{self.rng.choice(LOCATION_TYPES)}{i + 1}", self.rng.choice(LOCATION_TYPES),
+                         round(self.rng.uniform(0.2, 50), 2), self.rng.choice(SUN_EXPOSURES),
+                         None, created, created))
+        self.conn.executemany(
+            '''INSERT INTO locations (name, location_type, area_size, sun_exposure, notes,
+               created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            rows
+        )
+
+    def generate_plantings(self, n):
+        """植え付けを生成し、栽培中のものは場所の見取り図に配置する"""
+        first_id = self._next_id('plantings')
+        crops_by_id = {c[0]: c for c in self.crops}
+        placements = {}
+        rows = []
+        for i in range(n):
+            planting_id = first_id + i
+            location_id = self.location_first_id + self.rng.randrange(self.location_count)
+            crop = self.rng.choice(self.crops)
+            planted = self._random_day()
+            active = (self.end - planted).days < 180 and self.rng.random() < 0.7
+            end_date = None if active else min(planted + timedelta(days=self.rng.randint(30, 200)), self.end)
+            x = y = None
+            if active:
+                x = round(self.rng.uniform(0, CANVAS_WIDTH - 48), 2)
+                y = round(self.rng.uniform(0, CANVAS_HEIGHT - 48), 2)
+                _, name, variety, icon, color = crops_by_id[crop[0]]
+                placements.setdefault(location_id, []).append({
+                    'locationCropId': planting_id, 'cropId': crop[0], 'x': x, 'y': y,
+                    'iconPath': icon, 'imageColor': color, 'cropName': name, 'variety': variety or '',
+                })
+            created = _timestamp(planted, self.rng)
+            rows.append((location_id, crop[0], planted.isoformat(), self.rng.randint(1, 20),
+                         'active' if active else 'harvested', None, x, y,
+                         end_date.isoformat() if end_date else None, created, created))
+            self.plantings.append((planting_id, location_id, crop[0], planted, end_date))
+        self.conn.executemany(
+            '''INSERT INTO plantings (location_id, crop_id, planted_date, quantity, status, notes,
+               position_x, position_y, end_date, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            rows
+        )
+        self.conn.executemany(
+            'UPDATE locations SET canvas_data = ? WHERE id = ?',
+            ((json.dumps({'version': '2.0', 'placements': p}, ensure_ascii=False), location_id)
+             for location_id, p in placements.items())
+        )
+
+    def _child_day(self, planting):
+        _, _, _, planted, end_date = planting
+        limit = end_date or self.end
+        return planted + timedelta(days=self.rng.randint(0, max((limit - planted).days, 0)))
+
+    def generate_planting_records(self, n):
+        def rows():
+            for _ in range(n):
+                planting = self.rng.choice(self.plantings)
+                day = self._child_day(planting)
+                created = _timestamp(day, self.rng)
+                yield (planting[0], day.isoformat(), '生育状況を記録', None, created, created)
+        self.conn.executemany(
+            '''INSERT INTO planting_records (location_crop_id, recorded_at, notes, image_path,
+               created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            rows()
+        )
+
+    def generate_harvests(self, n):
+        self.harvest_first_id = self._next_id('harvests')
+        self.harvest_count = n
+
+        def rows():
+            for _ in range(n):
+                planting = self.rng.choice(self.plantings)
+                day = self._child_day(planting)
+                created = _timestamp(day, self.rng)
+                yield (planting[0], day.isoformat(), round(self.rng.uniform(0.1, 30), 1),
+                       self.rng.choice(UNITS), None, None, created, created)
+        self.conn.executemany(
+            '''INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit, notes,
+               image_path, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            rows()
+        )
+
+    def _relations(self, owner_id, include_harvest):
+        """日記・タスクの関連（0〜3件）を生成"""
+        kinds = ['crop', 'location', 'location_crop'] + (['harvest'] if include_harvest and self.harvest_count else [])
+        for _ in range(self.rng.randint(0, 3)):
+            kind = self.rng.choice(kinds)
+            crop_id = location_id = location_crop_id = harvest_id = None
+            if kind == 'crop':
+                crop_id = self.rng.choice(self.crops)[0]
+            elif kind == 'location':
+                location_id = self.location_first_id + self.rng.randrange(self.location_count)
+            elif kind == 'location_crop':
+                location_crop_id = self.rng.choice(self.plantings)[0]
+            else:
+                harvest_id = self.harvest_first_id + self.rng.randrange(self.harvest_count)
+            row = (owner_id, kind, crop_id, location_id, location_crop_id)
+            yield row + (harvest_id,) if include_harvest else row
+
+    def generate_diaries(self, n):
+        first_id = self._next_id('diary_entries')
+        entries = []
+        relations = []
+        for i in range(n):
+            day = self._random_day()
+            created = _timestamp(day, self.rng)
+            entries.append((f"日記 {day.isoformat()}", '今日の作業と観察のメモ', day.isoformat(),
+                            self.rng.choice(WEATHERS), 'published', None, created, created))
+            relations.extend(self._relations(first_id + i, include_harvest=True))
+        self.conn.executemany(
+            '''INSERT INTO diary_entries (title, content, entry_date, weather, status, image_path,
+               created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            entries
+        )
+        self.conn.executemany(
+            '''INSERT INTO diary_relations (diary_id, relation_type, crop_id, location_id,
+               location_crop_id, harvest_id)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            relations
+        )
+
+    def generate_tasks(self, n):
+        first_id = self._next_id('tasks')
+        tasks = []
+        relations = []
+        for i in range(n):
+            day = self._random_day()
+            due = day + timedelta(days=self.rng.randint(0, 30))
+            status = 'completed' if due < self.end and self.rng.random() < 0.8 else self.rng.choice(TASK_STATUSES)
+            created = _timestamp(day, self.rng)
+            tasks.append((f"作業 {i + 1}", '水やり・追肥・支柱立てなど', due.isoformat(), status,
+                          created, created))
+            relations.extend(self._relations(first_id + i, include_harvest=False))
+        self.conn.executemany(
+            '''INSERT INTO tasks (title, description, due_date, status, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            tasks
+        )
+        self.conn.executemany(
+            '''INSERT INTO task_relations (task_id, relation_type, crop_id, location_id,
+               location_crop_id)
+               VALUES (?, ?, ?, ?, ?)''',
+            relations
+        )
+
+    def generate_supplements(self, n):
+        targets = {
+            'crop': (self.crops[0][0], len(self.crops)),
+            'location': (self.location_first_id, self.location_count),
+            'diary': (self._next_id('diary_entries') - self.counts['diaries'], self.counts['diaries']),
+            'task': (self._next_id('tasks') - self.counts['tasks'], self.counts['tasks']),
         }
-    ]
-
-    for data in planting_data:
-        lc_id = LocationCrop.plant(data)
-        crop = Crop.get_by_id(data['crop_id'])
-        location = Location.get_by_id(data['location_id'])
-        print(f"[OK] 「{location['name']}」に「{crop['name']}」を植え付けました")
-
-    # 統計情報を表示
-    print("\n=== 統計情報 ===")
-    print(f"登録作物数: {Crop.count()}")
-    print(f"登録場所数: {Location.count()}")
-    print(f"栽培中作物数: {LocationCrop.count_active()}")
-
-    print("\n[完了] テストデータの作成が完了しました！")
-    print("ブラウザで http://localhost:5000 にアクセスしてアプリを確認してください。")
+        targets = {k: v for k, v in targets.items() if v[1]}
+
+        def rows():
+            for i in range(n):
+                entity_type = self.rng.choice(list(targets))
+                first_id, count = targets[entity_type]
+                kind = self.rng.choice(['text', 'url', 'youtube'])
+                content = {
+                    'text': '補足メモ',
+                    'url': 'https://example.com/garden',
+                    'youtube': 'dQw4w9WgXcQ',
+                }[kind]
+                yield (entity_type, first_id + self.rng.randrange(count), kind, f"補足 {i + 1}",
+                       content, i % 5)
+        self.conn.executemany(
+            '''INSERT INTO supplements (entity_type, entity_id, supplement_type, title, content,
+               sort_order)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            rows()
+        )
+
+
+def build_database(db_path, counts, seed=42, years=5, reset=False):
+    """スキーマを作成してデータを投入"""
+    db_path = os.path.abspath(db_path)
+    if reset:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    # アプリと同じ手順でスキーマ・マイグレーションを適用
+    create_app('production', config_overrides={'DATABASE': db_path, 'SECRET_KEY': 'test-data'})
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if conn.execute('SELECT COUNT(*) FROM crops').fetchone()[0]:
+            print(f"エラー: {db_path} には既にデータがあります（--reset で作り直せます）")
+            return False
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = OFF')
+        started = time.perf_counter()
+        GardenGenerator(conn, counts, seed=seed, years=years).generate()
+        conn.execute('ANALYZE')
+        print(f"\n[完了] {db_path} ({time.perf_counter() - started:.1f}s)")
+        return True
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='合成テストデータの生成')
+    parser.add_argument('--db', default=Config.DATABASE, help='出力先DBファイル')
+    parser.add_argument('--scale', choices=SCALES, default='small', help='データ規模')
+    parser.add_argument('--seed', type=int, default=42, help='乱数シード')
+    parser.add_argument('--years', type=int, default=5, help='生成する期間（年）')
+    parser.add_argument('--reset', action='store_true', help='既存のDBファイルを削除して作り直す')
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                            help=f'{name} の件数（規模の既定値を上書き）')
+    args = parser.parse_args(argv)
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+    if min(counts['crops'], counts['locations'], counts['plantings']) < 1:
+        parser.error('crops / locations / plantings は1件以上にしてください')
+
+    return build_database(args.db, counts, seed=args.seed, years=args.years, reset=args.reset)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
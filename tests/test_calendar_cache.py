@@ -0,0 +1,188 @@
+"""カレンダーの月単位キャッシュ（calendar_cache）と calendar_month_versions のトリガーのテスト
+
+植え付け・収穫・タスクの追加・更新・削除で、その行の日付（変更前と変更後）が属する月の
+version だけが増えること、キャッシュが version の変わった月だけ計算し直すことを確かめる。
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app
+from app.database import get_db
+from app.utils import calendar_cache
+
+
+class CalendarCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app('testing', config_overrides={
+            'DATABASE': os.path.join(self.tmpdir, 'garden.db'),
+            'SECRET_KEY': 'test',
+        })
+        # 書き込みは読み書き用の接続（POST のリクエストコンテキスト）で行う
+        self.ctx = self.app.test_request_context('/', method='POST')
+        self.ctx.push()
+        self.db = get_db()
+        self.crop_id = self.execute(
+            "INSERT INTO crops (name, crop_type, created_at) VALUES ('トマト', 'vegetable', '2023-12-01 09:00:00')"
+        )
+        self.location_id = self.execute(
+            "INSERT INTO locations (name, location_type, created_at) VALUES ('北側の畑', 'field', '2023-12-01 09:00:00')"
+        )
+        self.planting_id = self.execute(
+            'INSERT INTO plantings (location_id, crop_id, planted_date) VALUES (?, ?, ?)',
+            (self.location_id, self.crop_id, '2024-04-10'),
+        )
+
+    def tearDown(self):
+        self.ctx.pop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def execute(self, sql, params=()):
+        cursor = self.db.execute(sql, params)
+        self.db.commit()
+        return cursor.lastrowid
+
+    def versions(self):
+        return dict(self.db.execute('SELECT month, version FROM calendar_month_versions').fetchall())
+
+    def bumped_months(self, sql, params=()):
+        """文を実行し、version が変わった月の集合を返す"""
+        before = self.versions()
+        self.execute(sql, params)
+        after = self.versions()
+        return {month for month in set(before) | set(after) if before.get(month, 0) != after.get(month, 0)}
+
+    # --- 植え付け ---
+
+    def test_planting_insert_bumps_planted_month(self):
+        bumped = self.bumped_months(
+            'INSERT INTO plantings (location_id, crop_id, planted_date) VALUES (?, ?, ?)',
+            (self.location_id, self.crop_id, '2024-06-15'),
+        )
+        self.assertEqual(bumped, {'2024-06'})
+
+    def test_planting_update_moves_between_months(self):
+        bumped = self.bumped_months(
+            "UPDATE plantings SET planted_date = '2024-07-01' WHERE id = ?", (self.planting_id,)
+        )
+        self.assertEqual(bumped, {'2024-04', '2024-07'})
+
+    def test_planting_update_of_untracked_column_bumps_nothing(self):
+        bumped = self.bumped_months(
+            'UPDATE plantings SET position_x = 10 WHERE id = ?', (self.planting_id,)
+        )
+        self.assertEqual(bumped, set())
+
+    def test_planting_delete_bumps_planted_and_harvest_months(self):
+        self.execute(
+            "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit) VALUES (?, '2024-08-20', 3, '個')",
+            (self.planting_id,),
+        )
+        bumped = self.bumped_months('DELETE FROM plantings WHERE id = ?', (self.planting_id,))
+        self.assertEqual(bumped, {'2024-04', '2024-08'})
+
+    # --- 収穫 ---
+
+    def test_harvest_insert_update_delete(self):
+        bumped = self.bumped_months(
+            "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit) VALUES (?, '2024-08-20', 3, '個')",
+            (self.planting_id,),
+        )
+        self.assertEqual(bumped, {'2024-08'})
+        harvest_id = self.db.execute('SELECT MAX(id) FROM harvests').fetchone()[0]
+
+        bumped = self.bumped_months('UPDATE harvests SET quantity = 5 WHERE id = ?', (harvest_id,))
+        self.assertEqual(bumped, {'2024-08'})
+
+        bumped = self.bumped_months(
+            "UPDATE harvests SET harvest_date = '2024-09-02' WHERE id = ?", (harvest_id,)
+        )
+        self.assertEqual(bumped, {'2024-08', '2024-09'})
+
+        bumped = self.bumped_months('DELETE FROM harvests WHERE id = ?', (harvest_id,))
+        self.assertEqual(bumped, {'2024-09'})
+
+    # --- タスク ---
+
+    def test_task_insert_update_delete(self):
+        bumped = self.bumped_months(
+            "INSERT INTO tasks (title, status, due_date) VALUES ('水やり', 'pending', '2024-05-31')"
+        )
+        self.assertEqual(bumped, {'2024-05'})
+        task_id = self.db.execute('SELECT MAX(id) FROM tasks').fetchone()[0]
+
+        bumped = self.bumped_months("UPDATE tasks SET status = 'completed' WHERE id = ?", (task_id,))
+        self.assertEqual(bumped, {'2024-05'})
+
+        bumped = self.bumped_months("UPDATE tasks SET due_date = '2024-06-01' WHERE id = ?", (task_id,))
+        self.assertEqual(bumped, {'2024-05', '2024-06'})
+
+        bumped = self.bumped_months('DELETE FROM tasks WHERE id = ?', (task_id,))
+        self.assertEqual(bumped, {'2024-06'})
+
+    def test_task_without_due_date_bumps_nothing(self):
+        bumped = self.bumped_months(
+            "INSERT INTO tasks (title, status) VALUES ('いつか', 'pending')"
+        )
+        self.assertEqual(bumped, set())
+
+    # --- キャッシュ ---
+
+    def test_month_version_defaults_to_zero(self):
+        self.assertEqual(calendar_cache.month_version(1999, 1), 0)
+        self.assertGreater(calendar_cache.month_version(2024, 4), 0)
+
+    def test_get_month_data_is_cached_until_the_month_changes(self):
+        cache = self.app.extensions['calendar_cache']
+        april = calendar_cache.get_month_data(2024, 4)
+        self.assertIs(calendar_cache.get_month_data(2024, 4), april)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+        # 別の月への書き込みでは計算し直さない
+        self.execute(
+            "INSERT INTO tasks (title, status, due_date) VALUES ('支柱立て', 'pending', '2024-05-03')"
+        )
+        self.assertIs(calendar_cache.get_month_data(2024, 4), april)
+
+        # 同じ月への書き込みで計算し直し、新しい予定が入る
+        self.execute(
+            "INSERT INTO tasks (title, status, due_date) VALUES ('追肥', 'pending', '2024-04-20')"
+        )
+        refreshed = calendar_cache.get_month_data(2024, 4)
+        self.assertIsNot(refreshed, april)
+        self.assertEqual([task['title'] for task in refreshed['2024-04-20']['tasks']], ['追肥'])
+
+    def test_get_month_data_refreshes_both_months_on_move(self):
+        harvest_id = self.execute(
+            "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit) VALUES (?, '2024-08-20', 3, '個')",
+            (self.planting_id,),
+        )
+        august = calendar_cache.get_month_data(2024, 8)
+        september = calendar_cache.get_month_data(2024, 9)
+        self.assertIn('2024-08-20', august)
+        self.assertNotIn('2024-09-02', september)
+
+        self.execute("UPDATE harvests SET harvest_date = '2024-09-02' WHERE id = ?", (harvest_id,))
+        self.assertNotIn('2024-08-20', calendar_cache.get_month_data(2024, 8))
+        self.assertIn('2024-09-02', calendar_cache.get_month_data(2024, 9))
+
+    def test_month_cache_evicts_old_versions_and_least_recently_used(self):
+        cache = calendar_cache.MonthCache(max_months=2)
+        cache.set((2024, 1, 1), {'a': 1})
+        cache.set((2024, 1, 2), {'a': 2})
+        self.assertIsNone(cache.get((2024, 1, 1)))
+        cache.set((2024, 2, 1), {})
+        cache.get((2024, 1, 2))
+        cache.set((2024, 3, 1), {})
+        self.assertIsNone(cache.get((2024, 2, 1)))
+        self.assertEqual(cache.get((2024, 1, 2)), {'a': 2})
+        self.assertEqual(cache.stats()['entries'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
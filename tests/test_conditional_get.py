@@ -0,0 +1,104 @@
+"""詳細画面の条件付き GET（conditional.not_modified）のテスト
+
+一致する If-None-Match には 304 を返し、画面が表示するテーブルへの書き込みの後は 200 で
+描画し直すこと、表示しないテーブルへの書き込みでは 304 のままであることを確かめる。
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app
+from app.database import get_db
+
+
+class ConditionalGetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app('testing', config_overrides={
+            'DATABASE': os.path.join(self.tmpdir, 'garden.db'),
+            'SECRET_KEY': 'test',
+        })
+        self.crop_id = self.execute(
+            "INSERT INTO crops (name, crop_type) VALUES ('トマト', 'vegetable')"
+        )
+        self.location_id = self.execute(
+            "INSERT INTO locations (name, location_type) VALUES ('北側の畑', 'field')"
+        )
+        self.planting_id = self.execute(
+            "INSERT INTO plantings (location_id, crop_id, planted_date, status) VALUES (?, ?, '2024-04-10', 'active')",
+            (self.location_id, self.crop_id),
+        )
+        self.harvest_id = self.execute(
+            "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit) VALUES (?, '2024-08-20', 3, '個')",
+            (self.planting_id,),
+        )
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def execute(self, sql, params=()):
+        """読み書き用の接続（POST のリクエストコンテキスト）で文を実行してコミットする"""
+        with self.app.test_request_context('/', method='POST'):
+            db = get_db()
+            cursor = db.execute(sql, params)
+            db.commit()
+            return cursor.lastrowid
+
+    def revalidate(self, url):
+        """url を一度取得し、その ETag を If-None-Match に付けて取得し直す関数を返す"""
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+        return lambda: self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_matching_etag_returns_304(self):
+        url = f'/crops/{self.crop_id}'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first.headers)
+        self.assertIn('Last-Modified', first.headers)
+        self.assertEqual(first.headers['Cache-Control'], 'no-cache')
+
+        again = self.client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.data, b'')
+        self.assertEqual(again.headers['ETag'], first.headers['ETag'])
+
+    def test_stale_etag_returns_200(self):
+        response = self.client.get(f'/crops/{self.crop_id}', headers={'If-None-Match': 'W/"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_to_rendered_table_revalidates(self):
+        crop_again = self.revalidate(f'/crops/{self.crop_id}')
+        harvest_again = self.revalidate(f'/harvests/{self.harvest_id}')
+        self.assertEqual(crop_again().status_code, 304)
+        self.assertEqual(harvest_again().status_code, 304)
+
+        self.execute("UPDATE crops SET variety = '桃太郎' WHERE id = ?", (self.crop_id,))
+        response = crop_again()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('桃太郎', response.get_data(as_text=True))
+        self.assertEqual(harvest_again().status_code, 200)
+
+    def test_write_to_other_table_keeps_304(self):
+        # 収穫の詳細画面はタスクを表示しない
+        crop_again = self.revalidate(f'/crops/{self.crop_id}')
+        harvest_again = self.revalidate(f'/harvests/{self.harvest_id}')
+
+        self.execute("INSERT INTO tasks (title, status, due_date) VALUES ('水やり', 'pending', '2024-05-31')")
+        self.assertEqual(harvest_again().status_code, 304)
+        self.assertEqual(crop_again().status_code, 200)
+
+    def test_delete_of_related_row_revalidates(self):
+        location_again = self.revalidate(f'/locations/{self.location_id}')
+        self.execute('DELETE FROM harvests WHERE id = ?', (self.harvest_id,))
+        self.assertEqual(location_again().status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
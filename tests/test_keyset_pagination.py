@@ -0,0 +1,148 @@
+"""一覧のキーセットページング（各モデルの get_page）のテスト
+
+並び替えのキー（日付・created_at）が同じ行をページの境目にまたがせて、get_page を
+最後までたどった結果が get_all（植え付けは get_all_with_stats）と同じ順・同じ件数になることを確かめる。
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app
+from app.database import get_db
+from app.models.crop import Crop
+from app.models.diary import DiaryEntry
+from app.models.harvest import Harvest
+from app.models.planting import Planting
+
+
+class KeysetPaginationTestCase(unittest.TestCase):
+
+    # 同じキーの行がページの境目をまたぐよう、件数より小さく割り切れないページサイズにする
+    PAGE_SIZE = 3
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app('testing', config_overrides={
+            'DATABASE': os.path.join(self.tmpdir, 'garden.db'),
+            'SECRET_KEY': 'test',
+        })
+        # 書き込みは読み書き用の接続（POST のリクエストコンテキスト）で行う
+        self.ctx = self.app.test_request_context('/', method='POST')
+        self.ctx.push()
+        self.db = get_db()
+
+        # 作物: created_at が同じものを含む
+        crop_ids = [
+            self.execute(
+                'INSERT INTO crops (name, crop_type, created_at) VALUES (?, ?, ?)',
+                (f'作物{i}', 'vegetable' if i % 2 else 'herb', created_at),
+            )
+            for i, created_at in enumerate([
+                '2024-01-01 09:00:00', '2024-01-01 09:00:00', '2024-01-01 09:00:00',
+                '2024-01-02 09:00:00', '2024-01-02 09:00:00', '2023-12-31 09:00:00',
+                '2024-01-01 09:00:00',
+            ])
+        ]
+        location_id = self.execute(
+            "INSERT INTO locations (name, location_type) VALUES ('北側の畑', 'field')"
+        )
+
+        # 植え付け: 植え付け日が同じもの・植え付け日のないものを含む
+        planting_ids = [
+            self.execute(
+                'INSERT INTO plantings (location_id, crop_id, planted_date, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                (location_id, crop_ids[i % len(crop_ids)], planted_date, status, '2024-04-01 09:00:00'),
+            )
+            for i, (planted_date, status) in enumerate([
+                ('2024-04-10', 'active'), ('2024-04-10', 'active'), (None, 'active'),
+                ('2024-04-10', 'completed'), ('2024-05-01', 'active'), (None, 'completed'),
+                ('2024-03-15', 'active'),
+            ])
+        ]
+
+        # 収穫: 収穫日・created_at がすべて同じもの（id だけで順が決まる）を含む
+        for i, harvest_date in enumerate([
+            '2024-08-20', '2024-08-20', '2024-08-20', '2024-08-20',
+            '2024-08-21', '2024-08-19', '2024-08-20',
+        ]):
+            self.execute(
+                "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit, created_at) "
+                "VALUES (?, ?, 1, '個', '2024-08-22 09:00:00')",
+                (planting_ids[i % len(planting_ids)], harvest_date),
+            )
+
+        # 日記: 日付・created_at が同じものを含む
+        for i, entry_date in enumerate([
+            '2024-06-01', '2024-06-01', '2024-06-01', '2024-06-02',
+            '2024-06-01', '2024-05-31', '2024-06-02',
+        ]):
+            self.execute(
+                "INSERT INTO diary_entries (entry_date, title, content, created_at) "
+                "VALUES (?, ?, '', '2024-06-02 21:00:00')",
+                (entry_date, f'日記{i}'),
+            )
+
+    def tearDown(self):
+        self.ctx.pop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def execute(self, sql, params=()):
+        cursor = self.db.execute(sql, params)
+        self.db.commit()
+        return cursor.lastrowid
+
+    def walk_pages(self, get_page, **kwargs):
+        """get_page を最後のページまでたどり、id を並び順に返す"""
+        ids = []
+        after = None
+        for _ in range(100):
+            rows, after = get_page(limit=self.PAGE_SIZE, after=after, **kwargs)
+            self.assertLessEqual(len(rows), self.PAGE_SIZE)
+            ids.extend(row['id'] for row in rows)
+            if after is None:
+                return ids
+        self.fail('get_page did not reach the last page')
+
+    def test_crops_match_get_all(self):
+        expected = [crop['id'] for crop in Crop.get_all()]
+        self.assertEqual(self.walk_pages(Crop.get_page), expected)
+
+    def test_crops_filtered_by_type(self):
+        expected = [crop['id'] for crop in Crop.get_all() if crop['crop_type'] == 'herb']
+        self.assertEqual(self.walk_pages(Crop.get_page, crop_types=['herb']), expected)
+
+    def test_harvests_match_get_all(self):
+        expected = [harvest['id'] for harvest in Harvest.get_all()]
+        self.assertEqual(len(expected), 7)
+        self.assertEqual(self.walk_pages(Harvest.get_page), expected)
+
+    def test_plantings_match_get_all_with_stats(self):
+        expected = [planting['id'] for planting in Planting.get_all_with_stats()]
+        self.assertEqual(self.walk_pages(Planting.get_page), expected)
+        # 植え付け日のないものは最後に並ぶ
+        self.assertEqual(
+            [planting['planted_date'] for planting in Planting.get_all_with_stats()][-2:], [None, None]
+        )
+
+    def test_plantings_filtered_by_status(self):
+        expected = [planting['id'] for planting in Planting.get_all_with_stats(status='active')]
+        self.assertEqual(self.walk_pages(Planting.get_page, status='active'), expected)
+
+    def test_diary_entries_match_get_all(self):
+        expected = [entry['id'] for entry in DiaryEntry.get_all()]
+        self.assertEqual(self.walk_pages(DiaryEntry.get_page), expected)
+
+    def test_exact_multiple_of_page_size_has_no_empty_last_page(self):
+        self.execute('DELETE FROM crops WHERE id NOT IN (SELECT id FROM crops ORDER BY id LIMIT ?)',
+                     (self.PAGE_SIZE * 2,))
+        rows, after = Crop.get_page(limit=self.PAGE_SIZE)
+        rows, after = Crop.get_page(limit=self.PAGE_SIZE, after=after)
+        self.assertEqual(len(rows), self.PAGE_SIZE)
+        self.assertIsNone(after)
+
+
+if __name__ == '__main__':
+    unittest.main()
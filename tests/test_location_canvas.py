@@ -0,0 +1,118 @@
+"""見取り図のキャンバスデータ API（/locations/<id>/canvas/data）のテスト
+
+保存済みの JSON をそのまま返すこと、ETag が内容の変わらない限り同じで 304 を返せること、
+書き込み時の正規化とマイグレーション 023 による既存行の修復で、不正な値を返さないことを確かめる。
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import create_app
+from app.database import get_db
+from app.models.location import Location
+
+
+MIGRATION_023 = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'app', 'migrations', '023_normalize_canvas_data.sql',
+)
+
+
+class LocationCanvasTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app('testing', config_overrides={
+            'DATABASE': os.path.join(self.tmpdir, 'garden.db'),
+            'SECRET_KEY': 'test',
+        })
+        self.location_id = self.execute(
+            "INSERT INTO locations (name, location_type) VALUES ('北側の畑', 'field')"
+        )
+        self.url = f'/locations/{self.location_id}/canvas/data'
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def execute(self, sql, params=()):
+        """読み書き用の接続（POST のリクエストコンテキスト）で文を実行してコミットする"""
+        with self.app.test_request_context('/', method='POST'):
+            db = get_db()
+            cursor = db.execute(sql, params)
+            db.commit()
+            return cursor.lastrowid
+
+    def save(self, canvas_data):
+        response = self.client.post(f'/locations/{self.location_id}/canvas/save', json=canvas_data)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    # --- ETag ---
+
+    def test_etag_is_stable_and_returns_304(self):
+        self.save({'placements': [], 'version': '2.0', 'background': '#fff'})
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+
+        cached = self.client.get(self.url, headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+    def test_etag_changes_after_save(self):
+        before = self.client.get(self.url)
+        self.save({'placements': [], 'version': '2.0', 'background': '#eee'})
+        after = self.client.get(self.url, headers={'If-None-Match': before.headers['ETag']})
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after.headers['ETag'], before.headers['ETag'])
+        self.assertEqual(after.get_json()['background'], '#eee')
+
+    def test_body_is_the_stored_json(self):
+        self.save({'placements': [], 'version': '2.0', 'label': '畝'})
+        with self.app.test_request_context('/'):
+            stored = Location.get_canvas_json(self.location_id)
+        response = self.client.get(self.url)
+        self.assertEqual(response.get_data(as_text=True), stored)
+        self.assertEqual(response.mimetype, 'application/json')
+
+    # --- 正規化 ---
+
+    def test_unsaved_location_returns_default_canvas(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.get_json(), json.loads(Location.EMPTY_CANVAS_JSON))
+
+    def test_non_object_payload_is_stored_as_default_canvas(self):
+        for payload in ([], 'x', [{'placements': []}]):
+            with self.subTest(payload=payload):
+                self.save(payload)
+                self.assertEqual(self.client.get(self.url).get_data(as_text=True), Location.EMPTY_CANVAS_JSON)
+
+    def test_migration_023_repairs_existing_rows(self):
+        valid = '{"placements":[{"locationCropId":1,"x":10,"y":20}],"version":"2.0"}'
+        values = [valid, '{broken', '{}', 'null', '[]', '"x"', '', None]
+        location_ids = [
+            self.execute(
+                "INSERT INTO locations (name, location_type, canvas_data) VALUES (?, 'field', ?)",
+                (f'場所{i}', value),
+            )
+            for i, value in enumerate(values)
+        ]
+        with open(MIGRATION_023, encoding='utf-8') as f:
+            self.execute(f.read())
+
+        bodies = [
+            self.client.get(f'/locations/{location_id}/canvas/data').get_data(as_text=True)
+            for location_id in location_ids
+        ]
+        self.assertEqual(bodies[0], valid)
+        self.assertEqual(set(bodies[1:]), {Location.EMPTY_CANVAS_JSON})
+
+
+if __name__ == '__main__':
+    unittest.main()
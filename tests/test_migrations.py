@@ -0,0 +1,127 @@
+"""マイグレーションの台帳（schema_migrations）と run_migrations のテスト
+
+適用済みのファイルは再実行せず、新しいファイルだけを実行して台帳と PRAGMA user_version に
+記録すること、失敗したマイグレーションは記録されずにロールバックされることを確かめる。
+マイグレーションのディレクトリは一時ディレクトリへのコピーに差し替える。
+
+    python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from app import create_app
+from app import database
+from app.database import get_db, run_migrations
+
+
+class MigrationLedgerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.migrations_dir = os.path.join(self.tmpdir, 'migrations')
+        shutil.copytree(database.MIGRATIONS_DIR, self.migrations_dir)
+        patcher = mock.patch.object(database, 'MIGRATIONS_DIR', self.migrations_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.database = os.path.join(self.tmpdir, 'garden.db')
+        self.app = self.create_app()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def create_app(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return create_app('testing', config_overrides={
+                'DATABASE': self.database,
+                'SECRET_KEY': 'test',
+            })
+
+    def migrate(self):
+        """run_migrations を実行し、適用したファイル名のリストを返す"""
+        output = io.StringIO()
+        with self.app.app_context(), contextlib.redirect_stdout(output):
+            run_migrations(self.app, get_db())
+        prefix = 'Migration applied: '
+        return [line[len(prefix):] for line in output.getvalue().splitlines() if line.startswith(prefix)]
+
+    def ledger(self):
+        with contextlib.closing(sqlite3.connect(self.database)) as conn:
+            return dict(conn.execute('SELECT filename, checksum FROM schema_migrations').fetchall())
+
+    def user_version(self):
+        with contextlib.closing(sqlite3.connect(self.database)) as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def add_migration(self, filename, sql):
+        with open(os.path.join(self.migrations_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(sql)
+
+    def test_new_database_records_every_file(self):
+        files = sorted(f for f in os.listdir(self.migrations_dir) if f.endswith('.sql'))
+        self.assertEqual(sorted(self.ledger()), files)
+        self.assertEqual(self.user_version(), int(files[-1].split('_', 1)[0]))
+
+    def test_applied_files_are_skipped(self):
+        before = self.ledger()
+        self.assertEqual(self.migrate(), [])
+        self.assertEqual(self.ledger(), before)
+
+    def test_restart_with_current_schema_runs_nothing(self):
+        before = self.ledger()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            create_app('testing', config_overrides={'DATABASE': self.database, 'SECRET_KEY': 'test'})
+        self.assertEqual(output.getvalue(), '')
+        self.assertEqual(self.ledger(), before)
+
+    def test_new_file_is_applied_and_recorded(self):
+        self.add_migration('999_add_test_notes.sql', (
+            '-- テスト用のテーブル\n'
+            '-- Migration: 999_add_test_notes\n'
+            'CREATE TABLE test_notes (id INTEGER PRIMARY KEY, body TEXT);\n'
+        ))
+        self.assertEqual(self.migrate(), ['999_add_test_notes.sql'])
+        self.assertIn('999_add_test_notes.sql', self.ledger())
+        self.assertEqual(self.user_version(), 999)
+        with contextlib.closing(sqlite3.connect(self.database)) as conn:
+            conn.execute('SELECT id, body FROM test_notes').fetchall()
+
+        # 2回目は実行しない（CREATE TABLE の再実行でエラーにならない）
+        self.assertEqual(self.migrate(), [])
+
+    def test_failed_file_is_rolled_back_and_not_recorded(self):
+        before = self.ledger()
+        version = self.user_version()
+        self.add_migration('998_add_test_notes.sql', (
+            'CREATE TABLE test_notes (id INTEGER PRIMARY KEY);\n'
+        ))
+        self.add_migration('999_broken.sql', 'ALTER TABLE no_such_table ADD COLUMN x TEXT;\n')
+        with self.assertRaises(sqlite3.OperationalError):
+            self.migrate()
+        self.assertEqual(self.ledger(), before)
+        self.assertEqual(self.user_version(), version)
+        with contextlib.closing(sqlite3.connect(self.database)) as conn:
+            self.assertIsNone(conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'test_notes'"
+            ).fetchone())
+
+    def test_edited_applied_file_only_warns(self):
+        filename = sorted(self.ledger())[-1]
+        with open(os.path.join(self.migrations_dir, filename), 'a', encoding='utf-8') as f:
+            f.write('\n-- 追記\n')
+        output = io.StringIO()
+        with self.app.app_context(), contextlib.redirect_stdout(output):
+            run_migrations(self.app, get_db())
+        self.assertIn(f'Migration warning for {filename}: checksum mismatch', output.getvalue())
+        self.assertNotIn('Migration applied', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""リクエスト単位のSQL計測（sql_trace）の N+1 検出のテスト
+
+テスト設定（SQL_NPLUS1_DETECT・SQL_NPLUS1_RAISE が有効）で、同じ形の文をしきい値を超えて
+繰り返すルートが NPlusOneQueryError になること、一括取得するルートは通ることを確かめる。
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import jsonify
+
+from app import create_app
+from app.database import get_db
+from app.models.harvest import Harvest
+from app.models.planting import Planting
+from app.utils.sql_trace import NPlusOneQueryError, QueryStats, find_repeated_queries, normalize_sql
+
+
+class SqlTraceTestCase(unittest.TestCase):
+
+    PLANTING_COUNT = 8
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.app = create_app('testing', config_overrides={
+            'DATABASE': os.path.join(self.tmpdir, 'garden.db'),
+            'SECRET_KEY': 'test',
+        })
+        self.threshold = self.app.config['SQL_NPLUS1_THRESHOLD']
+
+        # 栽培記録ごとに収穫履歴を読む、わざと N+1 にしたルート
+        @self.app.route('/_test/harvests-per-planting/<int:location_id>')
+        def harvests_per_planting(location_id):
+            plantings = Planting.get_by_location(location_id, status='active')
+            return jsonify({
+                planting['id']: len(Harvest.get_by_location_crop(planting['id']))
+                for planting in plantings
+            })
+
+        # 同じ内容を一括取得で読むルート
+        @self.app.route('/_test/harvests-batched/<int:location_id>')
+        def harvests_batched(location_id):
+            plantings = Planting.get_by_location(location_id, status='active')
+            harvests = Harvest.load_many_by_location_crop([planting['id'] for planting in plantings])
+            return jsonify({
+                planting['id']: len(harvests.get(planting['id'], []))
+                for planting in plantings
+            })
+
+        # 書き込みは読み書き用の接続（POST のリクエストコンテキスト）で行い、
+        # テストクライアントのリクエストとは g を共有しないようにコンテキストを閉じておく
+        with self.app.test_request_context('/', method='POST'):
+            db = get_db()
+            crop_id = db.execute(
+                "INSERT INTO crops (name, crop_type) VALUES ('トマト', 'vegetable')"
+            ).lastrowid
+            self.location_id = db.execute(
+                "INSERT INTO locations (name, location_type) VALUES ('北側の畑', 'field')"
+            ).lastrowid
+            for day in range(1, self.PLANTING_COUNT + 1):
+                planting_id = db.execute(
+                    "INSERT INTO plantings (location_id, crop_id, planted_date, status) VALUES (?, ?, ?, 'active')",
+                    (self.location_id, crop_id, f'2024-04-{day:02d}'),
+                ).lastrowid
+                db.execute(
+                    "INSERT INTO harvests (location_crop_id, harvest_date, quantity, unit) VALUES (?, '2024-08-20', 3, '個')",
+                    (planting_id,),
+                )
+            db.commit()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    # --- N+1 検出 ---
+
+    def test_repeated_query_raises_in_strict_mode(self):
+        self.assertGreater(self.PLANTING_COUNT, self.threshold)
+        with self.assertRaises(NPlusOneQueryError) as raised:
+            self.client.get(f'/_test/harvests-per-planting/{self.location_id}')
+        self.assertIn('Harvest.get_by_location_crop', str(raised.exception))
+
+    def test_batched_route_passes(self):
+        response = self.client.get(f'/_test/harvests-batched/{self.location_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.get_json().values()), {1})
+
+    def test_location_detail_passes(self):
+        response = self.client.get(f'/locations/{self.location_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('北側の畑', response.get_data(as_text=True))
+
+    def test_repeated_query_only_warns_without_raise(self):
+        self.app.config['SQL_NPLUS1_RAISE'] = False
+        with self.assertLogs(self.app.logger, level='WARNING') as logs:
+            response = self.client.get(f'/_test/harvests-per-planting/{self.location_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('N+1 query suspected', logs.output[0])
+
+    # --- 文の形 ---
+
+    def test_normalize_sql_ignores_literals_and_in_list_length(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM harvests WHERE id = 3 AND unit = '個'"),
+            normalize_sql("SELECT *  FROM harvests\n WHERE id = 15 AND unit = 'kg'"),
+        )
+        self.assertEqual(
+            normalize_sql('SELECT * FROM harvests WHERE id IN (?, ?, ?)'),
+            'SELECT * FROM harvests WHERE id IN (?)',
+        )
+
+    def test_find_repeated_queries_counts_above_threshold(self):
+        stats = QueryStats()
+        for harvest_id in range(6):
+            stats.record(f'SELECT * FROM harvests WHERE id = {harvest_id}', (), 0.0)
+        stats.record('SELECT * FROM crops', (), 0.0)
+        repeated = find_repeated_queries(stats, threshold=5)
+        self.assertEqual(repeated, [(6, 'SELECT * FROM harvests WHERE id = ?', [])])
+        self.assertEqual(find_repeated_queries(stats, threshold=6), [])
+
+
+if __name__ == '__main__':
+    unittest.main()